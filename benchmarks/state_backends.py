@@ -0,0 +1,68 @@
+"""Compare throughput of state backends.
+
+Run with `python -m benchmarks.state_backends`.
+"""
+
+import asyncio
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from pybotx_smartapp_rpc.backends.base import StateBackend
+from pybotx_smartapp_rpc.backends.memory import MemoryStateBackend
+from pybotx_smartapp_rpc.backends.sqlite import SQLiteStateBackend
+
+OPERATIONS_COUNT = 2000
+
+
+async def measure(
+    operation: Callable[[StateBackend, int], Awaitable[object]],
+    backend: StateBackend,
+) -> float:
+    started_at = time.perf_counter()
+    for index in range(OPERATIONS_COUNT):
+        await operation(backend, index)
+
+    return OPERATIONS_COUNT / (time.perf_counter() - started_at)
+
+
+async def compare_and_set(backend: StateBackend, index: int) -> bool:
+    return await backend.compare_and_set(
+        "cas",
+        str(index).encode() if index else None,
+        str(index + 1).encode(),
+    )
+
+
+OPERATIONS: dict[str, Callable[[StateBackend, int], Awaitable[object]]] = {
+    "set": lambda backend, index: backend.set(f"key-{index}", b"value", ttl=60),
+    "get": lambda backend, index: backend.get(f"key-{index}"),
+    "incr": lambda backend, _: backend.incr("counter", ttl=60),
+    "compare_and_set": compare_and_set,
+}
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        backends: dict[str, StateBackend] = {
+            "memory": MemoryStateBackend(),
+            "sqlite": SQLiteStateBackend(str(Path(directory) / "state.db")),
+        }
+
+        print(f"{'operation':<16}" + "".join(f"{name:>14}" for name in backends))
+        for operation_name, operation in OPERATIONS.items():
+            results = [
+                await measure(operation, backend) for backend in backends.values()
+            ]
+            print(
+                f"{operation_name:<16}"
+                + "".join(f"{ops:>10.0f} op/s" for ops in results),
+            )
+
+        for backend in backends.values():
+            await backend.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
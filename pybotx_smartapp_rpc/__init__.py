@@ -1,5 +1,7 @@
+from pybotx_smartapp_rpc.dependencies import Depends
 from pybotx_smartapp_rpc.exceptions import RPCErrorExc
 from pybotx_smartapp_rpc.models.errors import RPCError
+from pybotx_smartapp_rpc.models.method import RPCPriority
 from pybotx_smartapp_rpc.models.request import RPCArgsBaseModel
 from pybotx_smartapp_rpc.models.responses import (
     RPCErrorResponse,
@@ -8,15 +10,17 @@ from pybotx_smartapp_rpc.models.responses import (
 )
 from pybotx_smartapp_rpc.router import RPCRouter
 from pybotx_smartapp_rpc.rpc import SmartAppRPC
-from pybotx_smartapp_rpc.smartapp import SmartApp
+from pybotx_smartapp_rpc.smartapp import SmartApp, SmartAppContext
 from pybotx_smartapp_rpc.typing import (
     Handler,
     HandlerWithArgs,
     HandlerWithoutArgs,
     RPCResponse,
+    SyncHandler,
 )
 
 __all__ = (
+    "Depends",
     "Handler",
     "HandlerWithArgs",
     "HandlerWithoutArgs",
@@ -24,10 +28,13 @@ __all__ = (
     "RPCError",
     "RPCErrorExc",
     "RPCErrorResponse",
+    "RPCPriority",
     "RPCResponse",
     "RPCResponseBaseModel",
     "RPCResultResponse",
     "RPCRouter",
     "SmartApp",
+    "SmartAppContext",
     "SmartAppRPC",
+    "SyncHandler",
 )
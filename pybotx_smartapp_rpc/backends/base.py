@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+
+
+class StateBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...  # pragma: no cover
+
+    @abstractmethod
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        ttl: float | None = None,
+    ) -> None: ...  # pragma: no cover
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...  # pragma: no cover
+
+    @abstractmethod
+    async def incr(
+        self,
+        key: str,
+        amount: int = 1,
+        ttl: float | None = None,
+    ) -> int: ...  # pragma: no cover
+
+    @abstractmethod
+    async def compare_and_set(
+        self,
+        key: str,
+        expected: bytes | None,
+        value: bytes,
+        ttl: float | None = None,
+    ) -> bool: ...  # pragma: no cover
+
+    async def close(self) -> None:
+        return None
@@ -0,0 +1,77 @@
+import time
+
+from pybotx_smartapp_rpc.backends.base import StateBackend
+
+_EXPIRED_KEYS_SWEEP_INTERVAL = 1024
+
+
+class MemoryStateBackend(StateBackend):
+    def __init__(self) -> None:
+        self._values: dict[str, tuple[bytes, float | None]] = {}
+        self._writes_count = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    async def get(self, key: str) -> bytes | None:
+        return self._get(key, time.monotonic())
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        self._set(key, value, ttl, time.monotonic())
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        now = time.monotonic()
+        current_value = self._get(key, now)
+        if current_value is None:
+            new_value = amount
+            self._set(key, str(new_value).encode(), ttl, now)
+        else:
+            new_value = int(current_value) + amount
+            self._values[key] = (str(new_value).encode(), self._values[key][1])
+
+        return new_value
+
+    async def compare_and_set(
+        self,
+        key: str,
+        expected: bytes | None,
+        value: bytes,
+        ttl: float | None = None,
+    ) -> bool:
+        now = time.monotonic()
+        if self._get(key, now) != expected:
+            return False
+
+        self._set(key, value, ttl, now)
+        return True
+
+    def _get(self, key: str, now: float) -> bytes | None:
+        stored = self._values.get(key)
+        if stored is None:
+            return None
+
+        value, expires_at = stored
+        if expires_at is not None and expires_at <= now:
+            del self._values[key]
+            return None
+
+        return value
+
+    def _set(self, key: str, value: bytes, ttl: float | None, now: float) -> None:
+        self._values[key] = (value, now + ttl if ttl is not None else None)
+
+        self._writes_count += 1
+        if self._writes_count % _EXPIRED_KEYS_SWEEP_INTERVAL == 0:
+            self._sweep_expired_keys(now)
+
+    def _sweep_expired_keys(self, now: float) -> None:
+        expired_keys = [
+            key
+            for key, (_, expires_at) in self._values.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key in expired_keys:
+            del self._values[key]
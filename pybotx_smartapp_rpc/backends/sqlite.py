@@ -0,0 +1,179 @@
+import asyncio
+import sqlite3
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import TypeVar
+
+from pybotx_smartapp_rpc.backends.base import StateBackend
+
+T = TypeVar("T")
+
+_CREATE_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS smartapp_rpc_state (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL
+)
+"""
+_SELECT_QUERY = """
+SELECT value FROM smartapp_rpc_state
+WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)
+"""
+_UPSERT_QUERY = """
+INSERT OR REPLACE INTO smartapp_rpc_state (key, value, expires_at) VALUES (?, ?, ?)
+"""
+_UPDATE_VALUE_QUERY = "UPDATE smartapp_rpc_state SET value = ? WHERE key = ?"
+_DELETE_QUERY = "DELETE FROM smartapp_rpc_state WHERE key = ?"
+_DELETE_EXPIRED_QUERY = "DELETE FROM smartapp_rpc_state WHERE expires_at <= ?"
+
+
+@contextmanager
+def _immediate_transaction(connection: sqlite3.Connection) -> Iterator[None]:
+    # BEGIN IMMEDIATE takes the write lock at once, so read-modify-write
+    # operations are atomic across processes sharing the database file
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+
+    connection.execute("COMMIT")
+
+
+class SQLiteStateBackend(StateBackend):
+    def __init__(
+        self,
+        path: str,
+        busy_timeout: float = 5.0,
+        sweep_interval: int = 1024,
+    ) -> None:
+        self._path = path
+        self._busy_timeout = busy_timeout
+        self._sweep_interval = sweep_interval
+        self._writes_count = 0
+
+        # sqlite connection must be used from the thread that created it
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="smartapp-rpc-sqlite",
+        )
+        self._connection: sqlite3.Connection | None = None
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._run(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        await self._run(self._set, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._delete, key)
+
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        return await self._run(self._incr, key, amount, ttl)
+
+    async def compare_and_set(
+        self,
+        key: str,
+        expected: bytes | None,
+        value: bytes,
+        ttl: float | None = None,
+    ) -> bool:
+        return await self._run(self._compare_and_set, key, expected, value, ttl)
+
+    async def close(self) -> None:
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, func: Callable[..., T], *args: object) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self._path,
+                timeout=self._busy_timeout,
+                isolation_level=None,
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(_CREATE_TABLE_QUERY)
+
+        return self._connection
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _get(self, key: str) -> bytes | None:
+        row = self._get_connection().execute(_SELECT_QUERY, (key, time.time()))
+        return self._fetch_value(row)
+
+    def _set(self, key: str, value: bytes, ttl: float | None) -> None:
+        now = time.time()
+        connection = self._get_connection()
+        connection.execute(_UPSERT_QUERY, (key, value, self._expires_at(now, ttl)))
+        self._after_write(connection, now)
+
+    def _delete(self, key: str) -> None:
+        self._get_connection().execute(_DELETE_QUERY, (key,))
+
+    def _incr(self, key: str, amount: int, ttl: float | None) -> int:
+        now = time.time()
+        connection = self._get_connection()
+        with _immediate_transaction(connection):
+            current_value = self._fetch_value(
+                connection.execute(_SELECT_QUERY, (key, now)),
+            )
+            if current_value is None:
+                new_value = amount
+                connection.execute(
+                    _UPSERT_QUERY,
+                    (key, str(new_value).encode(), self._expires_at(now, ttl)),
+                )
+            else:
+                new_value = int(current_value) + amount
+                connection.execute(
+                    _UPDATE_VALUE_QUERY,
+                    (str(new_value).encode(), key),
+                )
+
+        self._after_write(connection, now)
+        return new_value
+
+    def _compare_and_set(
+        self,
+        key: str,
+        expected: bytes | None,
+        value: bytes,
+        ttl: float | None,
+    ) -> bool:
+        now = time.time()
+        connection = self._get_connection()
+        with _immediate_transaction(connection):
+            current_value = self._fetch_value(
+                connection.execute(_SELECT_QUERY, (key, now)),
+            )
+            if current_value != expected:
+                return False
+
+            connection.execute(_UPSERT_QUERY, (key, value, self._expires_at(now, ttl)))
+
+        self._after_write(connection, now)
+        return True
+
+    def _after_write(self, connection: sqlite3.Connection, now: float) -> None:
+        self._writes_count += 1
+        if self._writes_count % self._sweep_interval == 0:
+            connection.execute(_DELETE_EXPIRED_QUERY, (now,))
+
+    def _fetch_value(self, cursor: sqlite3.Cursor) -> bytes | None:
+        row = cursor.fetchone()
+        return bytes(row[0]) if row else None
+
+    def _expires_at(self, now: float, ttl: float | None) -> float | None:
+        return now + ttl if ttl is not None else None
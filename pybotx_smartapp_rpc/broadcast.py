@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from loguru import logger
+from pybotx import Bot, File
+
+ChatIds = Iterable[UUID] | AsyncIterable[UUID]
+
+
+@dataclass
+class BroadcastSummary:
+    succeeded: int = 0
+    failed: int = 0
+    failed_chat_ids: list[UUID] = field(default_factory=list)
+
+
+class _RatePacer:
+    def __init__(self, rate: float) -> None:
+        self._interval = 1 / rate
+        self._next_slot = 0.0
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class _ChatIdsStream:
+    def __init__(self, chat_ids: ChatIds) -> None:
+        self._iterator = self._to_async_iterator(chat_ids)
+        self._lock = asyncio.Lock()
+
+    async def next(self) -> UUID | None:
+        # async generators can't be advanced by several workers at once
+        async with self._lock:
+            return await anext(self._iterator, None)
+
+    async def _to_async_iterator(self, chat_ids: ChatIds) -> AsyncIterator[UUID]:
+        if isinstance(chat_ids, AsyncIterable):
+            async for chat_id in chat_ids:
+                yield chat_id
+        else:
+            for chat_id in chat_ids:
+                yield chat_id
+
+
+async def broadcast_event(
+    bot: Bot,
+    bot_id: UUID,
+    chat_ids: ChatIds,
+    data: dict[str, Any],
+    files: list[File] | None = None,
+    encrypted: bool = True,
+    max_concurrency: int = 10,
+    rate_limit: float | None = None,
+) -> BroadcastSummary:
+    if max_concurrency < 1:
+        raise ValueError("Broadcast concurrency must be at least 1")
+
+    if rate_limit is not None and rate_limit <= 0:
+        raise ValueError("Broadcast rate limit must be positive")
+
+    summary = BroadcastSummary()
+    stream = _ChatIdsStream(chat_ids)
+    pacer = _RatePacer(rate_limit) if rate_limit else None
+
+    async def worker() -> None:
+        while (chat_id := await stream.next()) is not None:
+            if pacer:
+                await pacer.wait()
+
+            try:
+                await bot.send_smartapp_event(
+                    bot_id=bot_id,
+                    chat_id=chat_id,
+                    data=data,
+                    files=files or [],
+                    encrypted=encrypted,
+                )
+            except Exception as exc:
+                summary.failed += 1
+                summary.failed_chat_ids.append(chat_id)
+                logger.exception(exc)
+            else:
+                summary.succeeded += 1
+
+    await asyncio.gather(*(worker() for _ in range(max_concurrency)))
+
+    return summary
@@ -0,0 +1,134 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine, Hashable
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from pybotx_smartapp_rpc.models.request import RPCArgsBaseModel
+from pybotx_smartapp_rpc.models.responses import build_cancelled_error_response
+from pybotx_smartapp_rpc.smartapp import SmartApp
+from pybotx_smartapp_rpc.typing import RPCResponse
+
+SupersedeKeyFunc = Callable[[SmartApp], Hashable]
+CallRef = tuple[UUID, UUID]
+
+
+def get_supersede_key(
+    smartapp: SmartApp,
+    method: str,
+    key_func: SupersedeKeyFunc | None,
+) -> Hashable:
+    sender_huid = smartapp.event.sender.huid if smartapp.event else None
+    call_key = (method, smartapp.bot_id, smartapp.chat_id, sender_huid)
+
+    return call_key if key_func is None else (*call_key, key_func(smartapp))
+
+
+def get_call_owner(smartapp: SmartApp) -> Hashable:
+    sender_huid = smartapp.event.sender.huid if smartapp.event else None
+    return smartapp.chat_id, sender_huid
+
+
+class CancelCallArgs(RPCArgsBaseModel):
+    ref: UUID
+
+
+@dataclass
+class CancellableCallsStats:
+    superseded: int = 0
+    cancelled_by_client: int = 0
+    evicted: int = 0
+
+
+@dataclass
+class _RunningCall:
+    task: "asyncio.Task[RPCResponse]"
+    owner: Hashable = None
+    cancel_reason: str | None = None
+
+
+class CancellableCalls:
+    def __init__(self, max_calls: int = 10_000) -> None:
+        self._max_calls = max_calls
+        self._supersedable_calls: dict[Hashable, _RunningCall] = {}
+        self._calls_by_ref: OrderedDict[CallRef, _RunningCall] = OrderedDict()
+        self._running = 0
+
+        self.stats = CancellableCallsStats()
+
+    @property
+    def running_count(self) -> int:
+        return self._running
+
+    async def run(
+        self,
+        call: Coroutine[Any, Any, RPCResponse],
+        supersede_key: Hashable | None = None,
+        call_ref: CallRef | None = None,
+        owner: Hashable = None,
+    ) -> RPCResponse:
+        # call is executed in separate task, so it can be cancelled
+        # without cancelling task of the caller
+        running_call = _RunningCall(asyncio.create_task(call), owner)
+        self._running += 1
+
+        if supersede_key is not None:
+            previous_call = self._supersedable_calls.get(supersede_key)
+            if previous_call:
+                self._cancel(previous_call, "superseded")
+                self.stats.superseded += 1
+
+            self._supersedable_calls[supersede_key] = running_call
+
+        if call_ref is not None:
+            self._register_call(call_ref, running_call)
+
+        try:
+            # waits for cancelled call too, so its cleanup is finished
+            # before the response is sent
+            await asyncio.wait({running_call.task})
+        except asyncio.CancelledError:
+            running_call.task.cancel()
+            await asyncio.wait({running_call.task})
+            raise
+        finally:
+            self._running -= 1
+            if self._supersedable_calls.get(supersede_key) is running_call:
+                del self._supersedable_calls[supersede_key]
+
+            if (
+                call_ref is not None
+                and self._calls_by_ref.get(call_ref) is running_call
+            ):
+                del self._calls_by_ref[call_ref]
+
+        if running_call.task.cancelled():
+            return build_cancelled_error_response(running_call.cancel_reason)
+
+        return running_call.task.result()
+
+    def cancel(self, call_ref: CallRef, owner: Hashable) -> bool:
+        running_call = self._calls_by_ref.get(call_ref)
+        # users can cancel only their own calls
+        if (
+            running_call is None
+            or running_call.owner != owner
+            or running_call.task.done()
+        ):
+            return False
+
+        self._cancel(running_call, "cancelled_by_client")
+        self.stats.cancelled_by_client += 1
+        return True
+
+    def _register_call(self, call_ref: CallRef, running_call: _RunningCall) -> None:
+        self._calls_by_ref[call_ref] = running_call
+        if len(self._calls_by_ref) > self._max_calls:
+            # evicted call can't be cancelled by client anymore
+            self._calls_by_ref.popitem(last=False)
+            self.stats.evicted += 1
+
+    def _cancel(self, running_call: _RunningCall, reason: str) -> None:
+        running_call.cancel_reason = reason
+        running_call.task.cancel()
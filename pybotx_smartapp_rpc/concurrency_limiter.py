@@ -0,0 +1,135 @@
+import math
+import time
+from collections.abc import Collection
+from dataclasses import dataclass
+from types import TracebackType
+
+GLOBAL_LIMIT_KEY = "*"
+
+
+@dataclass
+class ConcurrencyLimitStats:
+    limit: float
+    in_flight: int = 0
+    rtt: float | None = None
+    long_rtt: float | None = None
+    accepted: int = 0
+    rejected: int = 0
+
+
+class ConcurrencyLease:
+    def __init__(
+        self,
+        limiter: "AdaptiveConcurrencyLimiter",
+        limit_stats: ConcurrencyLimitStats,
+    ) -> None:
+        self._limiter = limiter
+        self._limit_stats = limit_stats
+        self._started_at = time.monotonic()
+
+    def __enter__(self) -> "ConcurrencyLease":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        in_flight = self._limit_stats.in_flight
+        self._limit_stats.in_flight -= 1
+
+        # cancelled or crashed request says nothing about downstream latency
+        if exc_type is None:
+            rtt = time.monotonic() - self._started_at
+            self._limiter._update_limit(self._limit_stats, rtt, in_flight)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Gradient concurrency limit, as in Netflix concurrency-limits (Gradient2).
+
+    Limit grows while handler latency stays close to its long-term average
+    and shrinks when latency rises, i.e. when requests start to queue up
+    somewhere downstream.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        per_method: bool = False,
+        methods: Collection[str] | None = None,
+        smoothing: float = 0.2,
+        rtt_tolerance: float = 1.5,
+        long_window: int = 600,
+    ) -> None:
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "Concurrency limits must satisfy 0 < min <= initial <= max"
+            )
+
+        self._initial_limit = initial_limit
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._per_method = per_method
+        self._methods = methods
+        self._smoothing = smoothing
+        self._rtt_tolerance = rtt_tolerance
+        self._long_rtt_factor = 2 / (long_window + 1)
+
+        self.stats: dict[str, ConcurrencyLimitStats] = {}
+
+    def applies_to(self, method: str) -> bool:
+        return self._methods is None or method in self._methods
+
+    def try_acquire(self, method: str) -> ConcurrencyLease | None:
+        limit_key = method if self._per_method else GLOBAL_LIMIT_KEY
+        limit_stats = self.stats.get(limit_key)
+        if limit_stats is None:
+            limit_stats = ConcurrencyLimitStats(limit=self._initial_limit)
+            self.stats[limit_key] = limit_stats
+
+        if limit_stats.in_flight >= int(limit_stats.limit):
+            limit_stats.rejected += 1
+            return None
+
+        limit_stats.in_flight += 1
+        limit_stats.accepted += 1
+
+        return ConcurrencyLease(self, limit_stats)
+
+    def _update_limit(
+        self,
+        limit_stats: ConcurrencyLimitStats,
+        rtt: float,
+        in_flight: int,
+    ) -> None:
+        limit_stats.rtt = rtt
+        if limit_stats.long_rtt is None:
+            limit_stats.long_rtt = rtt
+        else:
+            limit_stats.long_rtt += (rtt - limit_stats.long_rtt) * self._long_rtt_factor
+
+        # let long-term average catch up after latency has recovered
+        if limit_stats.long_rtt > rtt * 2:
+            limit_stats.long_rtt *= 0.95
+
+        # limit can't be probed while it isn't used
+        if in_flight < limit_stats.limit / 2:
+            return
+
+        gradient = 1.0
+        if rtt > 0:
+            gradient = max(
+                0.5,
+                min(1.0, self._rtt_tolerance * limit_stats.long_rtt / rtt),
+            )
+
+        queue_size = math.sqrt(limit_stats.limit)
+        new_limit = limit_stats.limit * gradient + queue_size
+        new_limit = (
+            limit_stats.limit * (1 - self._smoothing) + new_limit * self._smoothing
+        )
+
+        limit_stats.limit = max(self._min_limit, min(self._max_limit, new_limit))
@@ -0,0 +1,136 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+from weakref import WeakKeyDictionary
+
+from pybotx_smartapp_rpc.smartapp import SmartApp
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+BatchFunction = Callable[
+    [list[KeyType]],
+    Awaitable[Sequence[ValueType] | Mapping[KeyType, ValueType]],
+]
+
+
+@dataclass
+class DataLoaderStats:
+    batches: int = 0
+    loaded_keys: int = 0
+    cache_hits: int = 0
+
+
+class DataLoader(Generic[KeyType, ValueType]):
+    """Batch `load` calls of all concurrently executing requests.
+
+    Keys requested during one event loop iteration (or `batch_window`
+    seconds) are loaded with single `batch_function` call. Batch function
+    should return values in order of passed keys or mapping from key to
+    value. Loaded values are cached for the rest of the request.
+    """
+
+    def __init__(
+        self,
+        batch_function: BatchFunction[KeyType, ValueType],
+        max_batch_size: int = 100,
+        batch_window: float = 0,
+    ) -> None:
+        self._batch_function = batch_function
+        self._max_batch_size = max_batch_size
+        self._batch_window = batch_window
+
+        self._pending: dict[KeyType, asyncio.Future[ValueType]] = {}
+        self._dispatch_handle: asyncio.Handle | None = None
+        self._batch_tasks: set[asyncio.Task[None]] = set()
+        self._request_caches: WeakKeyDictionary[
+            SmartApp,
+            dict[KeyType, asyncio.Future[ValueType]],
+        ] = WeakKeyDictionary()
+
+        self.stats = DataLoaderStats()
+
+    async def load(self, smartapp: SmartApp, key: KeyType) -> ValueType:
+        request_cache = self._request_caches.setdefault(smartapp, {})
+
+        future = request_cache.get(key)
+        if future is None:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._schedule(key)
+
+            request_cache[key] = future
+        else:
+            self.stats.cache_hits += 1
+
+        try:
+            # future is shared with other requests, so it mustn't be cancelled
+            return await asyncio.shield(future)
+        except Exception:
+            request_cache.pop(key, None)
+            raise
+
+    async def load_many(
+        self,
+        smartapp: SmartApp,
+        keys: Sequence[KeyType],
+    ) -> list[ValueType]:
+        return list(await asyncio.gather(*(self.load(smartapp, key) for key in keys)))
+
+    def _schedule(self, key: KeyType) -> "asyncio.Future[ValueType]":
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[ValueType] = loop.create_future()
+        self._pending[key] = future
+
+        if len(self._pending) >= self._max_batch_size:
+            self._dispatch()
+        elif self._dispatch_handle is None:
+            self._dispatch_handle = (
+                loop.call_later(self._batch_window, self._dispatch)
+                if self._batch_window
+                else loop.call_soon(self._dispatch)
+            )
+
+        return future
+
+    def _dispatch(self) -> None:
+        if self._dispatch_handle:
+            self._dispatch_handle.cancel()
+            self._dispatch_handle = None
+
+        batch, self._pending = self._pending, {}
+
+        batch_task = asyncio.create_task(self._load_batch(batch))
+        self._batch_tasks.add(batch_task)
+        batch_task.add_done_callback(self._batch_tasks.discard)
+
+    async def _load_batch(
+        self,
+        batch: dict[KeyType, "asyncio.Future[ValueType]"],
+    ) -> None:
+        keys = list(batch)
+        self.stats.batches += 1
+        self.stats.loaded_keys += len(keys)
+
+        try:
+            values = await self._batch_function(keys)
+            if not isinstance(values, Mapping) and len(values) != len(keys):
+                raise ValueError(
+                    f"Batch function returned {len(values)} values "
+                    f"for {len(keys)} keys",
+                )
+        except Exception as exc:
+            for future in batch.values():
+                future.set_exception(exc)
+
+            return
+
+        if not isinstance(values, Mapping):
+            values = dict(zip(keys, values))
+
+        for key, future in batch.items():
+            if key in values:
+                future.set_result(values[key])
+            else:
+                future.set_exception(KeyError(key))
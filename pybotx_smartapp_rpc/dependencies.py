@@ -0,0 +1,125 @@
+import asyncio
+import inspect
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pybotx_smartapp_rpc.smartapp import SmartApp
+
+DependencyCache = dict[Hashable, "asyncio.Future[Any]"]
+
+
+@dataclass(frozen=True)
+class Depends:
+    dependency: Callable[..., Any]
+    use_cache: bool = True
+
+
+@dataclass
+class Dependant:
+    call: Callable[..., Any]
+    use_cache: bool = True
+    pass_smartapp: bool = False
+    dependencies: dict[str, "Dependant"] = field(default_factory=dict)
+
+
+def is_dependency_parameter(parameter: inspect.Parameter) -> bool:
+    return isinstance(parameter.default, Depends)
+
+
+def get_handler_dependant(handler: Callable[..., Any]) -> Dependant | None:
+    dependencies = _get_sub_dependants(inspect.signature(handler))
+    if not dependencies:
+        return None
+
+    return Dependant(call=handler, dependencies=dependencies)
+
+
+async def solve_dependencies(
+    dependant: Dependant,
+    smartapp: SmartApp,
+    cache: DependencyCache,
+) -> dict[str, Any]:
+    names = list(dependant.dependencies)
+    if len(names) == 1:
+        value = await _resolve(dependant.dependencies[names[0]], smartapp, cache)
+        return {names[0]: value}
+
+    # independent dependencies are resolved concurrently
+    values = await asyncio.gather(
+        *(_resolve(sub, smartapp, cache) for sub in dependant.dependencies.values()),
+    )
+    return dict(zip(names, values))
+
+
+def discard_dependency_cache(cache: DependencyCache) -> None:
+    for future in cache.values():
+        if not future.done():
+            future.cancel()
+        elif not future.cancelled():
+            # mark exception as retrieved, it's already raised to the caller
+            future.exception()
+
+
+def _get_dependant(depends: Depends) -> Dependant:
+    signature = inspect.signature(depends.dependency)
+    other_parameters = [
+        parameter
+        for parameter in signature.parameters.values()
+        if not is_dependency_parameter(parameter)
+    ]
+    if len(other_parameters) > 1:
+        raise ValueError(
+            f"Dependency {depends.dependency.__name__} can accept only SmartApp "
+            "and parameters declared with Depends",
+        )
+
+    return Dependant(
+        call=depends.dependency,
+        use_cache=depends.use_cache,
+        pass_smartapp=bool(other_parameters),
+        dependencies=_get_sub_dependants(signature),
+    )
+
+
+def _get_sub_dependants(signature: inspect.Signature) -> dict[str, Dependant]:
+    return {
+        name: _get_dependant(parameter.default)
+        for name, parameter in signature.parameters.items()
+        if is_dependency_parameter(parameter)
+    }
+
+
+async def _resolve(
+    dependant: Dependant,
+    smartapp: SmartApp,
+    cache: DependencyCache,
+) -> Any:
+    if not dependant.use_cache:
+        return await _call(dependant, smartapp, cache)
+
+    # future is cached instead of value, so dependency required
+    # by concurrently resolved dependencies is called only once
+    future = cache.get(dependant.call)
+    if future is None:
+        future = asyncio.ensure_future(_call(dependant, smartapp, cache))
+        cache[dependant.call] = future
+
+    return await future
+
+
+async def _call(
+    dependant: Dependant, smartapp: SmartApp, cache: DependencyCache
+) -> Any:
+    kwargs = (
+        await solve_dependencies(dependant, smartapp, cache)
+        if dependant.dependencies
+        else {}
+    )
+    args = (smartapp,) if dependant.pass_smartapp else ()
+
+    value = dependant.call(*args, **kwargs)
+    if inspect.isawaitable(value):
+        value = await value
+
+    return value
@@ -0,0 +1,142 @@
+import asyncio
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from pybotx import Bot, BotAPISyncSmartAppEventResponse, SmartAppEvent
+
+from pybotx_smartapp_rpc.draining import ShutdownSummary
+from pybotx_smartapp_rpc.models.responses import (
+    RPCErrorResponse,
+    build_overloaded_error_response,
+    build_unknown_bot_error_response,
+)
+from pybotx_smartapp_rpc.rpc import (
+    SmartAppRPC,
+    build_sync_smartapp_event_response,
+    send_rpc_response,
+)
+
+
+@dataclass
+class BotDispatchStats:
+    handled: int = 0
+    in_flight: int = 0
+    rejected: int = 0
+
+
+@dataclass
+class DispatcherStats:
+    bots: dict[UUID, BotDispatchStats] = field(default_factory=dict)
+    unknown_bot: int = 0
+
+
+class SmartAppRPCDispatcher:
+    """Route events of several bots to their `SmartAppRPC` by bot id.
+
+    Apps built from the same routers share handlers and models, so each
+    bot adds only its own method table. `max_in_flight_per_bot` limits
+    concurrently handled events of every bot.
+    """
+
+    def __init__(
+        self,
+        apps: dict[UUID, SmartAppRPC],
+        max_in_flight_per_bot: int | None = None,
+    ) -> None:
+        self._apps = apps
+        self._max_in_flight_per_bot = max_in_flight_per_bot
+
+        self.stats = DispatcherStats(
+            bots={bot_id: BotDispatchStats() for bot_id in apps},
+        )
+
+    @property
+    def apps(self) -> dict[UUID, SmartAppRPC]:
+        return self._apps
+
+    def get_app(self, bot_id: UUID) -> SmartAppRPC | None:
+        return self._apps.get(bot_id)
+
+    async def handle_smartapp_event(self, event: SmartAppEvent, bot: Bot) -> None:
+        smartapp_rpc = self._apps.get(event.bot.id)
+        rejection_response = self._admit(event.bot.id, smartapp_rpc)
+        if rejection_response:
+            await send_rpc_response(event, bot, rejection_response)
+            return
+
+        assert smartapp_rpc is not None
+        bot_stats = self.stats.bots[event.bot.id]
+        bot_stats.in_flight += 1
+        try:
+            await smartapp_rpc.handle_smartapp_event(event, bot)
+        finally:
+            bot_stats.in_flight -= 1
+            bot_stats.handled += 1
+
+    async def handle_sync_smartapp_event(
+        self,
+        event: SmartAppEvent,
+        bot: Bot,
+    ) -> BotAPISyncSmartAppEventResponse:
+        smartapp_rpc = self._apps.get(event.bot.id)
+        rejection_response = self._admit(event.bot.id, smartapp_rpc)
+        if rejection_response:
+            return build_sync_smartapp_event_response(rejection_response)
+
+        assert smartapp_rpc is not None
+        bot_stats = self.stats.bots[event.bot.id]
+        bot_stats.in_flight += 1
+        try:
+            return await smartapp_rpc.handle_sync_smartapp_event(event, bot)
+        finally:
+            bot_stats.in_flight -= 1
+            bot_stats.handled += 1
+
+    async def startup(self) -> None:
+        for smartapp_rpc in self._unique_apps():
+            await smartapp_rpc.startup()
+
+    async def shutdown(self, timeout: float = 10) -> dict[UUID, ShutdownSummary]:
+        # app serving several bots is shut down once
+        smartapp_rpcs = self._unique_apps()
+        # admission is stopped on every app before any of them is drained,
+        # then apps are drained together, so timeout is shared by all of them
+        for smartapp_rpc in smartapp_rpcs:
+            smartapp_rpc.request_drainer.start_draining()
+
+        shutdown_summaries = await asyncio.gather(
+            *(smartapp_rpc.shutdown(timeout) for smartapp_rpc in smartapp_rpcs),
+        )
+        summaries = {
+            id(smartapp_rpc): shutdown_summary
+            for smartapp_rpc, shutdown_summary in zip(
+                smartapp_rpcs,
+                shutdown_summaries,
+            )
+        }
+        return {
+            bot_id: summaries[id(smartapp_rpc)]
+            for bot_id, smartapp_rpc in self._apps.items()
+        }
+
+    def _admit(
+        self,
+        bot_id: UUID,
+        smartapp_rpc: SmartAppRPC | None,
+    ) -> RPCErrorResponse | None:
+        if smartapp_rpc is None:
+            self.stats.unknown_bot += 1
+            return build_unknown_bot_error_response()
+
+        bot_stats = self.stats.bots[bot_id]
+        if (
+            self._max_in_flight_per_bot is not None
+            and bot_stats.in_flight >= self._max_in_flight_per_bot
+        ):
+            bot_stats.rejected += 1
+            return build_overloaded_error_response()
+
+        return None
+
+    def _unique_apps(self) -> list[SmartAppRPC]:
+        return list({id(app): app for app in self._apps.values()}.values())
@@ -0,0 +1,103 @@
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class ShutdownSummary:
+    completed_requests: int = 0
+    cancelled_requests: int = 0
+    completed_background_tasks: int = 0
+    cancelled_background_tasks: int = 0
+
+
+@dataclass
+class RequestDrainerStats:
+    rejected: int = 0
+
+
+class RequestDrainer:
+    def __init__(self) -> None:
+        self._in_flight: dict[asyncio.Task[object], int] = {}
+        self._draining = False
+        self._drained: asyncio.Future[None] | None = None
+
+        self.stats = RequestDrainerStats()
+
+    @property
+    def draining(self) -> bool:
+        return self._draining
+
+    @property
+    def in_flight_count(self) -> int:
+        # nested tracking in one task is the same request
+        return len(self._in_flight)
+
+    def start_draining(self) -> None:
+        self._draining = True
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        task = asyncio.current_task()
+        assert task is not None
+
+        self._in_flight[task] = self._in_flight.get(task, 0) + 1
+        try:
+            yield
+        finally:
+            self._in_flight[task] -= 1
+            if not self._in_flight[task]:
+                del self._in_flight[task]
+
+            if not self._in_flight and self._drained and not self._drained.done():
+                self._drained.set_result(None)
+
+    async def drain(
+        self,
+        timeout: float,
+        *background_tasks: set["asyncio.Task[None]"],
+    ) -> ShutdownSummary:
+        # new requests are rejected from now on, so in-flight set only shrinks
+        self.start_draining()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        requests_count = self.in_flight_count
+        drained_tasks: set[asyncio.Task[None]] = set().union(*background_tasks)
+
+        await self._wait_requests(timeout)
+        # in-flight requests could create new background tasks
+        drained_tasks.update(*background_tasks)
+        pending_tasks = {task for task in drained_tasks if not task.done()}
+        if pending_tasks:
+            _, pending_tasks = await asyncio.wait(
+                pending_tasks,
+                timeout=max(deadline - loop.time(), 0),
+            )
+
+        summary = ShutdownSummary(
+            cancelled_requests=self.in_flight_count,
+            cancelled_background_tasks=len(pending_tasks),
+        )
+        summary.completed_requests = requests_count - summary.cancelled_requests
+        summary.completed_background_tasks = (
+            len(drained_tasks) - summary.cancelled_background_tasks
+        )
+
+        for task in [*self._in_flight, *pending_tasks]:
+            task.cancel()
+
+        # waits for cleanup of cancelled requests and tasks
+        await self._wait_requests(None)
+        if pending_tasks:
+            await asyncio.wait(pending_tasks)
+
+        return summary
+
+    async def _wait_requests(self, timeout: float | None) -> None:
+        if not self._in_flight:
+            return
+
+        self._drained = asyncio.get_running_loop().create_future()
+        await asyncio.wait({self._drained}, timeout=timeout)
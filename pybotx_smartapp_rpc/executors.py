@@ -0,0 +1,101 @@
+import asyncio
+import contextvars
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Literal
+
+ExecutorType = Literal["thread", "process"] | Executor
+
+
+@dataclass
+class ExecutorStats:
+    max_workers: int | None = None
+    in_flight: int = 0
+    completed: int = 0
+
+    @property
+    def queued(self) -> int:
+        if self.max_workers is None:
+            return 0
+
+        return max(self.in_flight - self.max_workers, 0)
+
+
+class HandlerExecutors:
+    def __init__(
+        self,
+        thread_pool_size: int | None = None,
+        process_pool_size: int | None = None,
+    ) -> None:
+        cpu_count = os.cpu_count() or 1
+        self._thread_pool_size = thread_pool_size or min(32, cpu_count + 4)
+        self._process_pool_size = process_pool_size or cpu_count
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+
+        self.stats: dict[str, ExecutorStats] = {}
+
+    async def run(
+        self,
+        executor_type: ExecutorType,
+        func: Callable[..., Any],
+        *args: Any,
+    ) -> Any:
+        executor, stats = self._get_executor(executor_type)
+        if executor_type == "thread":
+            func = partial(contextvars.copy_context().run, func)
+
+        stats.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor,
+                func,
+                *args,
+            )
+        finally:
+            stats.in_flight -= 1
+            stats.completed += 1
+
+    def shutdown(self) -> None:
+        if self._thread_pool:
+            self._thread_pool.shutdown(wait=False)
+            self._thread_pool = None
+
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
+
+    def _get_executor(
+        self,
+        executor_type: ExecutorType,
+    ) -> tuple[Executor, ExecutorStats]:
+        if isinstance(executor_type, Executor):
+            return executor_type, self._get_stats("custom", None)
+
+        if executor_type == "process":
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self._process_pool_size,
+                )
+
+            return self._process_pool, self._get_stats(
+                "process",
+                self._process_pool_size,
+            )
+
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self._thread_pool_size,
+                thread_name_prefix="smartapp-rpc",
+            )
+
+        return self._thread_pool, self._get_stats("thread", self._thread_pool_size)
+
+    def _get_stats(self, name: str, max_workers: int | None) -> ExecutorStats:
+        if name not in self.stats:
+            self.stats[name] = ExecutorStats(max_workers=max_workers)
+
+        return self.stats[name]
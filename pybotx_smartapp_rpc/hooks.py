@@ -0,0 +1,37 @@
+import asyncio
+
+from pybotx_smartapp_rpc.models.responses import RPCErrorResponse
+from pybotx_smartapp_rpc.smartapp import SmartApp
+from pybotx_smartapp_rpc.typing import BeforeHook, RPCArgsBaseModel
+
+
+async def run_before_hooks(
+    before_hooks: list[BeforeHook],
+    smartapp: SmartApp,
+    rpc_arguments: RPCArgsBaseModel,
+) -> RPCErrorResponse | None:
+    if len(before_hooks) == 1:
+        return await before_hooks[0](smartapp, rpc_arguments)
+
+    hook_tasks = [
+        asyncio.ensure_future(before_hook(smartapp, rpc_arguments))
+        for before_hook in before_hooks
+    ]
+    try:
+        for hook_task in asyncio.as_completed(hook_tasks):
+            error_response = await hook_task
+            if error_response is not None:
+                return error_response
+    finally:
+        # first error response or exception makes other hooks useless
+        for pending_task in hook_tasks:
+            pending_task.cancel()
+
+        # errors of other failed hooks are retrieved,
+        # so they aren't reported as never retrieved
+        await asyncio.wait(hook_tasks)
+        for hook_task in hook_tasks:
+            if not hook_task.cancelled():
+                hook_task.exception()
+
+    return None
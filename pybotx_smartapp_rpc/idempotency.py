@@ -0,0 +1,115 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from uuid import UUID
+
+from pybotx_smartapp_rpc.models.responses import is_admission_error_response
+from pybotx_smartapp_rpc.typing import RPCResponse
+
+IdempotencyKey = tuple[UUID, UUID]
+
+
+@dataclass
+class IdempotencyCacheStats:
+    executed: int = 0
+    reused: int = 0
+    joined: int = 0
+    evicted: int = 0
+
+
+@dataclass
+class _IdempotencyEntry:
+    response: "asyncio.Future[RPCResponse]"
+    method: str | None = None
+    expires_at: float | None = None
+
+
+class IdempotencyCache:
+    def __init__(self, ttl: float = 300, max_size: int = 10_000) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[IdempotencyKey, _IdempotencyEntry] = OrderedDict()
+
+        self.stats = IdempotencyCacheStats()
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    async def run(
+        self,
+        key: IdempotencyKey,
+        perform: Callable[[], Awaitable[RPCResponse]],
+        method: str | None = None,
+    ) -> RPCResponse:
+        while True:
+            entry = self._get_entry(key)
+            # ref reused for other method is a new request
+            if entry is None or entry.method != method:
+                return await self._perform(key, perform, method)
+
+            if entry.response.done():
+                self.stats.reused += 1
+                return entry.response.result()
+
+            self.stats.joined += 1
+            try:
+                return await asyncio.shield(entry.response)
+            except asyncio.CancelledError:
+                # original execution was cancelled or failed, so duplicate
+                # performs request itself instead of losing it
+                if not entry.response.cancelled():
+                    raise
+
+    def invalidate(self, key: IdempotencyKey) -> None:
+        self._entries.pop(key, None)
+
+    async def _perform(
+        self,
+        key: IdempotencyKey,
+        perform: Callable[[], Awaitable[RPCResponse]],
+        method: str | None,
+    ) -> RPCResponse:
+        entry = _IdempotencyEntry(asyncio.get_running_loop().create_future(), method)
+        self._store_entry(key, entry)
+        self.stats.executed += 1
+
+        try:
+            rpc_response = await perform()
+        except BaseException:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+            entry.response.cancel()
+            raise
+
+        # joined duplicates get the same response, but only handler results
+        # are stored, so rejected request can be retried with the same ref
+        entry.response.set_result(rpc_response)
+        if is_admission_error_response(rpc_response):
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        else:
+            entry.expires_at = time.monotonic() + self._ttl
+
+        return rpc_response
+
+    def _get_entry(self, key: IdempotencyKey) -> _IdempotencyEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store_entry(self, key: IdempotencyKey, entry: _IdempotencyEntry) -> None:
+        self._entries[key] = entry
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.stats.evicted += 1
@@ -0,0 +1,98 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, AsyncExitStack
+from typing import Any, Generic, TypeVar
+
+from loguru import logger
+
+ResourceType = TypeVar("ResourceType")
+
+LifespanHook = Callable[[], Awaitable[None]]
+
+
+class Resource(Generic[ResourceType]):
+    """App-scoped object created on startup and disposed on shutdown.
+
+    `factory` returns async context manager, so resource is disposed
+    by exiting it (e.g. `aiohttp.ClientSession` or function decorated
+    with `contextlib.asynccontextmanager`).
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], AbstractAsyncContextManager[ResourceType]],
+        warm_up: Callable[[ResourceType], Awaitable[None]] | None = None,
+        name: str | None = None,
+    ) -> None:
+        self.factory = factory
+        self.warm_up = warm_up
+        self.name = name or getattr(factory, "__name__", repr(factory))
+
+
+class Lifespan:
+    def __init__(
+        self,
+        resources: list[Resource[Any]] | None = None,
+        on_startup: list[LifespanHook] | None = None,
+        on_shutdown: list[LifespanHook] | None = None,
+    ) -> None:
+        self._resources = resources or []
+        self._on_startup = on_startup or []
+        self._on_shutdown = on_shutdown or []
+
+        self._values: dict[Resource[Any], Any] = {}
+        self._exit_stack: AsyncExitStack | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._exit_stack is not None
+
+    def get(self, resource: Resource[ResourceType]) -> ResourceType:
+        try:
+            return self._values[resource]
+        except KeyError:
+            raise RuntimeError(f"Resource {resource.name} is not started") from None
+
+    async def startup(self) -> None:
+        if self._exit_stack is not None:
+            raise RuntimeError("Lifespan is already started")
+
+        exit_stack = AsyncExitStack()
+        try:
+            for resource in self._resources:
+                self._values[resource] = await exit_stack.enter_async_context(
+                    resource.factory(),
+                )
+
+            # resources are warmed up before first request, not during it
+            await asyncio.gather(
+                *(
+                    resource.warm_up(self._values[resource])
+                    for resource in self._resources
+                    if resource.warm_up
+                ),
+            )
+
+            for hook in self._on_startup:
+                await hook()
+        except BaseException:
+            self._values.clear()
+            await exit_stack.aclose()
+            raise
+
+        self._exit_stack = exit_stack
+
+    async def shutdown(self) -> None:
+        if self._exit_stack is None:
+            return
+
+        for hook in self._on_shutdown:
+            try:
+                await hook()
+            except Exception as exc:
+                logger.exception(exc)
+
+        exit_stack, self._exit_stack = self._exit_stack, None
+        self._values.clear()
+        # resources are disposed in reverse order of creation
+        await exit_stack.aclose()
@@ -0,0 +1,85 @@
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from pybotx_smartapp_rpc.models.method import RPCPriority
+from pybotx_smartapp_rpc.models.request import RPCRequest
+from pybotx_smartapp_rpc.models.responses import (
+    RPCErrorResponse,
+    build_deadline_exceeded_error_response,
+    build_overloaded_error_response,
+)
+from pybotx_smartapp_rpc.smartapp import SmartApp
+
+# share of max queue depth at which methods of given priority start to be shed
+DEFAULT_PRIORITY_THRESHOLDS: Mapping[RPCPriority, float] = {
+    RPCPriority.INTERACTIVE: 1.0,
+    RPCPriority.NORMAL: 0.8,
+    RPCPriority.BACKGROUND: 0.5,
+}
+
+
+@dataclass
+class LoadShedderStats:
+    expired: dict[str, int] = field(default_factory=dict)
+    shed: dict[str, int] = field(default_factory=dict)
+
+
+def get_client_deadline(smartapp: SmartApp, rpc_request: RPCRequest) -> float | None:
+    if rpc_request.deadline is not None:
+        return rpc_request.deadline
+
+    if smartapp.event and smartapp.event.opts:
+        opts_deadline = smartapp.event.opts.get("deadline")
+        if isinstance(opts_deadline, int | float):
+            return float(opts_deadline)
+
+    return None
+
+
+class LoadShedder:
+    def __init__(
+        self,
+        max_queue_depth: int | None = None,
+        priority_thresholds: Mapping[RPCPriority, float] | None = None,
+    ) -> None:
+        self._max_queue_depth = max_queue_depth
+        self._priority_thresholds = {
+            **DEFAULT_PRIORITY_THRESHOLDS,
+            **(priority_thresholds or {}),
+        }
+        self._queue_depth = 0
+
+        self.stats = LoadShedderStats()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue_depth
+
+    def admit(
+        self,
+        method: str,
+        priority: RPCPriority,
+        deadline: float | None,
+    ) -> RPCErrorResponse | None:
+        if self.is_expired(method, deadline):
+            return build_deadline_exceeded_error_response()
+
+        if self._max_queue_depth is not None:
+            threshold = self._max_queue_depth * self._priority_thresholds[priority]
+            if self._queue_depth >= threshold:
+                self.stats.shed[method] = self.stats.shed.get(method, 0) + 1
+                return build_overloaded_error_response()
+
+        self._queue_depth += 1
+        return None
+
+    def is_expired(self, method: str, deadline: float | None) -> bool:
+        if deadline is None or deadline > time.time():
+            return False
+
+        self.stats.expired[method] = self.stats.expired.get(method, 0) + 1
+        return True
+
+    def release(self) -> None:
+        self._queue_depth -= 1
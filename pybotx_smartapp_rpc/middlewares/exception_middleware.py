@@ -1,4 +1,5 @@
 from pybotx_smartapp_rpc.exception_handlers import default_exception_handler
+from pybotx_smartapp_rpc.models.responses import RPCErrorResponse
 from pybotx_smartapp_rpc.smartapp import SmartApp
 from pybotx_smartapp_rpc.typing import (
     ExceptionHandler,
@@ -25,14 +26,21 @@ class ExceptionMiddleware:
         try:
             rpc_result = await call_next(smartapp, rpc_arguments)
         except Exception as exc:
-            exception_handler = self._get_exception_handler(exc)
-            try:  # noqa: WPS505
-                return await exception_handler(exc, smartapp)
-            except Exception as error_handler_exc:
-                return await default_exception_handler(error_handler_exc, smartapp)
+            return await self.handle_exception(exc, smartapp)
 
         return rpc_result
 
+    async def handle_exception(
+        self,
+        exc: Exception,
+        smartapp: SmartApp,
+    ) -> RPCErrorResponse:
+        exception_handler = self._get_exception_handler(exc)
+        try:  # noqa: WPS505
+            return await exception_handler(exc, smartapp)
+        except Exception as error_handler_exc:
+            return await default_exception_handler(error_handler_exc, smartapp)
+
     def _get_exception_handler(self, exc: Exception) -> ExceptionHandler:
         for exc_cls in type(exc).mro():
             handler = self._exception_handlers.get(exc_cls)
@@ -0,0 +1,75 @@
+from collections.abc import Callable
+from enum import Enum
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING
+
+from pybotx_smartapp_rpc.smartapp import SmartApp
+from pybotx_smartapp_rpc.typing import (
+    HandlerWithArgs,
+    Middleware,
+    RPCArgsBaseModel,
+    RPCResponse,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pybotx_smartapp_rpc.models.method import RPCMethod
+
+MethodPredicate = Callable[["RPCMethod"], bool]
+
+
+class ScopedMiddleware:
+    """Middleware that is added only to chains of matching methods.
+
+    Method matches if it has any of `tags`, its name matches any of
+    `methods` glob patterns and `predicate` returns True. Omitted
+    filters match any method.
+    """
+
+    def __init__(
+        self,
+        middleware: Middleware,
+        tags: list[str | Enum] | None = None,
+        methods: list[str] | None = None,
+        predicate: MethodPredicate | None = None,
+    ) -> None:
+        self.middleware = middleware
+        self.tags = tags
+        self.methods = methods
+        self.predicate = predicate
+
+    async def __call__(
+        self,
+        smartapp: SmartApp,
+        rpc_arguments: RPCArgsBaseModel,
+        call_next: HandlerWithArgs,
+    ) -> RPCResponse:
+        return await self.middleware(smartapp, rpc_arguments, call_next)
+
+    def applies_to(self, rpc_method_name: str, rpc_method: "RPCMethod") -> bool:
+        if self.tags is not None and not any(
+            tag in rpc_method.tags for tag in self.tags
+        ):
+            return False
+
+        if self.methods is not None and not any(
+            fnmatchcase(rpc_method_name, pattern) for pattern in self.methods
+        ):
+            return False
+
+        return self.predicate is None or self.predicate(rpc_method)
+
+
+def filter_middlewares(
+    middlewares: list[Middleware],
+    rpc_method_name: str,
+    rpc_method: "RPCMethod",
+) -> list[Middleware]:
+    # scoped middlewares are unwrapped, so they don't add extra call to chain
+    return [
+        middleware.middleware
+        if isinstance(middleware, ScopedMiddleware)
+        else middleware
+        for middleware in middlewares
+        if not isinstance(middleware, ScopedMiddleware)
+        or middleware.applies_to(rpc_method_name, rpc_method)
+    ]
@@ -7,3 +7,33 @@ class RPCError(BaseModel):
     reason: str
     id: str
     meta: dict[str, Any] = Field(default_factory=dict)
+
+
+class RateLimitedError(RPCError):
+    id: str = "RATE_LIMITED"
+    reason: str = "Rate limit exceeded"
+
+
+class OverloadedError(RPCError):
+    id: str = "OVERLOADED"
+    reason: str = "Server is overloaded, try again later"
+
+
+class DeadlineExceededError(RPCError):
+    id: str = "DEADLINE_EXCEEDED"
+    reason: str = "Request deadline exceeded"
+
+
+class CancelledCallError(RPCError):
+    id: str = "CANCELLED"
+    reason: str = "Request was cancelled"
+
+
+class ShuttingDownError(RPCError):
+    id: str = "SHUTTING_DOWN"
+    reason: str = "Server is shutting down, try again later"
+
+
+class UnknownBotError(RPCError):
+    id: str = "UNKNOWN_BOT"
+    reason: str = "Bot is not served by this SmartApp"
@@ -1,12 +1,26 @@
+import inspect
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, IntEnum
 from functools import partial
 from typing import Any
 
+from pybotx_smartapp_rpc.cancellation import SupersedeKeyFunc
+from pybotx_smartapp_rpc.dependencies import (
+    Dependant,
+    DependencyCache,
+    discard_dependency_cache,
+    solve_dependencies,
+)
+from pybotx_smartapp_rpc.empty_args import EmptyArgs
+from pybotx_smartapp_rpc.executors import ExecutorType
+from pybotx_smartapp_rpc.hooks import run_before_hooks
 from pybotx_smartapp_rpc.models.errors import RPCError
-from pybotx_smartapp_rpc.smartapp import SmartApp
+from pybotx_smartapp_rpc.ordering import OrderingKeyFunc
+from pybotx_smartapp_rpc.smartapp import SmartApp, SmartAppContext
 from pybotx_smartapp_rpc.typing import (
-    Handler,
+    AnyHandler,
+    BeforeHook,
     HandlerWithArgs,
     Middleware,
     RPCArgsBaseModel,
@@ -14,9 +28,15 @@ from pybotx_smartapp_rpc.typing import (
 )
 
 
-@dataclass
+class RPCPriority(IntEnum):
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+@dataclass(slots=True)
 class RPCMethod:
-    handler: Handler
+    handler: AnyHandler
     middlewares: list[Middleware]
     response_type: Any
     arguments_model: type[RPCArgsBaseModel] | None = None
@@ -24,18 +44,121 @@ class RPCMethod:
     errors: dict[str, dict[str, str | None]] = field(default_factory=dict)
     errors_models: dict[str, type[RPCError]] = field(default_factory=dict)
     include_in_schema: bool = True
+    sync_budget: float | None = None
+    executor: ExecutorType | None = None
+    cost: float = 1
+    priority: RPCPriority = RPCPriority.NORMAL
+    ordering_key: OrderingKeyFunc | None = None
+    supersede: bool = False
+    supersede_key: SupersedeKeyFunc | None = None
+    dependant: Dependant | None = None
+    before_hooks: list[BeforeHook] = field(default_factory=list)
 
     async def __call__(
         self,
         smartapp: SmartApp,
         rpc_args: RPCArgsBaseModel,
+        skip_middlewares: list[Middleware] | None = None,
     ) -> RPCResponse:
         # loop in reverse order
         # if middlewares = [m1, m2] and method.middlewares = [m3, m4]
         # then stack will be m1(m2(m3(m4(handler()))))
-        handler: HandlerWithArgs = self.handler  # type: ignore
-        for middleware in self.middlewares[::-1]:
+        handler: HandlerWithArgs
+        if self.dependant is not None:
+            handler = self._call_handler_with_dependencies
+        elif self.executor is None:
+            handler = self.handler  # type: ignore
+        else:
+            handler = self._call_handler_in_executor
+
+        if self.before_hooks:
+            handler = partial(self._call_handler_after_hooks, handler)
+
+        middlewares = self.middlewares
+        if skip_middlewares:
+            middlewares = [
+                middleware
+                for middleware in middlewares
+                if middleware not in skip_middlewares
+            ]
+
+        for middleware in middlewares[::-1]:
             part = partial(middleware, call_next=handler)  # type: ignore
             handler = part
 
         return await handler(smartapp, rpc_args)
+
+    async def _call_handler_after_hooks(
+        self,
+        call_handler: HandlerWithArgs,
+        smartapp: SmartApp,
+        *rpc_args: RPCArgsBaseModel,
+    ) -> RPCResponse:
+        # hooks are independent, so they are run concurrently
+        # instead of nesting them like middlewares
+        error_response = await run_before_hooks(
+            self.before_hooks,
+            smartapp,
+            rpc_args[0] if rpc_args else EmptyArgs(),
+        )
+        if error_response is not None:
+            return error_response
+
+        return await call_handler(smartapp, *rpc_args)
+
+    async def _call_handler_with_dependencies(
+        self,
+        smartapp: SmartApp,
+        *rpc_args: RPCArgsBaseModel,
+    ) -> RPCResponse:
+        assert self.dependant is not None
+        cache: DependencyCache = {}
+        try:
+            dependencies = await solve_dependencies(self.dependant, smartapp, cache)
+        except BaseException:
+            discard_dependency_cache(cache)
+            raise
+
+        if self.executor is None:
+            return await self.handler(  # type: ignore
+                smartapp,
+                *rpc_args,
+                **dependencies,
+            )
+
+        return await self._call_handler_in_executor(
+            smartapp,
+            *rpc_args,
+            **dependencies,
+        )
+
+    async def _call_handler_in_executor(
+        self,
+        smartapp: SmartApp,
+        *rpc_args: RPCArgsBaseModel,
+        **dependencies: Any,
+    ) -> RPCResponse:
+        if not smartapp.smartapp_rpc:
+            raise RuntimeError(
+                "Handlers in executors can be called only by SmartAppRPC"
+            )
+
+        assert self.executor is not None
+        if self.executor == "process" or isinstance(self.executor, ProcessPoolExecutor):
+            # SmartApp holds bot and event loop objects, so it can't be pickled
+            handler_context: SmartApp | SmartAppContext = smartapp.context
+        else:
+            handler_context = smartapp
+
+        rpc_response = await smartapp.smartapp_rpc.executors.run(
+            self.executor,
+            partial(self.handler, **dependencies) if dependencies else self.handler,
+            handler_context,
+            *rpc_args,
+        )
+        # sync function can return coroutine of async implementation,
+        # it is created in executor but awaited in event loop
+        if inspect.isawaitable(rpc_response):
+            return await rpc_response
+
+        return rpc_response
@@ -11,3 +11,4 @@ class RPCRequest(BaseModel):
     method: str
     type: Literal["smartapp_rpc"]
     params: dict[str, Any] = Field(default_factory=dict)
+    deadline: float | None = None
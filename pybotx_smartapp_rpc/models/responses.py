@@ -5,7 +5,15 @@ from typing import Any, Generic, TypeVar
 from pybotx import File
 from pydantic import BaseModel, ConfigDict, ValidationError
 
-from pybotx_smartapp_rpc.models.errors import RPCError
+from pybotx_smartapp_rpc.models.errors import (
+    CancelledCallError,
+    DeadlineExceededError,
+    OverloadedError,
+    RateLimitedError,
+    RPCError,
+    ShuttingDownError,
+    UnknownBotError,
+)
 
 _JsonableResultType = float | int | str | bool | list[Any] | dict[str, Any]
 JsonableResultType = TypeVar("JsonableResultType", bound=_JsonableResultType)
@@ -13,6 +21,15 @@ JsonableResultType = TypeVar("JsonableResultType", bound=_JsonableResultType)
 _ResultType = BaseModel | _JsonableResultType
 ResultType = TypeVar("ResultType", bound=_ResultType)
 
+# request was rejected or dropped without getting a result from handler
+_ADMISSION_ERRORS = (
+    RateLimitedError,
+    OverloadedError,
+    DeadlineExceededError,
+    CancelledCallError,
+    ShuttingDownError,
+)
+
 
 class RPCResponseBaseModel(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -123,3 +140,39 @@ def build_method_not_found_error_response(
             ),
         ],
     )
+
+
+def build_rate_limited_error_response(
+    retry_after: float,
+) -> RPCErrorResponse:
+    return RPCErrorResponse(
+        errors=[RateLimitedError(meta={"retry_after": retry_after})],
+    )
+
+
+def build_overloaded_error_response() -> RPCErrorResponse:
+    return RPCErrorResponse(errors=[OverloadedError()])
+
+
+def build_deadline_exceeded_error_response() -> RPCErrorResponse:
+    return RPCErrorResponse(errors=[DeadlineExceededError()])
+
+
+def build_shutting_down_error_response() -> RPCErrorResponse:
+    return RPCErrorResponse(errors=[ShuttingDownError()])
+
+
+def build_unknown_bot_error_response() -> RPCErrorResponse:
+    return RPCErrorResponse(errors=[UnknownBotError()])
+
+
+def build_cancelled_error_response(reason: str | None) -> RPCErrorResponse:
+    return RPCErrorResponse(
+        errors=[CancelledCallError(meta={"cancel_reason": reason} if reason else {})],
+    )
+
+
+def is_admission_error_response(rpc_response: Any) -> bool:
+    return isinstance(rpc_response, RPCErrorResponse) and any(
+        isinstance(error, _ADMISSION_ERRORS) for error in rpc_response.errors
+    )
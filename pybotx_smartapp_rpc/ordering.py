@@ -0,0 +1,56 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable, Hashable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from pybotx_smartapp_rpc.smartapp import SmartApp
+
+OrderingKeyFunc = Callable[[SmartApp], Hashable]
+
+
+def chat_ordering_key(smartapp: SmartApp) -> Hashable:
+    return smartapp.bot_id, smartapp.chat_id
+
+
+@dataclass
+class OrderedExecutionStats:
+    executed: int = 0
+    waited: int = 0
+
+
+@dataclass
+class _KeyQueue:
+    lock: asyncio.Lock
+    users: int = 0
+
+
+class OrderedExecution:
+    def __init__(self) -> None:
+        self._queues: dict[Hashable, _KeyQueue] = {}
+
+        self.stats = OrderedExecutionStats()
+
+    @property
+    def keys_count(self) -> int:
+        return len(self._queues)
+
+    @asynccontextmanager
+    async def run_in_order(self, key: Hashable) -> AsyncIterator[None]:
+        key_queue = self._queues.get(key)
+        if key_queue is None:
+            key_queue = _KeyQueue(asyncio.Lock())
+            self._queues[key] = key_queue
+
+        if key_queue.lock.locked():
+            self.stats.waited += 1
+
+        key_queue.users += 1
+        try:
+            # asyncio.Lock wakes up waiters in FIFO order
+            async with key_queue.lock:
+                self.stats.executed += 1
+                yield
+        finally:
+            key_queue.users -= 1
+            if not key_queue.users:
+                del self._queues[key]
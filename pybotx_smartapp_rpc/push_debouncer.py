@@ -0,0 +1,115 @@
+import asyncio
+from dataclasses import dataclass
+from uuid import UUID
+
+from loguru import logger
+from pybotx import Bot
+from pybotx.missing import Missing, Undefined
+
+
+@dataclass
+class PushDebouncerStats:
+    sent: int = 0
+    suppressed: int = 0
+    failed: int = 0
+
+
+@dataclass
+class _PendingPush:
+    bot: Bot
+    counter: int
+    body: Missing[str]
+
+
+class PushDebouncer:
+    def __init__(self, interval: float = 1.0) -> None:
+        if interval <= 0:
+            raise ValueError("Push debounce interval must be positive")
+
+        self._interval = interval
+        self._pending: dict[tuple[UUID, UUID], _PendingPush] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+        self._flushing = False
+        self._closed = False
+
+        self.stats = PushDebouncerStats()
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def push(
+        self,
+        bot: Bot,
+        bot_id: UUID,
+        chat_id: UUID,
+        counter: int,
+        body: Missing[str] = Undefined,
+    ) -> None:
+        if self._closed:
+            raise RuntimeError("Push debouncer is closed")
+
+        key = (bot_id, chat_id)
+        if key in self._pending:
+            self.stats.suppressed += 1
+
+        self._pending[key] = _PendingPush(bot=bot, counter=counter, body=body)
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        await asyncio.gather(
+            *(
+                self._send(bot_id, chat_id, push)
+                for (bot_id, chat_id), push in pending.items()
+            ),
+        )
+
+    async def close(self) -> None:
+        self._closed = True
+        flush_task = self._flush_task
+        if flush_task is not None:
+            # pushes that are already being sent aren't lost
+            if not self._flushing:
+                flush_task.cancel()
+
+            await asyncio.wait({flush_task})
+
+        await self.flush()
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self._interval)
+            self._flushing = True
+            await self.flush()
+        finally:
+            self._flush_task = None
+            self._flushing = False
+
+        # pushes added during flush are sent after next interval
+        if self._pending and not self._closed:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _send(self, bot_id: UUID, chat_id: UUID, push: _PendingPush) -> None:
+        try:
+            await push.bot.send_smartapp_notification(
+                bot_id=bot_id,
+                chat_id=chat_id,
+                smartapp_counter=push.counter,
+                body=push.body,
+            )
+        except Exception as exc:
+            self.stats.failed += 1
+            logger.exception(exc)
+        else:
+            self.stats.sent += 1
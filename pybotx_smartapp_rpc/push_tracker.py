@@ -0,0 +1,128 @@
+import asyncio
+from collections.abc import Callable, Generator, Iterable
+from typing import Any
+from uuid import UUID
+
+from pybotx import (
+    BotShuttingDownError,
+    BotXMethodCallback,
+    BotXMethodCallbackNotFoundError,
+    CallbackNotReceivedError,
+    CallbackRepoProto,
+)
+
+
+class PushHandle:
+    def __init__(
+        self,
+        sync_id: UUID,
+        future: "asyncio.Future[BotXMethodCallback]",
+    ) -> None:
+        self.sync_id = sync_id
+        self._future = future
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self) -> BotXMethodCallback:
+        return self._future.result()
+
+    def add_done_callback(self, callback: Callable[["PushHandle"], None]) -> None:
+        self._future.add_done_callback(lambda _: callback(self))
+
+    def __await__(self) -> Generator[Any, None, BotXMethodCallback]:
+        return asyncio.shield(self._future).__await__()
+
+
+class PushTracker(CallbackRepoProto):
+    def __init__(self) -> None:
+        self._callback_futures: dict[UUID, asyncio.Future[BotXMethodCallback]] = {}
+
+    @property
+    def pending_count(self) -> int:
+        return sum(not future.done() for future in self._callback_futures.values())
+
+    def track(self, sync_id: UUID) -> PushHandle:
+        return PushHandle(sync_id, self._get_botx_method_callback(sync_id))
+
+    async def wait(
+        self,
+        handles: Iterable[PushHandle],
+        timeout: float | None = None,
+    ) -> tuple[set[PushHandle], set[PushHandle]]:
+        handles_by_future = {handle._future: handle for handle in handles}
+        if not handles_by_future:
+            return set(), set()
+
+        done, pending = await asyncio.wait(handles_by_future, timeout=timeout)
+
+        return (
+            {handles_by_future[future] for future in done},
+            {handles_by_future[future] for future in pending},
+        )
+
+    async def create_botx_method_callback(self, sync_id: UUID) -> None:
+        loop = asyncio.get_running_loop()
+        self._callback_futures[sync_id] = loop.create_future()
+
+    async def set_botx_method_callback_result(
+        self,
+        callback: BotXMethodCallback,
+    ) -> None:
+        future = self._get_botx_method_callback(callback.sync_id)
+        if not future.done():
+            future.set_result(callback)
+
+    async def wait_botx_method_callback(
+        self,
+        sync_id: UUID,
+        timeout: float,
+    ) -> BotXMethodCallback:
+        future = self._get_botx_method_callback(sync_id)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError as exc:
+            raise CallbackNotReceivedError(sync_id) from exc
+        finally:
+            self._callback_futures.pop(sync_id, None)
+
+    async def pop_botx_method_callback(
+        self,
+        sync_id: UUID,
+    ) -> "asyncio.Future[BotXMethodCallback]":
+        future = self._callback_futures.pop(sync_id)
+        if not future.done():
+            self._set_exception(future, CallbackNotReceivedError(sync_id))
+
+        return future
+
+    async def stop_callbacks_waiting(self) -> None:
+        for sync_id, future in self._callback_futures.items():
+            if not future.done():
+                self._set_exception(
+                    future,
+                    BotShuttingDownError(
+                        f"Callback with sync_id `{sync_id!s}` can't be received",
+                    ),
+                )
+
+        self._callback_futures.clear()
+
+    def _get_botx_method_callback(
+        self,
+        sync_id: UUID,
+    ) -> "asyncio.Future[BotXMethodCallback]":
+        try:
+            return self._callback_futures[sync_id]
+        except KeyError:
+            raise BotXMethodCallbackNotFoundError(sync_id) from None
+
+    def _set_exception(
+        self,
+        future: "asyncio.Future[BotXMethodCallback]",
+        exc: Exception,
+    ) -> None:
+        future.set_exception(exc)
+        # nobody may await untracked callbacks, mark exception as retrieved
+        future.exception()
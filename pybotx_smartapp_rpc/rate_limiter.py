@@ -0,0 +1,289 @@
+import json
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Collection, Hashable
+from dataclasses import dataclass, field
+from typing import Literal, Protocol
+
+from pybotx_smartapp_rpc.backends.base import StateBackend
+from pybotx_smartapp_rpc.smartapp import SmartApp
+
+RateLimitKeyPart = Literal["sender", "chat", "bot", "method"]
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate: float
+    burst: float
+    key: tuple[RateLimitKeyPart, ...] = ("sender", "method")
+    methods: Collection[str] | None = None
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0 or self.burst <= 0:
+            raise ValueError("Rate limit rate and burst must be positive")
+
+    def applies_to(self, method: str) -> bool:
+        return self.methods is None or method in self.methods
+
+
+@dataclass
+class RateLimiterStats:
+    allowed: int = 0
+    limited: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _TokenBucket:
+    tokens: float
+    updated_at: float
+    full_at: float
+
+
+BucketRequests = list[tuple[tuple[object, ...], RateLimit]]
+
+
+def _refill_tokens(
+    tokens: float,
+    updated_at: float,
+    now: float,
+    rate_limit: RateLimit,
+) -> float:
+    return min(rate_limit.burst, tokens + (now - updated_at) * rate_limit.rate)
+
+
+def _get_retry_after(tokens: float, cost: float, rate_limit: RateLimit) -> float:
+    # cost is capped by burst, otherwise such request will never be allowed
+    return max(min(cost, rate_limit.burst) - tokens, 0) / rate_limit.rate
+
+
+class _BucketStore(Protocol):
+    async def take(self, requests: BucketRequests, cost: float) -> float: ...
+
+
+class _MemoryBucketStore:
+    def __init__(self, max_keys: int) -> None:
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[Hashable, _TokenBucket] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, requests: BucketRequests, cost: float) -> float:
+        now = time.monotonic()
+        self._expire_idle_buckets(now)
+
+        buckets = [
+            self._refill(bucket_key, rate_limit, now)
+            for bucket_key, rate_limit in requests
+        ]
+
+        retry_after = max(
+            _get_retry_after(bucket.tokens, cost, rate_limit)
+            for bucket, (_, rate_limit) in zip(buckets, requests)
+        )
+        if retry_after:
+            return retry_after
+
+        for bucket, (_, rate_limit) in zip(buckets, requests):
+            bucket.tokens -= min(cost, rate_limit.burst)
+            bucket.full_at = now + (rate_limit.burst - bucket.tokens) / rate_limit.rate
+
+        return 0.0
+
+    def _refill(
+        self,
+        bucket_key: Hashable,
+        rate_limit: RateLimit,
+        now: float,
+    ) -> _TokenBucket:
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = _TokenBucket(tokens=rate_limit.burst, updated_at=now, full_at=now)
+            self._buckets[bucket_key] = bucket
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(bucket_key)
+            bucket.tokens = _refill_tokens(
+                bucket.tokens,
+                bucket.updated_at,
+                now,
+                rate_limit,
+            )
+            bucket.updated_at = now
+
+        return bucket
+
+    def _expire_idle_buckets(self, now: float) -> None:
+        # full bucket is the same as missing one, so idle keys can be dropped
+        while self._buckets:
+            bucket_key, bucket = next(iter(self._buckets.items()))
+            if bucket.full_at > now:
+                return
+
+            del self._buckets[bucket_key]
+
+
+class _BackendBucketStore:
+    def __init__(self, backend: StateBackend, key_prefix: str) -> None:
+        self._backend = backend
+        self._key_prefix = key_prefix
+
+    async def take(self, requests: BucketRequests, cost: float) -> float:
+        keys = [self._get_backend_key(bucket_key) for bucket_key, _ in requests]
+        states = [await self._backend.get(key) for key in keys]
+
+        now = time.time()
+        retry_after = max(
+            _get_retry_after(self._get_tokens(state, now, rate_limit), cost, rate_limit)
+            for state, (_, rate_limit) in zip(states, requests)
+        )
+        if retry_after:
+            return retry_after
+
+        charged_buckets: list[tuple[str, RateLimit]] = []
+        for key, state, (_, rate_limit) in zip(keys, states, requests):
+            retry_after = await self._take_tokens(key, state, now, rate_limit, cost)
+            if retry_after:
+                # request is rejected, so it must not use quota of other buckets
+                for charged_key, charged_rate_limit in charged_buckets:
+                    await self._refund_tokens(charged_key, charged_rate_limit, cost)
+
+                return retry_after
+
+            charged_buckets.append((key, rate_limit))
+
+        return 0.0
+
+    async def _take_tokens(
+        self,
+        key: str,
+        state: bytes | None,
+        now: float,
+        rate_limit: RateLimit,
+        cost: float,
+    ) -> float:
+        # optimistic update, state is re-read if other process changed it
+        while True:
+            tokens = self._get_tokens(state, now, rate_limit)
+            retry_after = _get_retry_after(tokens, cost, rate_limit)
+            if retry_after:
+                return retry_after
+
+            if await self._set_tokens(
+                key,
+                state,
+                tokens - min(cost, rate_limit.burst),
+                now,
+                rate_limit,
+            ):
+                return 0.0
+
+            state = await self._backend.get(key)
+            now = time.time()
+
+    async def _refund_tokens(
+        self,
+        key: str,
+        rate_limit: RateLimit,
+        cost: float,
+    ) -> None:
+        while True:
+            state = await self._backend.get(key)
+            now = time.time()
+            tokens = self._get_tokens(state, now, rate_limit)
+            if await self._set_tokens(
+                key,
+                state,
+                min(tokens + min(cost, rate_limit.burst), rate_limit.burst),
+                now,
+                rate_limit,
+            ):
+                return
+
+    async def _set_tokens(
+        self,
+        key: str,
+        state: bytes | None,
+        tokens: float,
+        now: float,
+        rate_limit: RateLimit,
+    ) -> bool:
+        return await self._backend.compare_and_set(
+            key,
+            state,
+            json.dumps({"tokens": tokens, "updated_at": now}).encode(),
+            ttl=rate_limit.burst / rate_limit.rate,
+        )
+
+    def _get_tokens(
+        self,
+        state: bytes | None,
+        now: float,
+        rate_limit: RateLimit,
+    ) -> float:
+        if state is None:
+            return rate_limit.burst
+
+        bucket = json.loads(state)
+        return _refill_tokens(bucket["tokens"], bucket["updated_at"], now, rate_limit)
+
+    def _get_backend_key(self, bucket_key: tuple[object, ...]) -> str:
+        return self._key_prefix + ":".join(str(part) for part in bucket_key)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        limits: list[RateLimit],
+        max_keys: int = 100_000,
+        backend: StateBackend | None = None,
+        key_prefix: str = "rate_limit:",
+    ) -> None:
+        self._limits = limits
+        self._memory_store = _MemoryBucketStore(max_keys)
+        self._store: _BucketStore = (
+            _BackendBucketStore(backend, key_prefix)
+            if backend is not None
+            else self._memory_store
+        )
+
+        self.stats = RateLimiterStats()
+
+    @property
+    def keys_count(self) -> int:
+        return len(self._memory_store)
+
+    async def acquire(self, smartapp: SmartApp, method: str, cost: float) -> float:
+        requests = [
+            (self._get_bucket_key(smartapp, method, index, rate_limit), rate_limit)
+            for index, rate_limit in enumerate(self._limits)
+            if rate_limit.applies_to(method)
+        ]
+        if not requests:
+            return 0.0
+
+        retry_after = await self._store.take(requests, cost)
+        if retry_after:
+            self.stats.limited[method] = self.stats.limited.get(method, 0) + 1
+            return math.ceil(retry_after * 1000) / 1000
+
+        self.stats.allowed += 1
+        return 0.0
+
+    def _get_bucket_key(
+        self,
+        smartapp: SmartApp,
+        method: str,
+        limit_index: int,
+        rate_limit: RateLimit,
+    ) -> tuple[object, ...]:
+        key_parts: dict[RateLimitKeyPart, object] = {
+            "sender": smartapp.event.sender.huid if smartapp.event else None,
+            "chat": smartapp.chat_id,
+            "bot": smartapp.bot_id,
+            "method": method,
+        }
+
+        return (limit_index, *(key_parts[part] for part in rate_limit.key))
@@ -1,23 +1,39 @@
 import inspect
 from collections.abc import Callable
+from dataclasses import replace
 from enum import Enum
 from typing import Any, get_args, get_origin
 
 from pydantic import ValidationError
 
+from pybotx_smartapp_rpc.cancellation import SupersedeKeyFunc
+from pybotx_smartapp_rpc.dependencies import (
+    get_handler_dependant,
+    is_dependency_parameter,
+)
 from pybotx_smartapp_rpc.empty_args import EmptyArgs
+from pybotx_smartapp_rpc.exceptions import RPCErrorExc
+from pybotx_smartapp_rpc.executors import ExecutorType
 from pybotx_smartapp_rpc.middlewares.empty_args_middleware import empty_args_middleware
+from pybotx_smartapp_rpc.middlewares.scoped_middleware import filter_middlewares
 from pybotx_smartapp_rpc.models.errors import RPCError
-from pybotx_smartapp_rpc.models.method import RPCMethod
+from pybotx_smartapp_rpc.models.method import RPCMethod, RPCPriority
 from pybotx_smartapp_rpc.models.request import RPCArgsBaseModel, RPCRequest
 from pybotx_smartapp_rpc.models.responses import (
     ResultType,
+    RPCErrorResponse,
     RPCResultResponse,
     build_invalid_rpc_args_error_response,
     build_method_not_found_error_response,
 )
+from pybotx_smartapp_rpc.ordering import OrderingKeyFunc, chat_ordering_key
 from pybotx_smartapp_rpc.smartapp import SmartApp
-from pybotx_smartapp_rpc.typing import Handler, Middleware, RPCResponse
+from pybotx_smartapp_rpc.typing import (
+    AnyHandler,
+    BeforeHook,
+    Middleware,
+    RPCResponse,
+)
 
 
 class RPCRouter:
@@ -27,12 +43,14 @@ class RPCRouter:
         tags: list[str | Enum] | None = None,
         include_in_schema: bool = True,
         errors: list[type[RPCError]] | None = None,
+        before_hooks: list[BeforeHook] | None = None,
     ) -> None:
         self.rpc_methods: dict[str, RPCMethod] = {}
         self.middlewares: list[Middleware] = middlewares or []
         self.tags: list[str | Enum] = tags or []
         self.include_in_schema = include_in_schema
         self.errors: list[type[RPCError]] = errors or []
+        self.before_hooks: list[BeforeHook] = before_hooks or []
 
     def method(
         self,
@@ -42,18 +60,48 @@ class RPCRouter:
         tags: list[str | Enum] | None = None,
         errors: list[type[RPCError]] | None = None,
         include_in_schema: bool = True,
-    ) -> Callable[[Handler], Handler]:
+        sync_budget: float | None = None,
+        executor: ExecutorType | None = None,
+        cost: float = 1,
+        priority: RPCPriority = RPCPriority.NORMAL,
+        ordered: bool | OrderingKeyFunc = False,
+        supersede: bool | SupersedeKeyFunc = False,
+        before_hooks: list[BeforeHook] | None = None,
+    ) -> Callable[[AnyHandler], AnyHandler]:
         if rpc_method_name in self.rpc_methods:
             raise ValueError(f"RPC method {rpc_method_name} already registered!")
 
+        if isinstance(executor, str) and executor not in {"thread", "process"}:
+            raise ValueError(f"Unknown executor {executor}!")
+
         method_and_router_middlewares = self.middlewares + (middlewares or [])
         method_and_router_middlewares += [empty_args_middleware]
 
+        ordering_key = chat_ordering_key if ordered is True else ordered or None
+
         current_tags = self.tags.copy()
         if tags:
             current_tags.extend(tags)
 
-        def decorator(handler: Handler) -> Handler:
+        def decorator(handler: AnyHandler) -> AnyHandler:
+            # async callables and wrappers of coroutine functions are awaited,
+            # only plain sync functions are offloaded by default
+            handler_function = inspect.unwrap(handler)
+            is_async_handler = inspect.iscoroutinefunction(handler_function)
+            if executor is not None and is_async_handler:
+                raise ValueError(
+                    f"Async handler of RPC method {rpc_method_name} "
+                    "can't be called in executor!",
+                )
+
+            method_executor = executor
+            if (
+                method_executor is None
+                and inspect.isfunction(handler_function)
+                and not is_async_handler
+            ):
+                method_executor = "thread"
+
             arguments_model, response_type = self._get_args_and_return_type(
                 handler,
                 return_type,
@@ -62,16 +110,32 @@ class RPCRouter:
                 self.errors + (errors or []),
             )
 
-            self.rpc_methods[rpc_method_name] = RPCMethod(
+            rpc_method = RPCMethod(
                 handler=handler,
-                middlewares=method_and_router_middlewares,
+                middlewares=[],
                 response_type=response_type,
                 arguments_model=arguments_model,
                 tags=current_tags,
                 errors=errors_fields,
                 errors_models=errors_models,
                 include_in_schema=include_in_schema and self.include_in_schema,
+                sync_budget=sync_budget,
+                executor=method_executor,
+                cost=cost,
+                priority=priority,
+                ordering_key=ordering_key,
+                supersede=bool(supersede),
+                supersede_key=supersede if callable(supersede) else None,
+                dependant=get_handler_dependant(handler),
+                before_hooks=self.before_hooks + (before_hooks or []),
             )
+            # filters are evaluated once, so chain has only applied middlewares
+            rpc_method.middlewares = filter_middlewares(
+                method_and_router_middlewares,
+                rpc_method_name,
+                rpc_method,
+            )
+            self.rpc_methods[rpc_method_name] = rpc_method
 
             return handler
 
@@ -94,8 +158,56 @@ class RPCRouter:
         else:
             args = EmptyArgs()
 
+        smartapp.applied_middlewares = rpc_method.middlewares
         return await rpc_method(smartapp, args)
 
+    async def call_rpc_method(
+        self,
+        smartapp: SmartApp,
+        rpc_method_name: str,
+        rpc_arguments: RPCArgsBaseModel | None = None,
+        skip_applied_middlewares: bool = False,
+    ) -> Any:
+        rpc_method = self.rpc_methods.get(rpc_method_name)
+        if not rpc_method:
+            raise RPCErrorExc(
+                build_method_not_found_error_response(rpc_method_name).errors,
+            )
+
+        arguments_model = rpc_method.arguments_model
+        if arguments_model is None:
+            if rpc_arguments is not None and not isinstance(rpc_arguments, EmptyArgs):
+                raise TypeError(
+                    f"RPC method {rpc_method_name} doesn't accept arguments"
+                )
+
+            rpc_arguments = EmptyArgs()
+        elif not isinstance(rpc_arguments, arguments_model):
+            raise TypeError(
+                f"RPC method {rpc_method_name} expects {arguments_model.__name__} "
+                f"arguments, got {type(rpc_arguments).__name__}",
+            )
+
+        skip_middlewares: list[Middleware] = []
+        if skip_applied_middlewares:
+            # empty args middleware adapts arguments to the called handler,
+            # so it is never skipped
+            skip_middlewares = [
+                middleware
+                for middleware in smartapp.applied_middlewares
+                if middleware is not empty_args_middleware
+            ]
+
+        rpc_response = await rpc_method(
+            smartapp,
+            rpc_arguments,
+            skip_middlewares,
+        )
+        if isinstance(rpc_response, RPCErrorResponse):
+            raise RPCErrorExc(rpc_response.errors)
+
+        return rpc_response.result
+
     def include(self, *routers: "RPCRouter") -> None:
         for router in routers:
             self.include_router(router)
@@ -111,18 +223,23 @@ class RPCRouter:
             self.errors,
         )
 
+        # included router isn't modified, so it can be shared by several apps,
+        # copies of its methods share handlers and models
         for rpc_method_name, rpc_method in router.rpc_methods.items():
-            rpc_method.middlewares = self.middlewares + rpc_method.middlewares
-            rpc_method.errors = {**router_errors_fields, **rpc_method.errors}
-            rpc_method.errors_models = {
-                **router_errors_models,
-                **rpc_method.errors_models,
-            }
-            self.rpc_methods[rpc_method_name] = rpc_method
+            self.rpc_methods[rpc_method_name] = replace(
+                rpc_method,
+                middlewares=[
+                    *filter_middlewares(self.middlewares, rpc_method_name, rpc_method),
+                    *rpc_method.middlewares,
+                ],
+                before_hooks=self.before_hooks + rpc_method.before_hooks,
+                errors={**router_errors_fields, **rpc_method.errors},
+                errors_models={**router_errors_models, **rpc_method.errors_models},
+            )
 
     def _get_args_and_return_type(
         self,
-        handler: Handler,
+        handler: AnyHandler,
         return_type: type[ResultType] | None = None,
     ) -> tuple[type[RPCArgsBaseModel] | None, Any]:
         signature = inspect.signature(handler)
@@ -131,7 +248,11 @@ class RPCRouter:
             return_type=return_type,
         )
 
-        args_annotations = [arg.annotation for arg in signature.parameters.values()]
+        args_annotations = [
+            arg.annotation
+            for arg in signature.parameters.values()
+            if not is_dependency_parameter(arg)
+        ]
         if len(args_annotations) >= 2:
             args_annotation = args_annotations[1]
             if inspect.isclass(args_annotation) and issubclass(
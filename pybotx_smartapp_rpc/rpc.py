@@ -1,27 +1,100 @@
+import asyncio
+from functools import partial
+from typing import Any
+from uuid import UUID, uuid4
+
+from loguru import logger
 from pybotx import (
     Bot,
     BotAPISyncSmartAppEventErrorResponse,
     BotAPISyncSmartAppEventResponse,
     BotAPISyncSmartAppEventResultResponse,
+    File,
     SmartAppEvent,
 )
 from pydantic import ValidationError
 
+from pybotx_smartapp_rpc.broadcast import BroadcastSummary, ChatIds, broadcast_event
+from pybotx_smartapp_rpc.cancellation import (
+    CancelCallArgs,
+    CancellableCalls,
+    get_call_owner,
+    get_supersede_key,
+)
+from pybotx_smartapp_rpc.concurrency_limiter import AdaptiveConcurrencyLimiter
+from pybotx_smartapp_rpc.draining import RequestDrainer, ShutdownSummary
 from pybotx_smartapp_rpc.exception_handlers import (
     default_exception_handler,
     rpc_exception_handler,
 )
 from pybotx_smartapp_rpc.exceptions import RPCErrorExc
+from pybotx_smartapp_rpc.executors import HandlerExecutors
+from pybotx_smartapp_rpc.idempotency import IdempotencyCache
+from pybotx_smartapp_rpc.lifespan import Lifespan, LifespanHook, Resource
+from pybotx_smartapp_rpc.load_shedder import LoadShedder, get_client_deadline
 from pybotx_smartapp_rpc.middlewares.exception_middleware import ExceptionMiddleware
 from pybotx_smartapp_rpc.models.errors import RPCError
+from pybotx_smartapp_rpc.models.method import RPCMethod
 from pybotx_smartapp_rpc.models.request import RPCRequest
 from pybotx_smartapp_rpc.models.responses import (
     RPCErrorResponse,
+    RPCResultResponse,
+    build_deadline_exceeded_error_response,
+    build_invalid_rpc_args_error_response,
     build_invalid_rpc_request_error_response,
+    build_overloaded_error_response,
+    build_rate_limited_error_response,
+    build_shutting_down_error_response,
 )
+from pybotx_smartapp_rpc.ordering import OrderedExecution
+from pybotx_smartapp_rpc.push_debouncer import PushDebouncer
+from pybotx_smartapp_rpc.push_tracker import PushTracker
+from pybotx_smartapp_rpc.rate_limiter import RateLimiter
 from pybotx_smartapp_rpc.router import RPCRouter
+from pybotx_smartapp_rpc.scheduler import FairScheduler
+from pybotx_smartapp_rpc.session_cache import SessionCache
 from pybotx_smartapp_rpc.smartapp import SmartApp
-from pybotx_smartapp_rpc.typing import ExceptionHandlerDict, Middleware, RPCResponse
+from pybotx_smartapp_rpc.supervisor import TaskSupervisor
+from pybotx_smartapp_rpc.typing import (
+    BeforeHook,
+    ExceptionHandlerDict,
+    Middleware,
+    RPCResponse,
+)
+
+
+def build_sync_smartapp_event_response(
+    rpc_response: RPCResponse,
+) -> BotAPISyncSmartAppEventResponse:
+    if isinstance(rpc_response, RPCErrorResponse):
+        return BotAPISyncSmartAppEventErrorResponse.from_domain(
+            errors=rpc_response.jsonable_errors(),
+        )
+
+    return BotAPISyncSmartAppEventResultResponse.from_domain(
+        data=rpc_response.jsonable_result(),
+        files=rpc_response.files,
+    )
+
+
+async def send_rpc_response(
+    event: SmartAppEvent,
+    bot: Bot,
+    rpc_response: RPCResponse,
+    job_id: UUID | None = None,
+) -> None:
+    data = rpc_response.jsonable_dict()
+    if job_id is not None:
+        data["job_id"] = str(job_id)
+
+    await bot.send_smartapp_event(
+        bot_id=event.bot.id,
+        chat_id=event.chat.id,
+        data=data,
+        ref=event.ref,
+        files=rpc_response.files,
+        encrypted=rpc_response.encrypted,
+    )
 
 
 class SmartAppRPC:
@@ -31,66 +104,434 @@ class SmartAppRPC:
         middlewares: list[Middleware] | None = None,
         exception_handlers: ExceptionHandlerDict | None = None,
         errors: list[type[RPCError]] | None = None,
+        push_debounce_interval: float | None = None,
+        push_tracker: PushTracker | None = None,
+        thread_pool_size: int | None = None,
+        process_pool_size: int | None = None,
+        rate_limiter: RateLimiter | None = None,
+        idempotency_cache: IdempotencyCache | None = None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None = None,
+        load_shedder: LoadShedder | None = None,
+        scheduler: FairScheduler | None = None,
+        cancel_method: str | None = None,
+        max_cancellable_calls: int = 10_000,
+        resources: list[Resource[Any]] | None = None,
+        on_startup: list[LifespanHook] | None = None,
+        on_shutdown: list[LifespanHook] | None = None,
+        max_background_tasks: int = 100,
+        max_queued_background_tasks: int = 1000,
+        session_cache: SessionCache | None = None,
+        before_hooks: list[BeforeHook] | None = None,
     ) -> None:
         self._middlewares = middlewares or []
         self._insert_exception_middleware(exception_handlers or {})
 
-        self._router = self._merge_routers(routers, errors or [])
+        self._router = self._merge_routers(routers, errors or [], before_hooks or [])
+        if cancel_method in self._router.rpc_methods:
+            raise ValueError(f"RPC method {cancel_method} already registered!")
+
+        self._push_debouncer = (
+            PushDebouncer(push_debounce_interval)
+            if push_debounce_interval is not None
+            else None
+        )
+        self._push_tracker = push_tracker
+        self._executors = HandlerExecutors(thread_pool_size, process_pool_size)
+        self._rate_limiter = rate_limiter
+        self._idempotency_cache = idempotency_cache
+        self._concurrency_limiter = concurrency_limiter
+        self._load_shedder = load_shedder
+        self._scheduler = scheduler
+        self._ordered_execution = OrderedExecution()
+        self._cancel_method = cancel_method
+        self._cancellable_calls = CancellableCalls(max_cancellable_calls)
+        self._lifespan = Lifespan(resources, on_startup, on_shutdown)
+        self._request_drainer = RequestDrainer()
+        self._session_cache = session_cache
+
+        self._task_supervisor = TaskSupervisor(
+            self._exception_middleware.handle_exception,
+            max_background_tasks,
+            max_queued_background_tasks,
+        )
+
+        self._background_tasks: set[asyncio.Task[None]] = set()
 
     async def handle_smartapp_event(self, event: SmartAppEvent, bot: Bot) -> None:
-        rpc_response: RPCResponse
+        if self._request_drainer.draining:
+            await self._handle_smartapp_event(event, bot)
+            return
 
+        # response is sent in tracked block too, so shutdown waits for its delivery
+        with self._request_drainer.track():
+            await self._handle_smartapp_event(event, bot)
+
+    async def handle_sync_smartapp_event(
+        self,
+        event: SmartAppEvent,
+        bot: Bot,
+    ) -> BotAPISyncSmartAppEventResponse:
         try:
             rpc_request = RPCRequest(**event.data)
         except ValidationError as invalid_rcp_request_exc:
-            rpc_response = build_invalid_rpc_request_error_response(
+            rpc_response: RPCResponse = build_invalid_rpc_request_error_response(
                 invalid_rcp_request_exc,
             )
         else:
-            rpc_response = await self._router.perform_rpc_request(
-                SmartApp(bot, event.bot.id, event.chat.id, event),
-                rpc_request,
-            )
+            smartapp = SmartApp(bot, event.bot.id, event.chat.id, event, self)
+            perform_rpc_request = self._perform_rpc_request(smartapp, rpc_request)
 
-        await bot.send_smartapp_event(
-            bot_id=event.bot.id,
-            chat_id=event.chat.id,
-            data=rpc_response.jsonable_dict(),
-            ref=event.ref,
-            files=rpc_response.files,
-            encrypted=rpc_response.encrypted,
-        )
+            rpc_method = self._router.rpc_methods.get(rpc_request.method)
+            if rpc_method and rpc_method.sync_budget is not None:
+                perform_task = asyncio.create_task(perform_rpc_request)
+                try:
+                    await asyncio.wait({perform_task}, timeout=rpc_method.sync_budget)
+                except asyncio.CancelledError:
+                    # cleanup of handler is finished before caller goes away
+                    perform_task.cancel()
+                    await asyncio.wait({perform_task})
+                    raise
 
-    async def handle_sync_smartapp_event(
+                if not perform_task.done():
+                    return self._defer_rpc_response(event, bot, perform_task)
+
+                rpc_response = perform_task.result()
+            else:
+                rpc_response = await perform_rpc_request
+
+        return build_sync_smartapp_event_response(rpc_response)
+
+    async def broadcast_event(
         self,
-        event: SmartAppEvent,
         bot: Bot,
-    ) -> BotAPISyncSmartAppEventResponse:
+        bot_id: UUID,
+        chat_ids: ChatIds,
+        result: Any,
+        files: list[File] | None = None,
+        encrypted: bool = True,
+        max_concurrency: int = 10,
+        rate_limit: float | None = None,
+    ) -> BroadcastSummary:
+        return await broadcast_event(
+            bot,
+            bot_id,
+            chat_ids,
+            data={
+                "status": "ok",
+                "type": "smartapp_rpc",
+                "result": result,
+            },
+            files=files,
+            encrypted=encrypted,
+            max_concurrency=max_concurrency,
+            rate_limit=rate_limit,
+        )
+
+    async def startup(self) -> None:
+        await self._lifespan.startup()
+
+    async def shutdown(self, timeout: float = 10) -> ShutdownSummary:
+        shutdown_summary = await self._request_drainer.drain(
+            timeout,
+            self._background_tasks,
+            self._task_supervisor.tasks,
+        )
+        self._task_supervisor.close()
+
+        if self._push_debouncer:
+            await self._push_debouncer.close()
+
+        await self._lifespan.shutdown()
+        self._executors.shutdown()
+
+        return shutdown_summary
+
+    @property
+    def router(self) -> RPCRouter:
+        return self._router
+
+    @property
+    def push_debouncer(self) -> PushDebouncer | None:
+        return self._push_debouncer
+
+    @property
+    def rate_limiter(self) -> RateLimiter | None:
+        return self._rate_limiter
+
+    @property
+    def idempotency_cache(self) -> IdempotencyCache | None:
+        return self._idempotency_cache
+
+    @property
+    def concurrency_limiter(self) -> AdaptiveConcurrencyLimiter | None:
+        return self._concurrency_limiter
+
+    @property
+    def load_shedder(self) -> LoadShedder | None:
+        return self._load_shedder
+
+    @property
+    def scheduler(self) -> FairScheduler | None:
+        return self._scheduler
+
+    @property
+    def session_cache(self) -> SessionCache | None:
+        return self._session_cache
+
+    @property
+    def ordered_execution(self) -> OrderedExecution:
+        return self._ordered_execution
+
+    @property
+    def cancellable_calls(self) -> CancellableCalls:
+        return self._cancellable_calls
+
+    @property
+    def lifespan(self) -> Lifespan:
+        return self._lifespan
+
+    @property
+    def request_drainer(self) -> RequestDrainer:
+        return self._request_drainer
+
+    @property
+    def task_supervisor(self) -> TaskSupervisor:
+        return self._task_supervisor
+
+    @property
+    def executors(self) -> HandlerExecutors:
+        return self._executors
+
+    @property
+    def push_tracker(self) -> PushTracker | None:
+        return self._push_tracker
+
+    async def _handle_smartapp_event(self, event: SmartAppEvent, bot: Bot) -> None:
+        rpc_response: RPCResponse
+
         try:
             rpc_request = RPCRequest(**event.data)
         except ValidationError as invalid_rcp_request_exc:
-            rpc_response: RPCResponse = build_invalid_rpc_request_error_response(
+            rpc_response = build_invalid_rpc_request_error_response(
                 invalid_rcp_request_exc,
             )
         else:
-            rpc_response = await self._router.perform_rpc_request(
-                SmartApp(bot, event.bot.id, event.chat.id, event),
+            rpc_response = await self._perform_rpc_request(
+                SmartApp(bot, event.bot.id, event.chat.id, event, self),
                 rpc_request,
             )
 
-        if isinstance(rpc_response, RPCErrorResponse):
-            return BotAPISyncSmartAppEventErrorResponse.from_domain(
-                errors=rpc_response.jsonable_errors(),
+        await send_rpc_response(event, bot, rpc_response)
+
+    async def _perform_rpc_request(
+        self,
+        smartapp: SmartApp,
+        rpc_request: RPCRequest,
+    ) -> RPCResponse:
+        if self._request_drainer.draining:
+            self._request_drainer.stats.rejected += 1
+            return build_shutting_down_error_response()
+
+        with self._request_drainer.track():
+            return await self._run_rpc_request(smartapp, rpc_request)
+
+    async def _run_rpc_request(
+        self,
+        smartapp: SmartApp,
+        rpc_request: RPCRequest,
+    ) -> RPCResponse:
+        if self._cancel_method and rpc_request.method == self._cancel_method:
+            return self._cancel_rpc_call(smartapp, rpc_request)
+
+        event_ref = smartapp.event.ref if smartapp.event else None
+        if self._idempotency_cache is not None and event_ref:
+            return await self._idempotency_cache.run(
+                (smartapp.bot_id, event_ref),
+                partial(self._execute_rpc_request, smartapp, rpc_request),
+                rpc_request.method,
+            )
+
+        return await self._execute_rpc_request(smartapp, rpc_request)
+
+    async def _execute_rpc_request(
+        self,
+        smartapp: SmartApp,
+        rpc_request: RPCRequest,
+    ) -> RPCResponse:
+        rpc_method = self._router.rpc_methods.get(rpc_request.method)
+        if not rpc_method:
+            return await self._router.perform_rpc_request(smartapp, rpc_request)
+
+        if not self._load_shedder:
+            return await self._call_ordered_rpc_method(
+                smartapp,
+                rpc_request,
+                rpc_method,
+            )
+
+        # requests are dropped before arguments validation
+        rejection_response = self._load_shedder.admit(
+            rpc_request.method,
+            rpc_method.priority,
+            get_client_deadline(smartapp, rpc_request),
+        )
+        if rejection_response:
+            return rejection_response
+
+        try:
+            return await self._call_ordered_rpc_method(
+                smartapp,
+                rpc_request,
+                rpc_method,
+            )
+        finally:
+            self._load_shedder.release()
+
+    async def _call_ordered_rpc_method(
+        self,
+        smartapp: SmartApp,
+        rpc_request: RPCRequest,
+        rpc_method: RPCMethod,
+    ) -> RPCResponse:
+        if not rpc_method.ordering_key:
+            return await self._call_cancellable_rpc_method(
+                smartapp,
+                rpc_request,
+                rpc_method,
+            )
+
+        # requests get here without suspending, so queue keeps arrival order
+        async with self._ordered_execution.run_in_order(
+            rpc_method.ordering_key(smartapp),
+        ):
+            return await self._call_cancellable_rpc_method(
+                smartapp,
+                rpc_request,
+                rpc_method,
+            )
+
+    async def _call_cancellable_rpc_method(
+        self,
+        smartapp: SmartApp,
+        rpc_request: RPCRequest,
+        rpc_method: RPCMethod,
+    ) -> RPCResponse:
+        call_ref = None
+        if self._cancel_method and smartapp.event and smartapp.event.ref:
+            call_ref = (smartapp.bot_id, smartapp.event.ref)
+
+        if not rpc_method.supersede and call_ref is None:
+            return await self._call_rpc_method(smartapp, rpc_request, rpc_method)
+
+        supersede_key = None
+        if rpc_method.supersede:
+            supersede_key = get_supersede_key(
+                smartapp,
+                rpc_request.method,
+                rpc_method.supersede_key,
+            )
+
+        return await self._cancellable_calls.run(
+            self._call_rpc_method(smartapp, rpc_request, rpc_method),
+            supersede_key,
+            call_ref,
+            get_call_owner(smartapp),
+        )
+
+    def _cancel_rpc_call(
+        self,
+        smartapp: SmartApp,
+        rpc_request: RPCRequest,
+    ) -> RPCResponse:
+        try:
+            cancel_args = CancelCallArgs.model_validate(rpc_request.params)
+        except ValidationError as invalid_rpc_args_exc:
+            return build_invalid_rpc_args_error_response(invalid_rpc_args_exc)
+
+        cancelled = self._cancellable_calls.cancel(
+            (smartapp.bot_id, cancel_args.ref),
+            get_call_owner(smartapp),
+        )
+        return RPCResultResponse(result=cancelled)
+
+    async def _call_rpc_method(
+        self,
+        smartapp: SmartApp,
+        rpc_request: RPCRequest,
+        rpc_method: RPCMethod,
+    ) -> RPCResponse:
+        if self._rate_limiter:
+            retry_after = await self._rate_limiter.acquire(
+                smartapp,
+                rpc_request.method,
+                rpc_method.cost,
+            )
+            if retry_after:
+                return build_rate_limited_error_response(retry_after)
+
+        if not self._scheduler:
+            return await self._call_limited_rpc_method(smartapp, rpc_request)
+
+        await self._scheduler.acquire(smartapp, rpc_method.priority, rpc_method.cost)
+        try:
+            # client could give up while request was waiting in queue
+            if self._load_shedder and self._load_shedder.is_expired(
+                rpc_request.method,
+                get_client_deadline(smartapp, rpc_request),
+            ):
+                return build_deadline_exceeded_error_response()
+
+            return await self._call_limited_rpc_method(smartapp, rpc_request)
+        finally:
+            self._scheduler.release()
+
+    async def _call_limited_rpc_method(
+        self,
+        smartapp: SmartApp,
+        rpc_request: RPCRequest,
+    ) -> RPCResponse:
+        if self._concurrency_limiter and self._concurrency_limiter.applies_to(
+            rpc_request.method,
+        ):
+            concurrency_lease = self._concurrency_limiter.try_acquire(
+                rpc_request.method,
             )
+            if concurrency_lease is None:
+                return build_overloaded_error_response()
+
+            with concurrency_lease:
+                return await self._router.perform_rpc_request(smartapp, rpc_request)
+
+        return await self._router.perform_rpc_request(smartapp, rpc_request)
+
+    def _defer_rpc_response(
+        self,
+        event: SmartAppEvent,
+        bot: Bot,
+        perform_task: "asyncio.Task[RPCResponse]",
+    ) -> BotAPISyncSmartAppEventResponse:
+        job_id = uuid4()
+        delivery_task = asyncio.create_task(
+            self._deliver_deferred_rpc_response(event, bot, perform_task, job_id),
+        )
+        self._background_tasks.add(delivery_task)
+        delivery_task.add_done_callback(self._background_tasks.discard)
 
         return BotAPISyncSmartAppEventResultResponse.from_domain(
-            data=rpc_response.jsonable_result(),
-            files=rpc_response.files,
+            data={"status": "accepted", "job_id": str(job_id)},
         )
 
-    @property
-    def router(self) -> RPCRouter:
-        return self._router
+    async def _deliver_deferred_rpc_response(
+        self,
+        event: SmartAppEvent,
+        bot: Bot,
+        perform_task: "asyncio.Task[RPCResponse]",
+        job_id: UUID,
+    ) -> None:
+        try:
+            await send_rpc_response(event, bot, await perform_task, job_id)
+        except Exception as exc:
+            logger.exception(exc)
 
     def _insert_exception_middleware(
         self,
@@ -101,15 +542,20 @@ class SmartAppRPC:
             RPCErrorExc: rpc_exception_handler,
         }
         exception_handlers.update(user_exception_handlers)
-        exc_middleware = ExceptionMiddleware(exception_handlers)
-        self._middlewares.insert(0, exc_middleware)
+        self._exception_middleware = ExceptionMiddleware(exception_handlers)
+        self._middlewares.insert(0, self._exception_middleware)
 
     def _merge_routers(
         self,
         routers: list[RPCRouter],
         errors: list[type[RPCError]],
+        before_hooks: list[BeforeHook],
     ) -> RPCRouter:
-        main_router = RPCRouter(middlewares=self._middlewares, errors=errors)
+        main_router = RPCRouter(
+            middlewares=self._middlewares,
+            errors=errors,
+            before_hooks=before_hooks,
+        )
         main_router.include(*routers)
 
         return main_router
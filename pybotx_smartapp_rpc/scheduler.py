@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+from dataclasses import dataclass, field
+from typing import Literal
+
+from pybotx_smartapp_rpc.models.method import RPCPriority
+from pybotx_smartapp_rpc.smartapp import SmartApp
+
+FairSchedulerKey = Literal["sender", "chat"]
+
+
+@dataclass
+class FairSchedulerStats:
+    started: int = 0
+    queued: int = 0
+    cancelled: int = 0
+
+
+@dataclass(order=True)
+class _QueuedRequest:
+    start_tag: float
+    sequence: int
+    slot: "asyncio.Future[None]" = field(compare=False)
+
+
+class FairScheduler:
+    """Start-time fair queuing of requests that don't fit into free slots.
+
+    Waiting requests of higher priority always go first, requests of the
+    same priority are ordered by virtual start time. Every request moves
+    its key virtual time forward by method cost, so a sender with hundreds
+    of queued requests is interleaved with others instead of blocking them.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        key: FairSchedulerKey = "sender",
+        max_idle_keys: int = 10_000,
+    ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError("Scheduler max_concurrency must be positive")
+
+        self._max_concurrency = max_concurrency
+        self._key = key
+        self._max_idle_keys = max_idle_keys
+        self._prune_keys_at = max_idle_keys
+
+        self._running = 0
+        self._waiting = 0
+        self._queues: dict[RPCPriority, list[_QueuedRequest]] = {
+            priority: [] for priority in RPCPriority
+        }
+        self._finish_tags: dict[object, float] = {}
+        self._virtual_time = 0.0
+        self._sequence = 0
+
+        self.stats = FairSchedulerStats()
+
+    @property
+    def running_count(self) -> int:
+        return self._running
+
+    @property
+    def queued_count(self) -> int:
+        return self._waiting
+
+    @property
+    def keys_count(self) -> int:
+        return len(self._finish_tags)
+
+    async def acquire(
+        self,
+        smartapp: SmartApp,
+        priority: RPCPriority,
+        cost: float,
+    ) -> None:
+        start_tag = self._assign_tags(self._get_key(smartapp), cost)
+
+        if self._running < self._max_concurrency and not self._waiting:
+            self._running += 1
+            self._virtual_time = max(self._virtual_time, start_tag)
+            self.stats.started += 1
+            return
+
+        slot: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._sequence += 1
+        heapq.heappush(
+            self._queues[priority],
+            _QueuedRequest(start_tag, self._sequence, slot),
+        )
+        self._waiting += 1
+        self.stats.queued += 1
+
+        try:
+            await slot
+        except asyncio.CancelledError:
+            self.stats.cancelled += 1
+            if slot.done() and not slot.cancelled():
+                # slot was already handed over to this request
+                self.release()
+            else:
+                self._waiting -= 1
+                slot.cancel()
+
+            raise
+
+        self.stats.started += 1
+
+    def release(self) -> None:
+        for queue in self._queues.values():
+            while queue:
+                queued_request = heapq.heappop(queue)
+                if queued_request.slot.done():
+                    continue
+
+                self._waiting -= 1
+                self._virtual_time = max(self._virtual_time, queued_request.start_tag)
+                queued_request.slot.set_result(None)
+                return
+
+        self._running -= 1
+
+    def _assign_tags(self, key: object, cost: float) -> float:
+        start_tag = max(self._virtual_time, self._finish_tags.get(key, 0))
+        self._finish_tags[key] = start_tag + cost
+
+        if len(self._finish_tags) > self._prune_keys_at:
+            self._prune_idle_keys()
+
+        return start_tag
+
+    def _prune_idle_keys(self) -> None:
+        # keys behind virtual time get the same tags as new ones
+        self._finish_tags = {
+            tag_key: finish_tag
+            for tag_key, finish_tag in self._finish_tags.items()
+            if finish_tag > self._virtual_time
+        }
+        # active keys are kept, so next pruning waits until their number
+        # doubles instead of rebuilding tags on every request
+        self._prune_keys_at = max(self._max_idle_keys, 2 * len(self._finish_tags))
+
+    def _get_key(self, smartapp: SmartApp) -> object:
+        if self._key == "chat":
+            return smartapp.chat_id
+
+        return smartapp.event.sender.huid if smartapp.event else None
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+from uuid import UUID
+
+from pybotx_smartapp_rpc.smartapp import SmartApp
+
+SessionKey = tuple[UUID, UUID, UUID | None]
+ValueType = TypeVar("ValueType")
+
+
+def get_session_key(smartapp: SmartApp) -> SessionKey:
+    sender_huid = smartapp.event.sender.huid if smartapp.event else None
+    return smartapp.bot_id, smartapp.chat_id, sender_huid
+
+
+@dataclass
+class SessionCacheStats:
+    hits: int = 0
+    misses: int = 0
+    joined: int = 0
+    evicted: int = 0
+
+
+@dataclass
+class _CachedValue:
+    value: "asyncio.Future[Any]"
+    expires_at: float | None = None
+
+
+@dataclass
+class _Session:
+    values: dict[Hashable, _CachedValue] = field(default_factory=dict)
+
+
+class SessionCache:
+    def __init__(self, ttl: float = 300, max_size: int = 10_000) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._sessions: OrderedDict[SessionKey, _Session] = OrderedDict()
+
+        self.stats = SessionCacheStats()
+
+    @property
+    def size(self) -> int:
+        return len(self._sessions)
+
+    async def get_or_load(
+        self,
+        smartapp: SmartApp,
+        name: Hashable,
+        load: Callable[[], Awaitable[ValueType]],
+    ) -> ValueType:
+        session = self._get_session(get_session_key(smartapp))
+        while True:
+            cached_value = self._get_value(session, name)
+            if cached_value is None:
+                return await self._load(session, name, load)
+
+            if cached_value.value.done():
+                self.stats.hits += 1
+                return cached_value.value.result()
+
+            self.stats.joined += 1
+            try:
+                return await asyncio.shield(cached_value.value)
+            except asyncio.CancelledError:
+                # loading failed or was cancelled, so value is loaded again
+                if not cached_value.value.cancelled():
+                    raise
+
+    def invalidate(self, session_key: SessionKey, name: Hashable = None) -> None:
+        if name is None:
+            self._sessions.pop(session_key, None)
+            return
+
+        session = self._sessions.get(session_key)
+        if session is not None:
+            session.values.pop(name, None)
+
+    def clear(self) -> None:
+        self._sessions.clear()
+
+    async def _load(
+        self,
+        session: _Session,
+        name: Hashable,
+        load: Callable[[], Awaitable[ValueType]],
+    ) -> ValueType:
+        cached_value = _CachedValue(asyncio.get_running_loop().create_future())
+        session.values[name] = cached_value
+        self.stats.misses += 1
+
+        try:
+            value = await load()
+        except BaseException:
+            if session.values.get(name) is cached_value:
+                del session.values[name]
+
+            cached_value.value.cancel()
+            raise
+
+        cached_value.value.set_result(value)
+        cached_value.expires_at = time.monotonic() + self._ttl
+
+        return value
+
+    def _get_session(self, session_key: SessionKey) -> _Session:
+        session = self._sessions.get(session_key)
+        if session is not None:
+            self._sessions.move_to_end(session_key)
+            return session
+
+        session = _Session()
+        self._sessions[session_key] = session
+        while len(self._sessions) > self._max_size:
+            # least recently used sessions are evicted first
+            self._sessions.popitem(last=False)
+            self.stats.evicted += 1
+
+        return session
+
+    def _get_value(self, session: _Session, name: Hashable) -> _CachedValue | None:
+        cached_value = session.values.get(name)
+        if cached_value is None:
+            return None
+
+        expires_at = cached_value.expires_at
+        if expires_at is not None and expires_at <= time.monotonic():
+            del session.values[name]
+            return None
+
+        return cached_value
@@ -1,10 +1,30 @@
+import time
+from collections.abc import Coroutine
+from dataclasses import dataclass
 from types import SimpleNamespace
-from typing import Any
+from typing import TYPE_CHECKING, Any, TypeVar
 from uuid import UUID
 
 from pybotx import Bot, File, SmartAppEvent
 from pybotx.missing import Missing, Undefined
 
+if TYPE_CHECKING:  # pragma: no cover
+    from pybotx_smartapp_rpc.lifespan import Resource
+    from pybotx_smartapp_rpc.models.request import RPCArgsBaseModel
+    from pybotx_smartapp_rpc.push_tracker import PushHandle
+    from pybotx_smartapp_rpc.rpc import SmartAppRPC
+    from pybotx_smartapp_rpc.typing import Middleware
+
+ResourceType = TypeVar("ResourceType")
+
+
+@dataclass(frozen=True)
+class SmartAppContext:
+    bot_id: UUID
+    chat_id: UUID
+    ref: UUID | None = None
+    sender_huid: UUID | None = None
+
 
 class SmartApp:
     def __init__(
@@ -13,14 +33,59 @@ class SmartApp:
         bot_id: UUID,
         chat_id: UUID,
         event: SmartAppEvent | None = None,
+        smartapp_rpc: "SmartAppRPC | None" = None,
     ) -> None:
         self.bot = bot
         self.event = event
+        self.smartapp_rpc = smartapp_rpc
 
         self.bot_id = bot_id
         self.chat_id = chat_id
+        self.arrived_at = time.time()
 
         self.state = SimpleNamespace()
+        self.applied_middlewares: list[Middleware] = []
+
+    @property
+    def context(self) -> SmartAppContext:
+        if not self.event:
+            return SmartAppContext(bot_id=self.bot_id, chat_id=self.chat_id)
+
+        return SmartAppContext(
+            bot_id=self.bot_id,
+            chat_id=self.chat_id,
+            ref=self.event.ref,
+            sender_huid=self.event.sender.huid,
+        )
+
+    def resource(self, resource: "Resource[ResourceType]") -> ResourceType:
+        if not self.smartapp_rpc:
+            raise RuntimeError("Resources are available only in SmartAppRPC")
+
+        return self.smartapp_rpc.lifespan.get(resource)
+
+    async def call(
+        self,
+        method_name: str,
+        rpc_arguments: "RPCArgsBaseModel | None" = None,
+        skip_applied_middlewares: bool = False,
+    ) -> Any:
+        if not self.smartapp_rpc:
+            raise RuntimeError("Methods can be called only in SmartAppRPC")
+
+        return await self.smartapp_rpc.router.call_rpc_method(
+            self,
+            method_name,
+            rpc_arguments,
+            skip_applied_middlewares,
+        )
+
+    def spawn(self, coro: Coroutine[Any, Any, Any]) -> bool:
+        if not self.smartapp_rpc:
+            coro.close()
+            raise RuntimeError("Background tasks can be spawned only in SmartAppRPC")
+
+        return self.smartapp_rpc.task_supervisor.spawn(self, coro)
 
     async def send_event(
         self,
@@ -41,6 +106,18 @@ class SmartApp:
         )
 
     async def send_push(self, counter: int, body: Missing[str] = Undefined) -> None:
+        push_debouncer = self.smartapp_rpc.push_debouncer if self.smartapp_rpc else None
+        # after shutdown pushes are sent directly
+        if push_debouncer and not push_debouncer.closed:
+            push_debouncer.push(
+                self.bot,
+                self.bot_id,
+                self.chat_id,
+                counter,
+                body,
+            )
+            return
+
         await self.bot.send_smartapp_notification(
             bot_id=self.bot_id,
             chat_id=self.chat_id,
@@ -65,3 +142,23 @@ class SmartApp:
             wait_callback=wait_callback,
             callback_timeout=callback_timeout,
         )
+
+    async def send_tracked_custom_push(
+        self,
+        title: str,
+        body: str,
+        meta: Missing[dict[str, Any]] = Undefined,
+        callback_timeout: float | None = None,
+    ) -> "PushHandle":
+        if not (self.smartapp_rpc and self.smartapp_rpc.push_tracker):
+            raise RuntimeError("Push tracker is not configured in SmartAppRPC")
+
+        sync_id = await self.send_custom_push(
+            title,
+            body,
+            meta,
+            wait_callback=False,
+            callback_timeout=callback_timeout,
+        )
+
+        return self.smartapp_rpc.push_tracker.track(sync_id)
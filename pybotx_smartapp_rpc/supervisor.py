@@ -0,0 +1,120 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Coroutine
+from dataclasses import dataclass
+from typing import Any
+
+from pybotx_smartapp_rpc.smartapp import SmartApp
+
+TaskExceptionHandler = Callable[[Exception, SmartApp], Awaitable[Any]]
+
+
+@dataclass
+class TaskSupervisorStats:
+    spawned: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    rejected: int = 0
+
+
+class TaskSupervisor:
+    def __init__(
+        self,
+        exception_handler: TaskExceptionHandler,
+        max_concurrency: int = 100,
+        max_queue_size: int = 1000,
+    ) -> None:
+        self._exception_handler = exception_handler
+        self._max_concurrency = max_concurrency
+        self._max_queue_size = max_queue_size
+        self._running = 0
+        self._queue: deque[asyncio.Future[None]] = deque()
+        self._closed = False
+
+        self.tasks: set[asyncio.Task[None]] = set()
+        self.stats = TaskSupervisorStats()
+
+    @property
+    def running_count(self) -> int:
+        return self._running
+
+    @property
+    def queued_count(self) -> int:
+        return len(self._queue)
+
+    def spawn(
+        self,
+        smartapp: SmartApp,
+        coro: Coroutine[Any, Any, Any],
+    ) -> bool:
+        slot_waiter = None
+        if self._closed or (
+            self._running >= self._max_concurrency
+            and len(self._queue) >= self._max_queue_size
+        ):
+            # prevents "coroutine was never awaited" warning
+            coro.close()
+            self.stats.rejected += 1
+            return False
+
+        if self._running < self._max_concurrency:
+            self._running += 1
+        else:
+            slot_waiter = asyncio.get_running_loop().create_future()
+            self._queue.append(slot_waiter)
+
+        # queued tasks are created too, so they can be drained
+        # and cancelled on shutdown the same way as running ones
+        task = asyncio.create_task(self._run(smartapp, coro, slot_waiter))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        self.stats.spawned += 1
+
+        return True
+
+    def close(self) -> None:
+        self._closed = True
+
+    async def _run(
+        self,
+        smartapp: SmartApp,
+        coro: Coroutine[Any, Any, Any],
+        slot_waiter: "asyncio.Future[None] | None",
+    ) -> None:
+        if slot_waiter is not None:
+            try:
+                await slot_waiter
+            except asyncio.CancelledError:
+                coro.close()
+                self.stats.cancelled += 1
+                if not slot_waiter.cancelled():
+                    # slot was already passed to this task
+                    self._release_slot()
+                elif slot_waiter in self._queue:
+                    self._queue.remove(slot_waiter)
+
+                raise
+
+        try:
+            await coro
+        except asyncio.CancelledError:
+            self.stats.cancelled += 1
+            raise
+        except Exception as exc:
+            self.stats.failed += 1
+            await self._exception_handler(exc, smartapp)
+        else:
+            self.stats.completed += 1
+        finally:
+            self._release_slot()
+
+    def _release_slot(self) -> None:
+        while self._queue:
+            slot_waiter = self._queue.popleft()
+            if not slot_waiter.cancelled():
+                # slot is passed to the next queued task in FIFO order
+                slot_waiter.set_result(None)
+                return
+
+        self._running -= 1
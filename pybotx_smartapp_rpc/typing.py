@@ -12,7 +12,11 @@ TArgs = TypeVar("TArgs", bound=RPCArgsBaseModel)
 HandlerWithArgs = Callable[[SmartApp, TArgs], Awaitable[RPCResponse]]
 HandlerWithoutArgs = Callable[[SmartApp], Awaitable[RPCResponse]]
 Handler = HandlerWithArgs | HandlerWithoutArgs
+# called in executor with SmartApp (threads) or SmartAppContext (processes)
+SyncHandler = Callable[..., RPCResponse]
+AnyHandler = Handler | SyncHandler
 Middleware = Callable[[SmartApp, TArgs, HandlerWithArgs], Awaitable[RPCResponse]]
+BeforeHook = Callable[[SmartApp, TArgs], Awaitable[RPCErrorResponse | None]]
 
 TException = TypeVar("TException", bound=Exception)
 ExceptionHandler = Callable[[TException, SmartApp], Awaitable[RPCErrorResponse]]
@@ -0,0 +1,158 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCArgsBaseModel,
+    RPCErrorResponse,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.empty_args import EmptyArgs
+from pybotx_smartapp_rpc.models.errors import RPCError
+from pybotx_smartapp_rpc.typing import BeforeHook
+
+
+class TaskArgs(RPCArgsBaseModel):
+    task_id: int
+
+
+def build_hook(
+    name: str,
+    calls: list[str],
+    delay: float = 0,
+    error_response: RPCErrorResponse | None = None,
+) -> BeforeHook:
+    async def before_hook(
+        smartapp: SmartApp,
+        rpc_arguments: RPCArgsBaseModel,
+    ) -> RPCErrorResponse | None:
+        calls.append(f"{name} started")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            calls.append(f"{name} cancelled")
+            raise
+
+        calls.append(f"{name} finished with {rpc_arguments!r}")
+        return error_response
+
+    return before_hook
+
+
+async def test_before_hooks_run_concurrently(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    calls: list[str] = []
+    rpc = RPCRouter(before_hooks=[build_hook("tenant", calls, delay=0.02)])
+
+    @rpc.method(
+        "get_task",
+        before_hooks=[build_hook("permission", calls, delay=0.01)],
+    )
+    async def get_task(
+        smartapp: SmartApp,
+        rpc_arguments: TaskArgs,
+    ) -> RPCResultResponse[int]:
+        calls.append("handler")
+        return RPCResultResponse(result=rpc_arguments.task_id)
+
+    smartapp_rpc = SmartAppRPC(
+        routers=[rpc],
+        before_hooks=[build_hook("feature_flag", calls)],
+    )
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_task", params={"task_id": 1}),
+        bot,
+    )
+
+    # - Assert -
+    assert response.jsonable_dict()["result"]["data"] == 1
+    assert calls == [
+        "feature_flag started",
+        "tenant started",
+        "permission started",
+        f"feature_flag finished with {TaskArgs(task_id=1)!r}",
+        f"permission finished with {TaskArgs(task_id=1)!r}",
+        f"tenant finished with {TaskArgs(task_id=1)!r}",
+        "handler",
+    ]
+
+
+async def test_before_hook_short_circuits_request(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    calls: list[str] = []
+    forbidden_response = RPCErrorResponse(
+        errors=[RPCError(reason="Forbidden", id="FORBIDDEN")],
+    )
+    rpc = RPCRouter()
+
+    @rpc.method(
+        "get_task",
+        before_hooks=[
+            build_hook("tenant", calls, delay=1),
+            build_hook("permission", calls, error_response=forbidden_response),
+        ],
+    )
+    async def get_task(smartapp: SmartApp) -> RPCResultResponse[int]:
+        calls.append("handler")  # pragma: no cover
+        return RPCResultResponse(result=1)  # pragma: no cover
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_task"),
+        bot,
+    )
+
+    # - Assert -
+    assert response.jsonable_dict()["errors"] == [
+        {"id": "FORBIDDEN", "reason": "Forbidden", "meta": {}},
+    ]
+    assert calls == [
+        "tenant started",
+        "permission started",
+        f"permission finished with {EmptyArgs()!r}",
+        "tenant cancelled",
+    ]
+
+
+async def test_single_before_hook_error_handled(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    async def failing_hook(
+        smartapp: SmartApp,
+        rpc_arguments: RPCArgsBaseModel,
+    ) -> RPCErrorResponse | None:
+        raise ValueError
+
+    rpc = RPCRouter()
+
+    @rpc.method("get_task", before_hooks=[failing_hook])
+    async def get_task(smartapp: SmartApp) -> RPCResultResponse[int]:
+        return RPCResultResponse(result=1)  # pragma: no cover
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_task"),
+        bot,
+    )
+
+    # - Assert -
+    assert response.jsonable_dict()["errors"][0]["id"] == "VALUEERROR"
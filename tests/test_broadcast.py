@@ -0,0 +1,183 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from pybotx_smartapp_rpc import SmartAppRPC
+from pybotx_smartapp_rpc.broadcast import broadcast_event
+
+
+async def test_broadcast_event_to_chats_iterable(
+    bot: AsyncMock,
+    bot_id: UUID,
+) -> None:
+    # - Arrange -
+    smartapp_rpc = SmartAppRPC(routers=[])
+    chat_ids = [uuid4() for _ in range(5)]
+
+    # - Act -
+    summary = await smartapp_rpc.broadcast_event(
+        bot,
+        bot_id,
+        chat_ids,
+        {"catalog": "changed"},
+        max_concurrency=2,
+    )
+
+    # - Assert -
+    assert summary.succeeded == 5
+    assert summary.failed == 0
+    assert bot.send_smartapp_event.await_count == 5
+    bot.send_smartapp_event.assert_any_await(
+        bot_id=bot_id,
+        chat_id=chat_ids[0],
+        data={
+            "status": "ok",
+            "type": "smartapp_rpc",
+            "result": {"catalog": "changed"},
+        },
+        files=[],
+        encrypted=True,
+    )
+
+
+async def test_broadcast_event_to_chats_async_iterable(
+    bot: AsyncMock,
+    bot_id: UUID,
+) -> None:
+    # - Arrange -
+    chat_ids = [uuid4() for _ in range(5)]
+
+    async def fetch_chat_ids() -> AsyncIterator[UUID]:
+        for chat_id in chat_ids:
+            await asyncio.sleep(0)
+            yield chat_id
+
+    # - Act -
+    summary = await broadcast_event(
+        bot,
+        bot_id,
+        fetch_chat_ids(),
+        data={},
+        max_concurrency=3,
+    )
+
+    # - Assert -
+    assert summary.succeeded == 5
+    sent_chat_ids = [
+        send_call.kwargs["chat_id"]
+        for send_call in bot.send_smartapp_event.await_args_list
+    ]
+    assert sorted(sent_chat_ids) == sorted(chat_ids)
+
+
+async def test_broadcast_event_concurrency_is_bounded(
+    bot: AsyncMock,
+    bot_id: UUID,
+) -> None:
+    # - Arrange -
+    in_flight = 0
+    max_in_flight = 0
+
+    async def send_smartapp_event(**kwargs: Any) -> None:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+
+    bot.send_smartapp_event.side_effect = send_smartapp_event
+
+    # - Act -
+    summary = await broadcast_event(
+        bot,
+        bot_id,
+        (uuid4() for _ in range(20)),
+        data={},
+        max_concurrency=4,
+    )
+
+    # - Assert -
+    assert summary.succeeded == 20
+    assert max_in_flight == 4
+
+
+async def test_broadcast_event_collects_failures(
+    bot: AsyncMock,
+    bot_id: UUID,
+) -> None:
+    # - Arrange -
+    failed_chat_id = uuid4()
+
+    async def send_smartapp_event(**kwargs: Any) -> None:
+        if kwargs["chat_id"] == failed_chat_id:
+            raise RuntimeError("Chat not found")
+
+    bot.send_smartapp_event.side_effect = send_smartapp_event
+
+    # - Act -
+    summary = await broadcast_event(
+        bot,
+        bot_id,
+        [uuid4(), failed_chat_id, uuid4()],
+        data={},
+    )
+
+    # - Assert -
+    assert summary.succeeded == 2
+    assert summary.failed == 1
+    assert summary.failed_chat_ids == [failed_chat_id]
+
+
+async def test_broadcast_event_with_rate_limit(
+    bot: AsyncMock,
+    bot_id: UUID,
+) -> None:
+    # - Arrange -
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+
+    # - Act -
+    summary = await broadcast_event(
+        bot,
+        bot_id,
+        [uuid4() for _ in range(3)],
+        data={},
+        rate_limit=100,
+    )
+
+    # - Assert -
+    assert summary.succeeded == 3
+    assert loop.time() - started_at >= 0.02
+
+
+@pytest.mark.parametrize(
+    ("max_concurrency", "rate_limit", "message"),
+    [
+        (0, None, "concurrency must be at least 1"),
+        (1, 0, "rate limit must be positive"),
+    ],
+)
+async def test_broadcast_event_wrong_options(
+    bot: AsyncMock,
+    bot_id: UUID,
+    max_concurrency: int,
+    rate_limit: float | None,
+    message: str,
+) -> None:
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+        await broadcast_event(
+            bot,
+            bot_id,
+            [],
+            data={},
+            max_concurrency=max_concurrency,
+            rate_limit=rate_limit,
+        )
+
+    # - Assert -
+    assert message in str(exc.value)
@@ -0,0 +1,389 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCArgsBaseModel,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.typing import HandlerWithArgs, RPCResponse
+
+
+class SearchArgs(RPCArgsBaseModel):
+    query: str
+    field: str = "name"
+
+
+def build_smartapp_rpc(
+    release_search: asyncio.Event,
+    cleanups: list[str],
+) -> SmartAppRPC:
+    async def cleanup_middleware(
+        smartapp: SmartApp,
+        rpc_arguments: SearchArgs,
+        call_next: HandlerWithArgs,
+    ) -> RPCResponse:
+        try:
+            return await call_next(smartapp, rpc_arguments)
+        finally:
+            cleanups.append(rpc_arguments.query)
+
+    def search_field_key(smartapp: SmartApp) -> str:
+        return smartapp.event.data["params"]["field"] if smartapp.event else ""
+
+    rpc = RPCRouter(middlewares=[cleanup_middleware])
+
+    @rpc.method("search", supersede=True)
+    async def search(
+        smartapp: SmartApp,
+        rpc_arguments: SearchArgs,
+    ) -> RPCResultResponse[str]:
+        await release_search.wait()
+        return RPCResultResponse(result=rpc_arguments.query)
+
+    @rpc.method("search_in_field", supersede=search_field_key)
+    async def search_in_field(
+        smartapp: SmartApp,
+        rpc_arguments: SearchArgs,
+    ) -> RPCResultResponse[str]:
+        await release_search.wait()
+        return RPCResultResponse(result=rpc_arguments.query)
+
+    return SmartAppRPC(routers=[rpc])
+
+
+def build_search_event(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    template_event: SmartAppEvent | None,
+    method: str,
+    **params: str,
+) -> SmartAppEvent:
+    event = smartapp_event_factory(method, params=params)
+    if template_event:
+        event.sender = template_event.sender
+
+    return event
+
+
+async def test_superseded_call_cancelled(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    release_search = asyncio.Event()
+    cleanups: list[str] = []
+    smartapp_rpc = build_smartapp_rpc(release_search, cleanups)
+
+    first_event = build_search_event(smartapp_event_factory, None, "search", query="a")
+    first_task = asyncio.create_task(
+        smartapp_rpc.handle_sync_smartapp_event(first_event, bot),
+    )
+    await asyncio.sleep(0)
+
+    # - Act -
+    second_task = asyncio.create_task(
+        smartapp_rpc.handle_sync_smartapp_event(
+            build_search_event(
+                smartapp_event_factory,
+                first_event,
+                "search",
+                query="ab",
+            ),
+            bot,
+        ),
+    )
+    first_response = await first_task
+    release_search.set()
+    second_response = await second_task
+
+    # - Assert -
+    assert first_response.jsonable_dict()["errors"] == [
+        {
+            "id": "CANCELLED",
+            "reason": "Request was cancelled",
+            "meta": {"cancel_reason": "superseded"},
+        },
+    ]
+    assert second_response.jsonable_dict()["result"]["data"] == "ab"
+    assert cleanups == ["a", "ab"]
+    assert smartapp_rpc.cancellable_calls.stats.superseded == 1
+    assert smartapp_rpc.cancellable_calls.running_count == 0
+
+
+async def test_calls_of_other_senders_and_keys_not_superseded(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    release_search = asyncio.Event()
+    cleanups: list[str] = []
+    smartapp_rpc = build_smartapp_rpc(release_search, cleanups)
+
+    first_event = build_search_event(
+        smartapp_event_factory,
+        None,
+        "search_in_field",
+        query="a",
+        field="name",
+    )
+    events = [
+        first_event,
+        build_search_event(smartapp_event_factory, None, "search", query="b"),
+        build_search_event(smartapp_event_factory, None, "search", query="c"),
+        build_search_event(
+            smartapp_event_factory,
+            first_event,
+            "search_in_field",
+            query="d",
+            field="email",
+        ),
+    ]
+
+    # - Act -
+    handle_tasks = []
+    for event in events:
+        handle_tasks.append(
+            asyncio.create_task(smartapp_rpc.handle_smartapp_event(event, bot)),
+        )
+        await asyncio.sleep(0)
+
+    running_count = smartapp_rpc.cancellable_calls.running_count
+    release_search.set()
+    await asyncio.gather(*handle_tasks)
+
+    # - Assert -
+    assert running_count == 4
+    assert sorted(
+        send_call.kwargs["data"]["result"]
+        for send_call in bot.send_smartapp_event.await_args_list
+    ) == ["a", "b", "c", "d"]
+    assert smartapp_rpc.cancellable_calls.stats.superseded == 0
+
+
+async def test_supersedable_call_cancelled_with_caller(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    release_search = asyncio.Event()
+    cleanups: list[str] = []
+    smartapp_rpc = build_smartapp_rpc(release_search, cleanups)
+
+    handle_task = asyncio.create_task(
+        smartapp_rpc.handle_smartapp_event(
+            smartapp_event_factory("search", params={"query": "a"}),
+            bot,
+        ),
+    )
+    await asyncio.sleep(0)
+
+    # - Act -
+    handle_task.cancel()
+
+    # - Assert -
+    with pytest.raises(asyncio.CancelledError):
+        await handle_task
+
+    assert cleanups == ["a"]
+    assert smartapp_rpc.cancellable_calls.running_count == 0
+
+
+def build_cancellable_smartapp_rpc(
+    release_export: asyncio.Event,
+    cleanups: list[str],
+    max_cancellable_calls: int = 10_000,
+) -> SmartAppRPC:
+    rpc = RPCRouter()
+
+    @rpc.method("export")
+    async def export(smartapp: SmartApp) -> RPCResultResponse[str]:
+        try:
+            await release_export.wait()
+        finally:
+            cleanups.append("export")
+
+        return RPCResultResponse(result="exported")
+
+    return SmartAppRPC(
+        routers=[rpc],
+        cancel_method="cancel",
+        max_cancellable_calls=max_cancellable_calls,
+    )
+
+
+def build_event_with_new_ref(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    method: str,
+    sender_event: SmartAppEvent | None = None,
+    **params: Any,
+) -> SmartAppEvent:
+    event = smartapp_event_factory(method, params=params)
+    event.ref = uuid4()
+    if sender_event:
+        event.sender = sender_event.sender
+
+    return event
+
+
+async def test_call_cancelled_by_client(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    release_export = asyncio.Event()
+    cleanups: list[str] = []
+    smartapp_rpc = build_cancellable_smartapp_rpc(release_export, cleanups)
+
+    export_event = build_event_with_new_ref(smartapp_event_factory, "export")
+    export_task = asyncio.create_task(
+        smartapp_rpc.handle_sync_smartapp_event(export_event, bot),
+    )
+    # let handler start
+    await asyncio.sleep(0.01)
+
+    # - Act -
+    cancel_response = await smartapp_rpc.handle_sync_smartapp_event(
+        build_event_with_new_ref(
+            smartapp_event_factory,
+            "cancel",
+            export_event,
+            ref=str(export_event.ref),
+        ),
+        bot,
+    )
+    export_response = await export_task
+
+    # - Assert -
+    assert cancel_response.jsonable_dict()["result"]["data"] is True
+    assert export_response.jsonable_dict()["errors"] == [
+        {
+            "id": "CANCELLED",
+            "reason": "Request was cancelled",
+            "meta": {"cancel_reason": "cancelled_by_client"},
+        },
+    ]
+    assert cleanups == ["export"]
+    assert smartapp_rpc.cancellable_calls.stats.cancelled_by_client == 1
+    assert smartapp_rpc.cancellable_calls.running_count == 0
+
+
+async def test_call_not_cancelled_by_other_user_or_wrong_ref(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    release_export = asyncio.Event()
+    cleanups: list[str] = []
+    smartapp_rpc = build_cancellable_smartapp_rpc(
+        release_export,
+        cleanups,
+        max_cancellable_calls=1,
+    )
+
+    first_export_event, second_export_event = (
+        build_event_with_new_ref(smartapp_event_factory, "export") for _ in range(2)
+    )
+    export_tasks = [
+        asyncio.create_task(smartapp_rpc.handle_sync_smartapp_event(event, bot))
+        for event in (first_export_event, second_export_event)
+    ]
+    await asyncio.sleep(0)
+
+    cancel_events = [
+        # other user
+        build_event_with_new_ref(
+            smartapp_event_factory,
+            "cancel",
+            ref=str(second_export_event.ref),
+        ),
+        # evicted from registry
+        build_event_with_new_ref(
+            smartapp_event_factory,
+            "cancel",
+            first_export_event,
+            ref=str(first_export_event.ref),
+        ),
+        build_event_with_new_ref(smartapp_event_factory, "cancel", ref="wrong"),
+    ]
+
+    # - Act -
+    cancel_responses = [
+        await smartapp_rpc.handle_sync_smartapp_event(cancel_event, bot)
+        for cancel_event in cancel_events
+    ]
+    release_export.set()
+    export_responses = await asyncio.gather(*export_tasks)
+
+    # - Assert -
+    assert [
+        cancel_response.jsonable_dict()["result"]["data"]
+        for cancel_response in cancel_responses[:2]
+    ] == [False, False]
+    assert cancel_responses[2].jsonable_dict()["errors"][0]["meta"] == {
+        "location": ["ref"],
+    }
+    assert [
+        export_response.jsonable_dict()["result"]["data"]
+        for export_response in export_responses
+    ] == ["exported", "exported"]
+    assert smartapp_rpc.cancellable_calls.stats.evicted == 1
+
+
+async def test_cancelled_call_cleanup_finished_before_shutdown(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    cleanups: list[str] = []
+    rpc = RPCRouter()
+
+    @rpc.method("export")
+    async def export(smartapp: SmartApp) -> RPCResultResponse[str]:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await asyncio.sleep(0.01)
+            cleanups.append("export")
+
+        return RPCResultResponse(result="exported")  # pragma: no cover
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc], cancel_method="cancel")
+    handle_task = asyncio.create_task(
+        smartapp_rpc.handle_smartapp_event(
+            build_event_with_new_ref(smartapp_event_factory, "export"),
+            bot,
+        ),
+    )
+    await asyncio.sleep(0)
+
+    # - Act -
+    shutdown_summary = await smartapp_rpc.shutdown(timeout=0.01)
+
+    # - Assert -
+    assert shutdown_summary.cancelled_requests == 1
+    assert cleanups == ["export"]
+    assert handle_task.done()
+
+
+def test_cancel_method_conflicts_with_registered_method() -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+
+    @rpc.method("cancel")
+    async def cancel(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result="cancelled")  # pragma: no cover
+
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+        SmartAppRPC(routers=[rpc], cancel_method="cancel")
+
+    # - Assert -
+    assert "RPC method cancel already registered" in str(exc.value)
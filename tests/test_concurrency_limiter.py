@@ -0,0 +1,179 @@
+import asyncio
+from collections.abc import Callable
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import RPCResultResponse, RPCRouter, SmartApp, SmartAppRPC
+from pybotx_smartapp_rpc.concurrency_limiter import AdaptiveConcurrencyLimiter
+
+
+@pytest.fixture
+def monotonic(mocker) -> MagicMock:
+    time_mock = mocker.patch("pybotx_smartapp_rpc.concurrency_limiter.time")
+    time_mock.monotonic.return_value = 100.0
+    return time_mock.monotonic
+
+
+def run_requests_batch(
+    limiter: AdaptiveConcurrencyLimiter,
+    monotonic: MagicMock,
+    rtt: float,
+) -> None:
+    with ExitStack() as requests_stack:
+        # use all available concurrency
+        while concurrency_lease := limiter.try_acquire("search"):
+            requests_stack.enter_context(concurrency_lease)
+
+        monotonic.return_value += rtt
+
+
+async def test_concurrency_limit_exceeded(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    release_handler = asyncio.Event()
+
+    @rpc.method("search")
+    async def search(smartapp: SmartApp) -> RPCResultResponse[int]:
+        await release_handler.wait()
+        return RPCResultResponse(result=1)
+
+    @rpc.method("get_api_version")
+    async def get_api_version(smartapp: SmartApp) -> RPCResultResponse[int]:
+        return RPCResultResponse(result=1)
+
+    concurrency_limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=1,
+        max_limit=1,
+        per_method=True,
+        methods={"search"},
+    )
+    smartapp_rpc = SmartAppRPC(routers=[rpc], concurrency_limiter=concurrency_limiter)
+
+    # - Act -
+    search_task = asyncio.create_task(
+        smartapp_rpc.handle_smartapp_event(smartapp_event_factory("search"), bot),
+    )
+    await asyncio.sleep(0)
+    overloaded_response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("search"),
+        bot,
+    )
+    version_response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_api_version"),
+        bot,
+    )
+    release_handler.set()
+    await search_task
+
+    # - Assert -
+    assert overloaded_response.jsonable_dict()["errors"] == [
+        {
+            "id": "OVERLOADED",
+            "reason": "Server is overloaded, try again later",
+            "meta": {},
+        },
+    ]
+    assert version_response.jsonable_dict()["status"] == "ok"
+    assert bot.send_smartapp_event.await_args.kwargs["data"]["status"] == "ok"
+    assert smartapp_rpc.concurrency_limiter is concurrency_limiter
+
+    search_stats = concurrency_limiter.stats["search"]
+    assert (search_stats.accepted, search_stats.rejected) == (1, 1)
+    assert search_stats.in_flight == 0
+    assert search_stats.rtt is not None
+    assert list(concurrency_limiter.stats) == ["search"]
+
+
+def test_concurrency_limit_increased_while_latency_is_stable(
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8)
+
+    # - Act -
+    for _ in range(30):
+        run_requests_batch(limiter, monotonic, rtt=0.1)
+
+    # - Assert -
+    limit_stats = limiter.stats["*"]
+    assert limit_stats.limit == 8
+    assert limit_stats.rtt == pytest.approx(0.1)
+    assert limit_stats.long_rtt == pytest.approx(0.1)
+
+
+def test_concurrency_limit_decreased_when_latency_grows(
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, min_limit=2)
+    run_requests_batch(limiter, monotonic, rtt=0.1)
+    stable_limit = limiter.stats["*"].limit
+
+    # - Act -
+    for _ in range(30):
+        run_requests_batch(limiter, monotonic, rtt=1)
+
+    # - Assert -
+    assert limiter.stats["*"].limit < stable_limit / 2
+
+
+def test_concurrency_limit_not_changed_while_underused(
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, long_window=3)
+
+    # - Act -
+    for rtt in (0.1, 5, 0.1):
+        with limiter.try_acquire("search"):  # type: ignore[union-attr]
+            monotonic.return_value += rtt
+
+    # - Assert -
+    limit_stats = limiter.stats["*"]
+    assert limit_stats.limit == 10
+    assert limit_stats.rtt == pytest.approx(0.1)
+    # long-term rtt decays faster after latency has recovered
+    assert limit_stats.long_rtt == pytest.approx(1.325 * 0.95)
+
+
+def test_concurrency_limit_with_instant_handler(monotonic: MagicMock) -> None:
+    # - Arrange -
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+
+    # - Act -
+    run_requests_batch(limiter, monotonic, rtt=0)
+
+    # - Assert -
+    assert limiter.stats["*"].limit == pytest.approx(1.2)
+
+
+def test_concurrency_limit_not_updated_by_failed_request(
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+
+    # - Act -
+    with pytest.raises(asyncio.CancelledError):
+        with limiter.try_acquire("search"):  # type: ignore[union-attr]
+            raise asyncio.CancelledError
+
+    # - Assert -
+    limit_stats = limiter.stats["*"]
+    assert (limit_stats.limit, limit_stats.in_flight) == (1, 0)
+    assert limit_stats.rtt is None
+
+
+def test_concurrency_limit_wrong_options() -> None:
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+        AdaptiveConcurrencyLimiter(initial_limit=10, max_limit=5)
+
+    # - Assert -
+    assert "0 < min <= initial <= max" in str(exc.value)
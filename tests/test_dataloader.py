@@ -0,0 +1,192 @@
+import asyncio
+from collections.abc import Callable, Mapping, Sequence
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCArgsBaseModel,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.dataloader import DataLoader
+
+
+class UsersArgs(RPCArgsBaseModel):
+    user_ids: list[int]
+
+
+def build_smartapp(bot: AsyncMock, bot_id: UUID, chat_id: UUID) -> SmartApp:
+    return SmartApp(bot=bot, bot_id=bot_id, chat_id=chat_id)
+
+
+async def test_loads_of_concurrent_requests_batched(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    loaded_batches: list[list[int]] = []
+
+    async def load_users(user_ids: list[int]) -> list[str]:
+        loaded_batches.append(user_ids)
+        return [f"user {user_id}" for user_id in user_ids]
+
+    users_loader: DataLoader[int, str] = DataLoader(load_users)
+    rpc = RPCRouter()
+
+    @rpc.method("get_users")
+    async def get_users(
+        smartapp: SmartApp,
+        rpc_arguments: UsersArgs,
+    ) -> RPCResultResponse[list[str]]:
+        users = await users_loader.load_many(smartapp, rpc_arguments.user_ids)
+        # second load in the same request is served from request cache
+        await users_loader.load(smartapp, rpc_arguments.user_ids[0])
+        return RPCResultResponse(result=users)
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    responses = await asyncio.gather(
+        *(
+            smartapp_rpc.handle_sync_smartapp_event(
+                smartapp_event_factory("get_users", params={"user_ids": user_ids}),
+                bot,
+            )
+            for user_ids in ([1, 2], [2, 3])
+        ),
+    )
+
+    # - Assert -
+    assert [response.jsonable_dict()["result"]["data"] for response in responses] == [
+        ["user 1", "user 2"],
+        ["user 2", "user 3"],
+    ]
+    assert loaded_batches == [[1, 2, 3]]
+    assert users_loader.stats.batches == 1
+    assert users_loader.stats.loaded_keys == 3
+    assert users_loader.stats.cache_hits == 2
+
+
+async def test_cache_not_shared_between_requests(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    load_users = AsyncMock(side_effect=lambda user_ids: {1: "user 1"})
+    users_loader: DataLoader[int, str] = DataLoader(load_users)
+
+    await users_loader.load(build_smartapp(bot, bot_id, chat_id), 1)
+
+    # - Act -
+    user = await users_loader.load(build_smartapp(bot, bot_id, chat_id), 1)
+
+    # - Assert -
+    assert user == "user 1"
+    assert load_users.await_count == 2
+    assert users_loader.stats.cache_hits == 0
+
+
+async def test_missing_key_of_mapping_raises_key_error(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    async def load_users(user_ids: list[int]) -> Mapping[int, str]:
+        return {1: "user 1"}
+
+    users_loader: DataLoader[int, str] = DataLoader(load_users)
+    smartapp = build_smartapp(bot, bot_id, chat_id)
+
+    # - Act -
+    results = await asyncio.gather(
+        users_loader.load(smartapp, 1),
+        users_loader.load(smartapp, 2),
+        return_exceptions=True,
+    )
+
+    # - Assert -
+    assert results[0] == "user 1"
+    assert isinstance(results[1], KeyError)
+
+
+async def test_batch_error_raised_for_all_keys_and_not_cached(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    load_users = AsyncMock(side_effect=[RuntimeError("db is down"), ["user 1"]])
+    users_loader: DataLoader[int, str] = DataLoader(load_users)
+    smartapp = build_smartapp(bot, bot_id, chat_id)
+
+    # - Act -
+    results = await asyncio.gather(
+        users_loader.load(smartapp, 1),
+        users_loader.load(smartapp, 2),
+        return_exceptions=True,
+    )
+    retried_user = await users_loader.load(smartapp, 1)
+
+    # - Assert -
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried_user == "user 1"
+
+
+async def test_wrong_number_of_values_raises_value_error(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    async def load_users(user_ids: list[int]) -> Sequence[str]:
+        return []
+
+    users_loader: DataLoader[int, str] = DataLoader(load_users)
+
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+        await users_loader.load(build_smartapp(bot, bot_id, chat_id), 1)
+
+    # - Assert -
+    assert str(exc.value) == "Batch function returned 0 values for 1 keys"
+
+
+async def test_batch_split_by_max_size_and_collected_within_window(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    loaded_batches: list[list[int]] = []
+
+    async def load_users(user_ids: list[int]) -> list[int]:
+        loaded_batches.append(user_ids)
+        return user_ids
+
+    users_loader: DataLoader[int, int] = DataLoader(
+        load_users,
+        max_batch_size=2,
+        batch_window=0.01,
+    )
+    smartapp = build_smartapp(bot, bot_id, chat_id)
+
+    async def load_later(user_id: int) -> int:
+        await asyncio.sleep(0)
+        return await users_loader.load(smartapp, user_id)
+
+    # - Act -
+    users = await asyncio.gather(
+        users_loader.load_many(smartapp, [1, 2, 3]),
+        load_later(4),
+    )
+
+    # - Assert -
+    assert users == [[1, 2, 3], 4]
+    assert loaded_batches == [[1, 2], [3, 4]]
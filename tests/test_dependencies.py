@@ -0,0 +1,214 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    Depends,
+    RPCArgsBaseModel,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+
+
+class GreetArgs(RPCArgsBaseModel):
+    greeting: str
+
+
+async def test_dependencies_resolved_concurrently_and_cached(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    calls: list[str] = []
+
+    async def get_user(smartapp: SmartApp) -> str:
+        calls.append("user started")
+        await asyncio.sleep(0.01)
+        calls.append("user finished")
+        return "Ivan"
+
+    def get_language() -> str:
+        calls.append("language")
+        return "ru"
+
+    async def get_title(user: str = Depends(get_user)) -> str:
+        calls.append("title")
+        return f"Mr. {user}"
+
+    rpc = RPCRouter()
+
+    @rpc.method("greet")
+    async def greet(
+        smartapp: SmartApp,
+        rpc_arguments: GreetArgs,
+        user: str = Depends(get_user),
+        title: str = Depends(get_title),
+        language: str = Depends(get_language),
+    ) -> RPCResultResponse[str]:
+        return RPCResultResponse(
+            result=f"{rpc_arguments.greeting}, {title} ({user}, {language})",
+        )
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("greet", params={"greeting": "Hello"}),
+        bot,
+    )
+
+    # - Assert -
+    assert response.jsonable_dict()["result"]["data"] == "Hello, Mr. Ivan (Ivan, ru)"
+    assert calls == ["user started", "language", "user finished", "title"]
+    assert rpc.rpc_methods["greet"].arguments_model is GreetArgs
+
+
+async def test_not_cached_dependency_called_for_every_dependant(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    tokens = iter(["first", "second"])
+
+    async def get_token() -> str:
+        return next(tokens)
+
+    async def get_headers(token: str = Depends(get_token, use_cache=False)) -> str:
+        return token
+
+    rpc = RPCRouter()
+
+    @rpc.method("get_tokens")
+    async def get_tokens(
+        smartapp: SmartApp,
+        token: str = Depends(get_token, use_cache=False),
+        headers: str = Depends(get_headers),
+    ) -> RPCResultResponse[list[str]]:
+        return RPCResultResponse(result=sorted([token, headers]))
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_tokens"),
+        bot,
+    )
+
+    # - Assert -
+    assert response.jsonable_dict()["result"]["data"] == ["first", "second"]
+    assert rpc.rpc_methods["get_tokens"].arguments_model is None
+
+
+async def test_dependencies_passed_to_handler_in_executor(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    async def get_rows() -> list[int]:
+        return [1, 2, 3]
+
+    rpc = RPCRouter()
+
+    @rpc.method("sum_rows")
+    def sum_rows(
+        smartapp: SmartApp,
+        rows: list[int] = Depends(get_rows),
+    ) -> RPCResultResponse[int]:
+        return RPCResultResponse(result=sum(rows))
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("sum_rows"),
+        bot,
+    )
+    smartapp_rpc.executors.shutdown()
+
+    # - Assert -
+    assert response.jsonable_dict()["result"]["data"] == 6
+
+
+async def test_dependency_error_cancels_other_dependencies(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    cancelled = asyncio.Event()
+
+    async def get_user() -> str:
+        raise ValueError
+
+    async def get_settings() -> str:
+        try:
+            await asyncio.sleep(1)
+        finally:
+            cancelled.set()
+
+        return "settings"  # pragma: no cover
+
+    async def get_chat() -> str:
+        return "chat"
+
+    rpc = RPCRouter()
+
+    @rpc.method("get_profile")
+    async def get_profile(
+        smartapp: SmartApp,
+        chat: str = Depends(get_chat),
+        user: str = Depends(get_user),
+        settings: str = Depends(get_settings),
+    ) -> RPCResultResponse[str]:
+        return RPCResultResponse(result=user)  # pragma: no cover
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_profile"),
+        bot,
+    )
+    await asyncio.sleep(0)
+
+    # - Assert -
+    assert response.jsonable_dict()["errors"][0]["id"] == "VALUEERROR"
+    assert cancelled.is_set()
+
+
+def test_methods_without_dependencies_not_analysed() -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+
+    # - Act -
+    @rpc.method("get_api_version")
+    async def get_api_version(smartapp: SmartApp) -> RPCResultResponse[int]:
+        return RPCResultResponse(result=1)  # pragma: no cover
+
+    # - Assert -
+    assert rpc.rpc_methods["get_api_version"].dependant is None
+
+
+def test_dependency_with_unknown_parameters() -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+
+    async def get_user(smartapp: SmartApp, user_id: int) -> str:
+        return "Ivan"  # pragma: no cover
+
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+
+        @rpc.method("get_user")
+        async def get_user_name(
+            smartapp: SmartApp,
+            user: str = Depends(get_user),
+        ) -> RPCResultResponse[str]:
+            return RPCResultResponse(result=user)  # pragma: no cover
+
+    # - Assert -
+    assert "Dependency get_user can accept only SmartApp" in str(exc.value)
@@ -0,0 +1,214 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+from pybotx import BotAccount, SmartAppEvent
+
+from pybotx_smartapp_rpc import RPCResultResponse, RPCRouter, SmartApp, SmartAppRPC
+from pybotx_smartapp_rpc.dispatcher import BotDispatchStats, SmartAppRPCDispatcher
+from pybotx_smartapp_rpc.draining import ShutdownSummary
+
+
+def build_event(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot_id: UUID,
+    method: str = "get_status",
+) -> SmartAppEvent:
+    event = smartapp_event_factory(method)
+    event.bot = BotAccount(id=bot_id, host=event.bot.host)
+    return event
+
+
+def build_router(release_export: asyncio.Event | None = None) -> RPCRouter:
+    rpc = RPCRouter()
+
+    @rpc.method("get_status")
+    async def get_status(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result="ok")
+
+    @rpc.method("export")
+    async def export(smartapp: SmartApp) -> RPCResultResponse[str]:
+        if release_export:
+            await release_export.wait()
+
+        return RPCResultResponse(result=str(smartapp.bot_id))
+
+    return rpc
+
+
+async def test_events_routed_by_bot_id(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    first_bot_id, second_bot_id = uuid4(), uuid4()
+    rpc = build_router()
+    dispatcher = SmartAppRPCDispatcher(
+        {
+            first_bot_id: SmartAppRPC(routers=[rpc]),
+            second_bot_id: SmartAppRPC(routers=[rpc]),
+        },
+    )
+
+    # - Act -
+    first_response = await dispatcher.handle_sync_smartapp_event(
+        build_event(smartapp_event_factory, first_bot_id, "export"),
+        bot,
+    )
+    await dispatcher.handle_smartapp_event(
+        build_event(smartapp_event_factory, second_bot_id, "export"),
+        bot,
+    )
+    unknown_bot_response = await dispatcher.handle_sync_smartapp_event(
+        build_event(smartapp_event_factory, uuid4()),
+        bot,
+    )
+    await dispatcher.handle_smartapp_event(
+        build_event(smartapp_event_factory, uuid4()),
+        bot,
+    )
+
+    # - Assert -
+    assert first_response.jsonable_dict()["result"]["data"] == str(first_bot_id)
+    sent_data = [
+        send_call.kwargs["data"]
+        for send_call in bot.send_smartapp_event.await_args_list
+    ]
+    assert sent_data[0]["result"] == str(second_bot_id)
+    unknown_bot_error = {
+        "id": "UNKNOWN_BOT",
+        "reason": "Bot is not served by this SmartApp",
+        "meta": {},
+    }
+    assert unknown_bot_response.jsonable_dict()["errors"] == [unknown_bot_error]
+    assert sent_data[1]["errors"] == [unknown_bot_error]
+    assert dispatcher.stats.bots == {
+        first_bot_id: BotDispatchStats(handled=1),
+        second_bot_id: BotDispatchStats(handled=1),
+    }
+    assert dispatcher.stats.unknown_bot == 2
+    assert dispatcher.get_app(first_bot_id) is dispatcher.apps[first_bot_id]
+    assert (
+        dispatcher.apps[first_bot_id].router.rpc_methods["export"].handler
+        is dispatcher.apps[second_bot_id].router.rpc_methods["export"].handler
+    )
+
+
+async def test_bot_in_flight_events_limited(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    first_bot_id, second_bot_id = uuid4(), uuid4()
+    release_export = asyncio.Event()
+    rpc = build_router(release_export)
+    dispatcher = SmartAppRPCDispatcher(
+        {
+            first_bot_id: SmartAppRPC(routers=[rpc]),
+            second_bot_id: SmartAppRPC(routers=[rpc]),
+        },
+        max_in_flight_per_bot=1,
+    )
+
+    export_task = asyncio.create_task(
+        dispatcher.handle_smartapp_event(
+            build_event(smartapp_event_factory, first_bot_id, "export"),
+            bot,
+        ),
+    )
+    await asyncio.sleep(0)
+
+    # - Act -
+    rejected_response = await dispatcher.handle_sync_smartapp_event(
+        build_event(smartapp_event_factory, first_bot_id),
+        bot,
+    )
+    other_bot_response = await dispatcher.handle_sync_smartapp_event(
+        build_event(smartapp_event_factory, second_bot_id),
+        bot,
+    )
+    in_flight = dispatcher.stats.bots[first_bot_id].in_flight
+    release_export.set()
+    await export_task
+
+    # - Assert -
+    assert rejected_response.jsonable_dict()["errors"][0]["id"] == "OVERLOADED"
+    assert other_bot_response.jsonable_dict()["result"]["data"] == "ok"
+    assert in_flight == 1
+    assert dispatcher.stats.bots[first_bot_id] == BotDispatchStats(
+        handled=1,
+        rejected=1,
+    )
+
+
+async def test_shared_app_started_and_shut_down_once() -> None:
+    # - Arrange -
+    first_bot_id, second_bot_id = uuid4(), uuid4()
+    on_startup = AsyncMock()
+    on_shutdown = AsyncMock()
+    smartapp_rpc = SmartAppRPC(
+        routers=[],
+        on_startup=[on_startup],
+        on_shutdown=[on_shutdown],
+    )
+    dispatcher = SmartAppRPCDispatcher(
+        {first_bot_id: smartapp_rpc, second_bot_id: smartapp_rpc},
+    )
+
+    # - Act -
+    await dispatcher.startup()
+    shutdown_summaries = await dispatcher.shutdown(timeout=1)
+
+    # - Assert -
+    on_startup.assert_awaited_once()
+    on_shutdown.assert_awaited_once()
+    assert shutdown_summaries == {
+        first_bot_id: ShutdownSummary(),
+        second_bot_id: ShutdownSummary(),
+    }
+
+
+async def test_apps_drained_together(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    first_bot_id, second_bot_id = uuid4(), uuid4()
+    rpc = build_router(asyncio.Event())
+    dispatcher = SmartAppRPCDispatcher(
+        {
+            first_bot_id: SmartAppRPC(routers=[rpc]),
+            second_bot_id: SmartAppRPC(routers=[rpc]),
+        },
+    )
+    export_tasks = [
+        asyncio.create_task(
+            dispatcher.handle_smartapp_event(
+                build_event(smartapp_event_factory, bot_id, "export"),
+                bot,
+            ),
+        )
+        for bot_id in (first_bot_id, second_bot_id)
+    ]
+    await asyncio.sleep(0)
+    loop = asyncio.get_running_loop()
+    shutdown_started_at = loop.time()
+
+    # - Act -
+    shutdown_task = asyncio.create_task(dispatcher.shutdown(timeout=0.05))
+    await asyncio.sleep(0)
+    rejected_response = await dispatcher.handle_sync_smartapp_event(
+        build_event(smartapp_event_factory, second_bot_id),
+        bot,
+    )
+    shutdown_summaries = await shutdown_task
+
+    # - Assert -
+    assert loop.time() - shutdown_started_at < 0.1
+    assert rejected_response.jsonable_dict()["errors"][0]["id"] == "SHUTTING_DOWN"
+    assert shutdown_summaries == {
+        first_bot_id: ShutdownSummary(cancelled_requests=1),
+        second_bot_id: ShutdownSummary(cancelled_requests=1),
+    }
+    assert all(export_task.done() for export_task in export_tasks)
@@ -0,0 +1,130 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import AsyncMock
+
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import RPCResultResponse, RPCRouter, SmartApp, SmartAppRPC
+from pybotx_smartapp_rpc.draining import ShutdownSummary
+
+
+def build_smartapp_rpc(
+    release_export: asyncio.Event,
+    cleanups: list[str],
+) -> SmartAppRPC:
+    rpc = RPCRouter()
+
+    @rpc.method("export", sync_budget=0.01)
+    async def export(smartapp: SmartApp) -> RPCResultResponse[str]:
+        try:
+            await release_export.wait()
+        finally:
+            cleanups.append("export")
+
+        return RPCResultResponse(result="exported")
+
+    return SmartAppRPC(routers=[rpc])
+
+
+async def test_in_flight_requests_completed_and_new_rejected(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    release_export = asyncio.Event()
+    smartapp_rpc = build_smartapp_rpc(release_export, [])
+
+    export_task = asyncio.create_task(
+        smartapp_rpc.handle_smartapp_event(smartapp_event_factory("export"), bot),
+    )
+    deferred_response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("export"),
+        bot,
+    )
+
+    # - Act -
+    shutdown_task = asyncio.create_task(smartapp_rpc.shutdown(timeout=1))
+    await asyncio.sleep(0)
+    rejected_response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("export"),
+        bot,
+    )
+    await smartapp_rpc.handle_smartapp_event(smartapp_event_factory("export"), bot)
+    release_export.set()
+    shutdown_summary = await shutdown_task
+
+    # - Assert -
+    assert deferred_response.jsonable_dict()["result"]["data"]["status"] == "accepted"
+    assert rejected_response.jsonable_dict()["errors"] == [
+        {
+            "id": "SHUTTING_DOWN",
+            "reason": "Server is shutting down, try again later",
+            "meta": {},
+        },
+    ]
+    assert shutdown_summary == ShutdownSummary(
+        completed_requests=2,
+        completed_background_tasks=1,
+    )
+    assert export_task.done()
+    assert bot.send_smartapp_event.await_count == 3
+    assert smartapp_rpc.request_drainer.stats.rejected == 2
+    assert smartapp_rpc.request_drainer.in_flight_count == 0
+
+
+async def test_requests_cancelled_after_timeout(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    cleanups: list[str] = []
+    smartapp_rpc = build_smartapp_rpc(asyncio.Event(), cleanups)
+
+    await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("export"),
+        bot,
+    )
+
+    # - Act -
+    shutdown_summary = await smartapp_rpc.shutdown(timeout=0.01)
+
+    # - Assert -
+    assert shutdown_summary == ShutdownSummary(
+        cancelled_requests=1,
+        cancelled_background_tasks=1,
+    )
+    assert cleanups == ["export"]
+    assert smartapp_rpc.request_drainer.in_flight_count == 0
+    bot.send_smartapp_event.assert_not_awaited()
+
+
+async def test_shutdown_waits_for_response_delivery(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    release_export = asyncio.Event()
+    release_export.set()
+    smartapp_rpc = build_smartapp_rpc(release_export, [])
+    sent_responses: list[dict] = []
+
+    async def send_smartapp_event(**kwargs: Any) -> None:
+        await asyncio.sleep(0.05)
+        sent_responses.append(kwargs["data"])
+
+    bot.send_smartapp_event.side_effect = send_smartapp_event
+    export_task = asyncio.create_task(
+        smartapp_rpc.handle_smartapp_event(smartapp_event_factory("export"), bot),
+    )
+    await asyncio.sleep(0.01)
+
+    # - Act -
+    shutdown_summary = await smartapp_rpc.shutdown(timeout=1)
+
+    # - Assert -
+    assert shutdown_summary == ShutdownSummary(completed_requests=1)
+    assert sent_responses == [
+        {"status": "ok", "type": "smartapp_rpc", "result": "exported"},
+    ]
+    assert export_task.done()
@@ -0,0 +1,285 @@
+import functools
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    HandlerWithArgs,
+    RPCArgsBaseModel,
+    RPCResponse,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.empty_args import EmptyArgs
+from pybotx_smartapp_rpc.executors import ExecutorStats
+from pybotx_smartapp_rpc.smartapp import SmartAppContext
+
+
+class SumArgs(RPCArgsBaseModel):
+    first: int
+    second: int
+
+
+def sum_in_process(
+    context: SmartAppContext,
+    args: SumArgs,
+) -> RPCResultResponse[dict[str, str | int]]:
+    return RPCResultResponse(
+        result={"chat_id": str(context.chat_id), "sum": args.first + args.second},
+    )
+
+
+async def test_sync_handler_called_in_thread_pool(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    threads = {}
+
+    async def middleware(
+        smartapp: SmartApp,
+        rpc_arguments: RPCArgsBaseModel,
+        call_next: HandlerWithArgs,
+    ) -> RPCResponse:
+        threads["middleware"] = threading.current_thread()
+        return await call_next(smartapp, rpc_arguments)
+
+    rpc = RPCRouter(middlewares=[middleware])
+
+    @rpc.method("parse_excel")
+    def parse_excel(smartapp: SmartApp) -> RPCResultResponse[int]:
+        threads["handler"] = threading.current_thread()
+        return RPCResultResponse(result=len(smartapp.event.data))
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc], thread_pool_size=2)
+
+    # - Act -
+    await smartapp_rpc.handle_smartapp_event(
+        smartapp_event_factory("parse_excel"),
+        bot,
+    )
+
+    # - Assert -
+    assert threads["middleware"] is threading.main_thread()
+    assert threads["handler"].name.startswith("smartapp-rpc")
+    assert bot.send_smartapp_event.await_args.kwargs["data"]["result"] == 2
+    assert smartapp_rpc.executors.stats["thread"] == ExecutorStats(
+        max_workers=2,
+        in_flight=0,
+        completed=1,
+    )
+
+    await smartapp_rpc.shutdown()
+
+
+async def test_sync_handler_called_in_process_pool(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    rpc.method("sum", executor="process")(sum_in_process)
+    smartapp_rpc = SmartAppRPC(routers=[rpc], process_pool_size=1)
+
+    # - Act -
+    await smartapp_rpc.handle_smartapp_event(
+        smartapp_event_factory("sum", params={"first": 1, "second": 2}),
+        bot,
+    )
+    await smartapp_rpc.shutdown()
+
+    # - Assert -
+    assert bot.send_smartapp_event.await_args.kwargs["data"]["result"] == {
+        "chat_id": str(chat_id),
+        "sum": 3,
+    }
+    assert smartapp_rpc.executors.stats["process"].completed == 1
+
+
+async def test_sync_handler_called_in_custom_executor(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reports")
+
+    @rpc.method("render_report", executor=executor)
+    def render_report(smartapp: SmartApp, args: SumArgs) -> RPCResultResponse[str]:
+        return RPCResultResponse(result=threading.current_thread().name)
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    await smartapp_rpc.handle_smartapp_event(
+        smartapp_event_factory("render_report", params={"first": 1, "second": 2}),
+        bot,
+    )
+    executor.shutdown()
+
+    # - Assert -
+    result = bot.send_smartapp_event.await_args.kwargs["data"]["result"]
+    assert result.startswith("reports")
+    assert smartapp_rpc.executors.stats["custom"].queued == 0
+
+
+class CountHandler:
+    async def __call__(self, smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result=threading.current_thread().name)
+
+
+def sync_wrapper(
+    handler: Callable[[SmartApp], Awaitable[RPCResultResponse[str]]],
+) -> Callable[[SmartApp], Awaitable[RPCResultResponse[str]]]:
+    @functools.wraps(handler)
+    def wrapper(smartapp: SmartApp) -> Awaitable[RPCResultResponse[str]]:
+        return handler(smartapp)
+
+    return wrapper
+
+
+async def test_async_callables_not_called_in_executor(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    rpc.method("count")(CountHandler())
+
+    @rpc.method("get_thread")
+    @sync_wrapper
+    async def get_thread(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result=threading.current_thread().name)
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    responses = [
+        await smartapp_rpc.handle_sync_smartapp_event(
+            smartapp_event_factory(method),
+            bot,
+        )
+        for method in ("count", "get_thread")
+    ]
+
+    # - Assert -
+    main_thread_name = threading.main_thread().name
+    assert [response.jsonable_dict()["result"]["data"] for response in responses] == [
+        main_thread_name,
+        main_thread_name,
+    ]
+    assert not smartapp_rpc.executors.stats
+
+
+def test_async_handler_in_executor_rejected() -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+
+    async def get_thread(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result="main")  # pragma: no cover
+
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+        rpc.method("get_thread", executor="thread")(get_thread)
+
+    # - Assert -
+    assert "Async handler of RPC method get_thread" in str(exc.value)
+
+
+async def test_awaitable_returned_from_executor_awaited_in_event_loop(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    rpc.method("count", executor="thread")(CountHandler())
+
+    async def get_thread_impl(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result=threading.current_thread().name)
+
+    @rpc.method("get_thread")
+    def get_thread(smartapp: SmartApp) -> Awaitable[RPCResultResponse[str]]:
+        return get_thread_impl(smartapp)
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    responses = [
+        await smartapp_rpc.handle_sync_smartapp_event(
+            smartapp_event_factory(method),
+            bot,
+        )
+        for method in ("count", "get_thread")
+    ]
+    await smartapp_rpc.shutdown()
+
+    # - Assert -
+    main_thread_name = threading.main_thread().name
+    assert [response.jsonable_dict()["result"]["data"] for response in responses] == [
+        main_thread_name,
+        main_thread_name,
+    ]
+    assert smartapp_rpc.executors.stats["thread"].completed == 2
+
+
+async def test_handler_in_executor_without_smartapp_rpc(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+
+    @rpc.method("parse_excel")
+    def parse_excel(smartapp: SmartApp) -> RPCResultResponse[int]:
+        return RPCResultResponse(result=1)  # pragma: no cover
+
+    # - Act -
+    with pytest.raises(RuntimeError) as exc:
+        await rpc.rpc_methods["parse_excel"](
+            SmartApp(bot, bot_id, chat_id),
+            EmptyArgs(),
+        )
+
+    # - Assert -
+    assert "only by SmartAppRPC" in str(exc.value)
+
+
+def test_unknown_executor() -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+        rpc.method("parse_excel", executor="fiber")  # type: ignore[arg-type]
+
+    # - Assert -
+    assert "Unknown executor fiber" in str(exc.value)
+
+
+def test_executor_stats_queued() -> None:
+    # - Arrange -
+    stats = ExecutorStats(max_workers=2, in_flight=5)
+
+    # - Assert -
+    assert stats.queued == 3
+
+
+def test_smartapp_context_without_event(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    smartapp = SmartApp(bot, bot_id, chat_id)
+
+    # - Assert -
+    assert smartapp.context == SmartAppContext(bot_id=bot_id, chat_id=chat_id)
@@ -0,0 +1,288 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCResponse,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.idempotency import IdempotencyCache
+from pybotx_smartapp_rpc.rate_limiter import RateLimit, RateLimiter
+
+
+def build_smartapp_rpc(
+    idempotency_cache: IdempotencyCache,
+    handler_calls: list[str],
+    release_handler: asyncio.Event | None = None,
+) -> SmartAppRPC:
+    rpc = RPCRouter()
+
+    @rpc.method("create_order")
+    async def create_order(smartapp: SmartApp) -> RPCResultResponse[int]:
+        handler_calls.append("create_order")
+        if release_handler:
+            await release_handler.wait()
+
+        return RPCResultResponse(result=len(handler_calls))
+
+    return SmartAppRPC(routers=[rpc], idempotency_cache=idempotency_cache)
+
+
+async def test_idempotency_completed_response_reused(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    handler_calls: list[str] = []
+    idempotency_cache = IdempotencyCache()
+    smartapp_rpc = build_smartapp_rpc(idempotency_cache, handler_calls)
+
+    # - Act -
+    await smartapp_rpc.handle_smartapp_event(
+        smartapp_event_factory("create_order"),
+        bot,
+    )
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("create_order"),
+        bot,
+    )
+
+    # - Assert -
+    assert handler_calls == ["create_order"]
+    assert bot.send_smartapp_event.await_args.kwargs["data"]["result"] == 1
+    assert response.jsonable_dict()["result"]["data"] == 1
+    assert smartapp_rpc.idempotency_cache is idempotency_cache
+    assert idempotency_cache.stats.executed == 1
+    assert idempotency_cache.stats.reused == 1
+
+
+async def test_idempotency_duplicate_joins_in_flight_execution(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    handler_calls: list[str] = []
+    release_handler = asyncio.Event()
+    idempotency_cache = IdempotencyCache()
+    smartapp_rpc = build_smartapp_rpc(
+        idempotency_cache,
+        handler_calls,
+        release_handler,
+    )
+
+    # - Act -
+    handle_tasks = [
+        asyncio.create_task(
+            smartapp_rpc.handle_smartapp_event(
+                smartapp_event_factory("create_order"),
+                bot,
+            ),
+        )
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release_handler.set()
+    await asyncio.gather(*handle_tasks)
+
+    # - Assert -
+    assert handler_calls == ["create_order"]
+    assert [
+        send_call.kwargs["data"]["result"]
+        for send_call in bot.send_smartapp_event.await_args_list
+    ] == [1, 1, 1]
+    assert idempotency_cache.stats.joined == 2
+
+
+async def test_idempotency_expired_response_not_reused(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    handler_calls: list[str] = []
+    smartapp_rpc = build_smartapp_rpc(IdempotencyCache(ttl=0), handler_calls)
+
+    # - Act -
+    for _ in range(2):
+        await smartapp_rpc.handle_smartapp_event(
+            smartapp_event_factory("create_order"),
+            bot,
+        )
+
+    # - Assert -
+    assert handler_calls == ["create_order", "create_order"]
+
+
+async def test_idempotency_admission_error_not_reused(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    mocker,
+) -> None:
+    # - Arrange -
+    monotonic = mocker.patch("pybotx_smartapp_rpc.rate_limiter.time").monotonic
+    monotonic.return_value = 100.0
+    handler_calls: list[str] = []
+    rpc = RPCRouter()
+
+    @rpc.method("create_order")
+    async def create_order(smartapp: SmartApp) -> RPCResultResponse[int]:
+        handler_calls.append("create_order")
+        return RPCResultResponse(result=len(handler_calls))
+
+    smartapp_rpc = SmartAppRPC(
+        routers=[rpc],
+        idempotency_cache=IdempotencyCache(),
+        rate_limiter=RateLimiter([RateLimit(rate=1, burst=1, key=("chat",))]),
+    )
+    first_event = smartapp_event_factory("create_order")
+    first_event.ref = uuid4()
+    await smartapp_rpc.handle_sync_smartapp_event(first_event, bot)
+
+    # - Act -
+    limited_response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("create_order"),
+        bot,
+    )
+    monotonic.return_value += 1
+    retried_response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("create_order"),
+        bot,
+    )
+
+    # - Assert -
+    assert limited_response.jsonable_dict()["errors"][0]["id"] == "RATE_LIMITED"
+    assert retried_response.jsonable_dict()["result"]["data"] == 2
+
+
+async def test_idempotency_ref_reused_for_other_method(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    handler_calls: list[str] = []
+    smartapp_rpc = build_smartapp_rpc(IdempotencyCache(), handler_calls)
+
+    @smartapp_rpc.router.method("cancel_order")
+    async def cancel_order(smartapp: SmartApp) -> RPCResultResponse[str]:
+        handler_calls.append("cancel_order")
+        return RPCResultResponse(result="cancelled")
+
+    await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("create_order"),
+        bot,
+    )
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("cancel_order"),
+        bot,
+    )
+
+    # - Assert -
+    assert response.jsonable_dict()["result"]["data"] == "cancelled"
+    assert handler_calls == ["create_order", "cancel_order"]
+
+
+async def test_idempotency_least_recently_used_refs_evicted(bot_id: UUID) -> None:
+    # - Arrange -
+    idempotency_cache = IdempotencyCache(max_size=2)
+    first_ref, second_ref, third_ref = uuid4(), uuid4(), uuid4()
+    perform = AsyncMock(return_value=RPCResultResponse(result=1))
+
+    # - Act -
+    for ref in (first_ref, second_ref, first_ref, third_ref, first_ref, second_ref):
+        await idempotency_cache.run((bot_id, ref), perform)
+
+    # - Assert -
+    assert perform.await_count == 4
+    assert idempotency_cache.size == 2
+    assert idempotency_cache.stats.evicted == 2
+
+
+async def test_idempotency_ref_invalidated(bot_id: UUID, ref: UUID) -> None:
+    # - Arrange -
+    idempotency_cache = IdempotencyCache()
+    perform = AsyncMock(return_value=RPCResultResponse(result=1))
+    await idempotency_cache.run((bot_id, ref), perform)
+
+    # - Act -
+    idempotency_cache.invalidate((bot_id, ref))
+    await idempotency_cache.run((bot_id, ref), perform)
+
+    # - Assert -
+    assert perform.await_count == 2
+
+
+async def test_idempotency_duplicate_performed_after_original_failed(
+    bot_id: UUID,
+    ref: UUID,
+) -> None:
+    # - Arrange -
+    idempotency_cache = IdempotencyCache()
+    release_original = asyncio.Event()
+
+    async def failing_perform() -> RPCResponse:
+        await release_original.wait()
+        raise RuntimeError("Connection lost")
+
+    original_task = asyncio.create_task(
+        idempotency_cache.run((bot_id, ref), failing_perform),
+    )
+    await asyncio.sleep(0)
+    duplicate_task = asyncio.create_task(
+        idempotency_cache.run(
+            (bot_id, ref),
+            AsyncMock(return_value=RPCResultResponse(result=2)),
+        ),
+    )
+    await asyncio.sleep(0)
+
+    # - Act -
+    release_original.set()
+
+    # - Assert -
+    with pytest.raises(RuntimeError):
+        await original_task
+
+    duplicate_response = await duplicate_task
+    assert isinstance(duplicate_response, RPCResultResponse)
+    assert duplicate_response.result == 2
+
+
+async def test_idempotency_cancelled_duplicate_not_performed(
+    bot_id: UUID,
+    ref: UUID,
+) -> None:
+    # - Arrange -
+    idempotency_cache = IdempotencyCache()
+    release_original = asyncio.Event()
+    duplicate_perform = AsyncMock()
+
+    async def perform() -> RPCResponse:
+        await release_original.wait()
+        return RPCResultResponse(result=1)
+
+    original_task = asyncio.create_task(idempotency_cache.run((bot_id, ref), perform))
+    await asyncio.sleep(0)
+    duplicate_task = asyncio.create_task(
+        idempotency_cache.run((bot_id, ref), duplicate_perform),
+    )
+    await asyncio.sleep(0)
+
+    # - Act -
+    duplicate_task.cancel()
+    release_original.set()
+
+    # - Assert -
+    with pytest.raises(asyncio.CancelledError):
+        await duplicate_task
+
+    await original_task
+    duplicate_perform.assert_not_awaited()
+    assert idempotency_cache.stats.reused == 0
@@ -0,0 +1,127 @@
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import RPCResultResponse, RPCRouter, SmartApp, SmartAppRPC
+from pybotx_smartapp_rpc.lifespan import Resource
+
+
+def build_resource(name: str, calls: list[str]) -> Resource[str]:
+    @asynccontextmanager
+    async def create() -> AsyncIterator[str]:
+        calls.append(f"create {name}")
+        yield f"{name} connection"
+        calls.append(f"dispose {name}")
+
+    async def warm_up(connection: str) -> None:
+        calls.append(f"warm up {connection}")
+
+    return Resource(create, warm_up=warm_up, name=name)
+
+
+async def test_resources_created_on_startup_and_disposed_on_shutdown(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    calls: list[str] = []
+    db_pool = build_resource("db", calls)
+    http_client = build_resource("http", calls)
+    rpc = RPCRouter()
+
+    @rpc.method("get_connection")
+    async def get_connection(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result=smartapp.resource(db_pool))
+
+    async def on_startup() -> None:
+        calls.append("startup")
+
+    async def on_shutdown() -> None:
+        calls.append("shutdown")
+
+    async def failing_on_shutdown() -> None:
+        raise ValueError
+
+    smartapp_rpc = SmartAppRPC(
+        routers=[rpc],
+        resources=[db_pool, http_client],
+        on_startup=[on_startup],
+        on_shutdown=[failing_on_shutdown, on_shutdown],
+    )
+
+    # - Act -
+    await smartapp_rpc.startup()
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_connection"),
+        bot,
+    )
+    await smartapp_rpc.shutdown()
+
+    # - Assert -
+    assert response.jsonable_dict()["result"]["data"] == "db connection"
+    assert calls == [
+        "create db",
+        "create http",
+        "warm up db connection",
+        "warm up http connection",
+        "startup",
+        "shutdown",
+        "dispose http",
+        "dispose db",
+    ]
+    assert not smartapp_rpc.lifespan.started
+
+
+async def test_created_resources_disposed_on_startup_error() -> None:
+    # - Arrange -
+    calls: list[str] = []
+    db_pool = build_resource("db", calls)
+
+    async def on_startup() -> None:
+        raise ValueError
+
+    smartapp_rpc = SmartAppRPC(routers=[], resources=[db_pool], on_startup=[on_startup])
+
+    # - Act -
+    with pytest.raises(ValueError):
+        await smartapp_rpc.startup()
+
+    # - Assert -
+    assert calls == ["create db", "warm up db connection", "dispose db"]
+    with pytest.raises(RuntimeError) as exc:
+        smartapp_rpc.lifespan.get(db_pool)
+
+    assert str(exc.value) == "Resource db is not started"
+
+
+async def test_lifespan_started_twice() -> None:
+    # - Arrange -
+    smartapp_rpc = SmartAppRPC(routers=[])
+    await smartapp_rpc.startup()
+
+    # - Act -
+    with pytest.raises(RuntimeError) as exc:
+        await smartapp_rpc.startup()
+
+    # - Assert -
+    assert str(exc.value) == "Lifespan is already started"
+
+
+def test_resource_without_smartapp_rpc(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    smartapp = SmartApp(bot, bot_id, chat_id)
+
+    # - Act -
+    with pytest.raises(RuntimeError) as exc:
+        smartapp.resource(build_resource("db", []))
+
+    # - Assert -
+    assert str(exc.value) == "Resources are available only in SmartAppRPC"
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCArgsBaseModel,
+    RPCPriority,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.load_shedder import LoadShedder
+
+
+class SearchArgs(RPCArgsBaseModel):
+    query: str
+
+
+async def test_request_with_expired_deadline_dropped(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    handler_calls: list[SearchArgs] = []
+
+    @rpc.method("search")
+    async def search(
+        smartapp: SmartApp,
+        rpc_arguments: SearchArgs,
+    ) -> RPCResultResponse[int]:
+        handler_calls.append(rpc_arguments)
+        return RPCResultResponse(result=1)
+
+    load_shedder = LoadShedder()
+    smartapp_rpc = SmartAppRPC(routers=[rpc], load_shedder=load_shedder)
+
+    expired_event = smartapp_event_factory("search", params={"wrong": "params"})
+    expired_event.data["deadline"] = time.time() - 1
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(expired_event, bot)
+
+    # - Assert -
+    assert response.jsonable_dict()["errors"] == [
+        {
+            "id": "DEADLINE_EXCEEDED",
+            "reason": "Request deadline exceeded",
+            "meta": {},
+        },
+    ]
+    assert not handler_calls
+    assert smartapp_rpc.load_shedder is load_shedder
+    assert load_shedder.stats.expired == {"search": 1}
+    assert load_shedder.queue_depth == 0
+
+
+async def test_deadline_taken_from_event_opts(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    arrived_at: list[float] = []
+
+    @rpc.method("get_api_version")
+    async def get_api_version(smartapp: SmartApp) -> RPCResultResponse[int]:
+        arrived_at.append(smartapp.arrived_at)
+        return RPCResultResponse(result=1)
+
+    load_shedder = LoadShedder()
+    smartapp_rpc = SmartAppRPC(routers=[rpc], load_shedder=load_shedder)
+
+    events_opts = [
+        {"deadline": time.time() + 60},
+        {"deadline": "not a timestamp"},
+        {"deadline": time.time() - 1},
+    ]
+
+    # - Act -
+    for event_opts in events_opts:
+        event = smartapp_event_factory("get_api_version")
+        event.opts = event_opts
+        await smartapp_rpc.handle_smartapp_event(event, bot)
+
+    # - Assert -
+    assert [
+        send_call.kwargs["data"]["status"]
+        for send_call in bot.send_smartapp_event.await_args_list
+    ] == ["ok", "ok", "error"]
+    assert len(arrived_at) == 2
+    assert arrived_at[0] <= time.time()
+    assert load_shedder.stats.expired == {"get_api_version": 1}
+
+
+async def test_low_priority_requests_shed_first(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    release_handlers = asyncio.Event()
+
+    @rpc.method("open_chat", priority=RPCPriority.INTERACTIVE)
+    async def open_chat(smartapp: SmartApp) -> RPCResultResponse[str]:
+        await release_handlers.wait()
+        return RPCResultResponse(result="open_chat")
+
+    @rpc.method("search")
+    async def search(smartapp: SmartApp) -> RPCResultResponse[str]:
+        await release_handlers.wait()
+        return RPCResultResponse(result="search")
+
+    @rpc.method("sync_contacts", priority=RPCPriority.BACKGROUND)
+    async def sync_contacts(smartapp: SmartApp) -> RPCResultResponse[str]:
+        await release_handlers.wait()
+        return RPCResultResponse(result="sync_contacts")
+
+    load_shedder = LoadShedder(max_queue_depth=4)
+    smartapp_rpc = SmartAppRPC(routers=[rpc], load_shedder=load_shedder)
+
+    # - Act -
+    handle_tasks = []
+    for method in (
+        "search",
+        "search",
+        "sync_contacts",
+        "search",
+        "open_chat",
+        "open_chat",
+        "unknown",
+    ):
+        handle_tasks.append(
+            asyncio.create_task(
+                smartapp_rpc.handle_smartapp_event(
+                    smartapp_event_factory(method),
+                    bot,
+                ),
+            ),
+        )
+        await asyncio.sleep(0)
+
+    queue_depth = load_shedder.queue_depth
+    release_handlers.set()
+    await asyncio.gather(*handle_tasks)
+
+    # - Assert -
+    assert queue_depth == 4
+    assert load_shedder.queue_depth == 0
+    assert load_shedder.stats.shed == {"sync_contacts": 1, "open_chat": 1}
+    assert sorted(
+        str(send_call.kwargs["data"].get("result"))
+        for send_call in bot.send_smartapp_event.await_args_list
+    ) == ["None", "None", "None", "open_chat", "search", "search", "search"]
@@ -8,12 +8,15 @@ from pybotx import SmartAppEvent
 from pybotx_smartapp_rpc import (
     HandlerWithArgs,
     RPCArgsBaseModel,
+    RPCPriority,
     RPCResponse,
     RPCResultResponse,
     RPCRouter,
     SmartApp,
     SmartAppRPC,
 )
+from pybotx_smartapp_rpc.middlewares.scoped_middleware import ScopedMiddleware
+from pybotx_smartapp_rpc.models.method import RPCMethod
 from pybotx_smartapp_rpc.typing import Middleware
 
 
@@ -62,7 +65,7 @@ async def test_middleware_order(
 
     other_rpc.include_router(rpc)
     smartapp_rpc = SmartAppRPC(
-        routers=[rpc],
+        routers=[other_rpc],
         middlewares=[middleware_factory(1), middleware_factory(2)],
     )
 
@@ -84,3 +87,77 @@ async def test_middleware_order(
     )
 
     assert middleware_order == [1, 2, 3, 4, 5, 6, 7, 8]
+
+
+async def test_scoped_middlewares_added_only_to_matching_methods(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    middleware_factory: Callable[..., Middleware],
+) -> None:
+    # - Arrange -
+    def is_background(rpc_method: RPCMethod) -> bool:
+        return rpc_method.priority == RPCPriority.BACKGROUND
+
+    rpc = RPCRouter(
+        middlewares=[
+            ScopedMiddleware(middleware_factory(3), methods=["admin.*"]),
+        ],
+    )
+
+    @rpc.method("admin.get_users", tags=["admin"])
+    async def get_users(smartapp: SmartApp) -> RPCResultResponse[list[int]]:
+        return RPCResultResponse(result=smartapp.state.middleware_order)
+
+    @rpc.method("get_api_version", priority=RPCPriority.BACKGROUND)
+    async def get_api_version(smartapp: SmartApp) -> RPCResultResponse[list[int]]:
+        return RPCResultResponse(result=smartapp.state.middleware_order)
+
+    smartapp_rpc = SmartAppRPC(
+        routers=[rpc],
+        middlewares=[
+            middleware_factory(1),
+            ScopedMiddleware(middleware_factory(2), tags=["admin"]),
+            ScopedMiddleware(middleware_factory(4), predicate=is_background),
+        ],
+    )
+
+    # - Act -
+    responses = [
+        await smartapp_rpc.handle_sync_smartapp_event(
+            smartapp_event_factory(method),
+            bot,
+        )
+        for method in ("admin.get_users", "get_api_version")
+    ]
+
+    # - Assert -
+    assert [response.jsonable_dict()["result"]["data"] for response in responses] == [
+        [1, 2, 3],
+        [1, 4],
+    ]
+    # exception, empty args and unscoped middlewares
+    assert len(smartapp_rpc.router.rpc_methods["get_api_version"].middlewares) == 4
+    assert not any(
+        isinstance(middleware, ScopedMiddleware)
+        for rpc_method in smartapp_rpc.router.rpc_methods.values()
+        for middleware in rpc_method.middlewares
+    )
+
+
+async def test_scoped_middleware_called_directly(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    middleware_factory: Callable[..., Middleware],
+) -> None:
+    # - Arrange -
+    scoped_middleware = ScopedMiddleware(middleware_factory(1), tags=["admin"])
+    smartapp = SmartApp(bot, bot_id, chat_id)
+    handler = AsyncMock(return_value=RPCResultResponse(result=None))
+
+    # - Act -
+    await scoped_middleware(smartapp, RPCArgsBaseModel(), handler)
+
+    # - Assert -
+    assert smartapp.state.middleware_order == [1]
+    handler.assert_awaited_once()
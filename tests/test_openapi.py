@@ -146,7 +146,7 @@ async def test_collect_rpc_method_exists__with_errors() -> None:
     # - Act -
     path = get_rpc_openapi_path(
         method_name="get_user",
-        route=rpc.rpc_methods["get_user"],
+        route=smartapp_rpc.router.rpc_methods["get_user"],
         model_name_map=rpc_model_name_map,
     )
 
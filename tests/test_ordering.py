@@ -0,0 +1,106 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCArgsBaseModel,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+
+
+class ChangeArgs(RPCArgsBaseModel):
+    change: str
+    delay: float = 0
+
+
+async def test_chat_events_executed_in_arrival_order(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    applied_changes: list[str] = []
+
+    @rpc.method("apply_change", ordered=True)
+    async def apply_change(
+        smartapp: SmartApp,
+        rpc_arguments: ChangeArgs,
+    ) -> RPCResultResponse[None]:
+        await asyncio.sleep(rpc_arguments.delay)
+        applied_changes.append(rpc_arguments.change)
+        return RPCResultResponse(result=None)
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    await asyncio.gather(
+        *(
+            smartapp_rpc.handle_smartapp_event(
+                smartapp_event_factory(
+                    "apply_change",
+                    params={"change": change, "delay": delay},
+                ),
+                bot,
+            )
+            for change, delay in (("first", 0.03), ("second", 0.01), ("third", 0))
+        ),
+    )
+
+    # - Assert -
+    assert applied_changes == ["first", "second", "third"]
+    assert smartapp_rpc.ordered_execution.keys_count == 0
+    assert smartapp_rpc.ordered_execution.stats.executed == 3
+    assert smartapp_rpc.ordered_execution.stats.waited == 2
+
+
+async def test_events_with_different_keys_executed_in_parallel(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    applied_changes: list[str] = []
+    release_first_change = asyncio.Event()
+
+    def sender_ordering_key(smartapp: SmartApp) -> object:
+        return smartapp.event.sender.huid if smartapp.event else None
+
+    @rpc.method("apply_change", ordered=sender_ordering_key)
+    async def apply_change(
+        smartapp: SmartApp,
+        rpc_arguments: ChangeArgs,
+    ) -> RPCResultResponse[None]:
+        if rpc_arguments.change == "first":
+            await release_first_change.wait()
+
+        applied_changes.append(rpc_arguments.change)
+        return RPCResultResponse(result=None)
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    first_task = asyncio.create_task(
+        smartapp_rpc.handle_smartapp_event(
+            smartapp_event_factory("apply_change", params={"change": "first"}),
+            bot,
+        ),
+    )
+    await asyncio.sleep(0)
+
+    # - Act -
+    await smartapp_rpc.handle_smartapp_event(
+        smartapp_event_factory("apply_change", params={"change": "second"}),
+        bot,
+    )
+    keys_count = smartapp_rpc.ordered_execution.keys_count
+    release_first_change.set()
+    await first_task
+
+    # - Assert -
+    assert applied_changes == ["second", "first"]
+    assert keys_count == 1
+    assert smartapp_rpc.ordered_execution.stats.waited == 0
@@ -0,0 +1,223 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import AsyncMock, call
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx import SmartAppEvent
+from pybotx.missing import Undefined
+
+from pybotx_smartapp_rpc import RPCResultResponse, RPCRouter, SmartApp, SmartAppRPC
+from pybotx_smartapp_rpc.push_debouncer import PushDebouncer
+
+
+async def test_push_debouncer_sends_only_latest_push(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    debouncer = PushDebouncer(interval=0.01)
+
+    # - Act -
+    for counter in range(50):
+        debouncer.push(bot, bot_id, chat_id, counter, f"{counter} new emails")
+
+    await asyncio.sleep(0.05)
+
+    # - Assert -
+    bot.send_smartapp_notification.assert_awaited_once_with(
+        bot_id=bot_id,
+        chat_id=chat_id,
+        smartapp_counter=49,
+        body="49 new emails",
+    )
+    assert debouncer.stats.sent == 1
+    assert debouncer.stats.suppressed == 49
+    assert debouncer.pending_count == 0
+
+
+async def test_push_debouncer_keeps_pushes_for_different_chats(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    debouncer = PushDebouncer()
+    other_chat_id = uuid4()
+
+    debouncer.push(bot, bot_id, chat_id, 1)
+    debouncer.push(bot, bot_id, other_chat_id, 2)
+
+    # - Act -
+    await debouncer.close()
+
+    # - Assert -
+    bot.send_smartapp_notification.assert_has_awaits(
+        [
+            call(bot_id=bot_id, chat_id=chat_id, smartapp_counter=1, body=Undefined),
+            call(
+                bot_id=bot_id,
+                chat_id=other_chat_id,
+                smartapp_counter=2,
+                body=Undefined,
+            ),
+        ],
+    )
+    assert debouncer.stats.sent == 2
+    assert debouncer.stats.suppressed == 0
+
+
+async def test_push_debouncer_counts_failed_pushes(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    bot.send_smartapp_notification.side_effect = RuntimeError("BotX is down")
+    debouncer = PushDebouncer()
+    debouncer.push(bot, bot_id, chat_id, 1)
+
+    # - Act -
+    await debouncer.flush()
+
+    # - Assert -
+    assert debouncer.stats.failed == 1
+    assert debouncer.stats.sent == 0
+
+
+async def test_push_debouncer_close_waits_for_sending_pushes(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    sent_counters: list[int] = []
+
+    async def send_smartapp_notification(**kwargs: Any) -> None:
+        await asyncio.sleep(0.05)
+        sent_counters.append(kwargs["smartapp_counter"])
+
+    bot.send_smartapp_notification.side_effect = send_smartapp_notification
+    debouncer = PushDebouncer(interval=0.01)
+    debouncer.push(bot, bot_id, chat_id, 1)
+    await asyncio.sleep(0.02)
+    debouncer.push(bot, bot_id, chat_id, 2)
+
+    # - Act -
+    await debouncer.close()
+
+    # - Assert -
+    assert sent_counters == [1, 2]
+    with pytest.raises(RuntimeError) as exc:
+        debouncer.push(bot, bot_id, chat_id, 3)
+
+    assert "closed" in str(exc.value)
+
+
+async def test_push_added_during_flush_sent_after_interval(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    sent_counters: list[int] = []
+
+    async def send_smartapp_notification(**kwargs: Any) -> None:
+        await asyncio.sleep(0.02)
+        sent_counters.append(kwargs["smartapp_counter"])
+
+    bot.send_smartapp_notification.side_effect = send_smartapp_notification
+    debouncer = PushDebouncer(interval=0.01)
+    debouncer.push(bot, bot_id, chat_id, 1)
+    await asyncio.sleep(0.015)
+
+    # - Act -
+    debouncer.push(bot, bot_id, chat_id, 2)
+    await asyncio.sleep(0.1)
+
+    # - Assert -
+    assert sent_counters == [1, 2]
+    assert debouncer.pending_count == 0
+
+
+def test_push_debouncer_wrong_interval() -> None:
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+        PushDebouncer(interval=0)
+
+    # - Assert -
+    assert "must be positive" in str(exc.value)
+
+
+async def test_send_push_debounced_by_smartapp_rpc(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+
+    @rpc.method("sync_mail")
+    async def sync_mail(smartapp: SmartApp) -> RPCResultResponse[None]:
+        for counter in range(1, 4):
+            await smartapp.send_push(counter)
+
+        return RPCResultResponse(result=None)
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc], push_debounce_interval=60)
+
+    # - Act -
+    await smartapp_rpc.handle_smartapp_event(
+        smartapp_event_factory("sync_mail"),
+        bot,
+    )
+    bot.send_smartapp_notification.assert_not_awaited()
+
+    await smartapp_rpc.shutdown()
+
+    # - Assert -
+    bot.send_smartapp_notification.assert_awaited_once_with(
+        bot_id=bot_id,
+        chat_id=chat_id,
+        smartapp_counter=3,
+        body=Undefined,
+    )
+    assert smartapp_rpc.push_debouncer is not None
+    assert smartapp_rpc.push_debouncer.interval == 60
+    assert smartapp_rpc.push_debouncer.stats.suppressed == 2
+
+
+async def test_send_push_after_shutdown_sent_directly(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    smartapp_rpc = SmartAppRPC(routers=[], push_debounce_interval=60)
+    smartapp = SmartApp(bot, bot_id, chat_id, smartapp_rpc=smartapp_rpc)
+    await smartapp_rpc.shutdown()
+
+    # - Act -
+    await smartapp.send_push(1)
+
+    # - Assert -
+    bot.send_smartapp_notification.assert_awaited_once_with(
+        bot_id=bot_id,
+        chat_id=chat_id,
+        smartapp_counter=1,
+        body=Undefined,
+    )
+
+
+async def test_shutdown_without_push_debouncer(bot: AsyncMock) -> None:
+    # - Arrange -
+    smartapp_rpc = SmartAppRPC(routers=[])
+
+    # - Act -
+    await smartapp_rpc.shutdown()
+
+    # - Assert -
+    assert smartapp_rpc.push_debouncer is None
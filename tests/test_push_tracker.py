@@ -0,0 +1,191 @@
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx import (
+    BotAPIMethodSuccessfulCallback,
+    BotShuttingDownError,
+    BotXMethodCallbackNotFoundError,
+    CallbackNotReceivedError,
+)
+from pybotx.missing import Undefined
+
+from pybotx_smartapp_rpc import SmartApp, SmartAppRPC
+from pybotx_smartapp_rpc.push_tracker import PushHandle, PushTracker
+
+
+def build_callback(sync_id: UUID) -> BotAPIMethodSuccessfulCallback:
+    return BotAPIMethodSuccessfulCallback(sync_id=sync_id, status="ok", result={})
+
+
+@pytest.fixture
+def push_tracker(bot: AsyncMock) -> PushTracker:
+    push_tracker = PushTracker()
+
+    async def send_smartapp_custom_notification(**kwargs: Any) -> UUID:
+        sync_id = uuid4()
+        await push_tracker.create_botx_method_callback(sync_id)
+        return sync_id
+
+    bot.send_smartapp_custom_notification.side_effect = (
+        send_smartapp_custom_notification
+    )
+
+    return push_tracker
+
+
+async def test_send_tracked_custom_pushes(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    push_tracker: PushTracker,
+) -> None:
+    # - Arrange -
+    smartapp_rpc = SmartAppRPC(routers=[], push_tracker=push_tracker)
+    smartapp = SmartApp(bot, bot_id, chat_id, smartapp_rpc=smartapp_rpc)
+
+    handles = [
+        await smartapp.send_tracked_custom_push("title", "body", callback_timeout=5)
+        for _ in range(3)
+    ]
+    delivered, lost = handles[:2], handles[2]
+
+    for handle in delivered:
+        await push_tracker.set_botx_method_callback_result(
+            build_callback(handle.sync_id),
+        )
+
+    # - Act -
+    done, pending = await push_tracker.wait(handles, timeout=0.01)
+
+    # - Assert -
+    assert done == set(delivered)
+    assert pending == {lost}
+    assert push_tracker.pending_count == 1
+    assert (await delivered[0]).sync_id == delivered[0].sync_id
+    assert delivered[1].result().status == "ok"
+    assert not lost.done()
+    bot.send_smartapp_custom_notification.assert_awaited_with(
+        bot_id=bot_id,
+        group_chat_id=chat_id,
+        title="title",
+        body="body",
+        meta=Undefined,
+        wait_callback=False,
+        callback_timeout=5,
+    )
+
+
+async def test_push_handle_done_callback(push_tracker: PushTracker) -> None:
+    # - Arrange -
+    sync_id = uuid4()
+    await push_tracker.create_botx_method_callback(sync_id)
+    handle = push_tracker.track(sync_id)
+    received: list[PushHandle] = []
+    handle.add_done_callback(received.append)
+
+    # - Act -
+    await push_tracker.set_botx_method_callback_result(build_callback(sync_id))
+    await push_tracker.set_botx_method_callback_result(build_callback(sync_id))
+    await asyncio.sleep(0)
+
+    # - Assert -
+    assert received == [handle]
+
+
+async def test_push_tracker_wait_without_handles(push_tracker: PushTracker) -> None:
+    # - Act -
+    done, pending = await push_tracker.wait([])
+
+    # - Assert -
+    assert done == set()
+    assert pending == set()
+
+
+async def test_push_tracker_blocking_wait(push_tracker: PushTracker) -> None:
+    # - Arrange -
+    sync_id = uuid4()
+    await push_tracker.create_botx_method_callback(sync_id)
+    await push_tracker.set_botx_method_callback_result(build_callback(sync_id))
+
+    # - Act -
+    callback = await push_tracker.wait_botx_method_callback(sync_id, timeout=1)
+
+    # - Assert -
+    assert callback.sync_id == sync_id
+    assert push_tracker.pending_count == 0
+    with pytest.raises(BotXMethodCallbackNotFoundError):
+        push_tracker.track(sync_id)
+
+
+async def test_push_tracker_blocking_wait_timeout(push_tracker: PushTracker) -> None:
+    # - Arrange -
+    sync_id = uuid4()
+    await push_tracker.create_botx_method_callback(sync_id)
+
+    # - Act -
+    with pytest.raises(CallbackNotReceivedError) as exc:
+        await push_tracker.wait_botx_method_callback(sync_id, timeout=0.001)
+
+    # - Assert -
+    assert exc.value.sync_id == sync_id
+
+
+async def test_push_tracker_callback_timeout_alarm(push_tracker: PushTracker) -> None:
+    # - Arrange -
+    lost_sync_id = uuid4()
+    delivered_sync_id = uuid4()
+    await push_tracker.create_botx_method_callback(lost_sync_id)
+    await push_tracker.create_botx_method_callback(delivered_sync_id)
+    await push_tracker.set_botx_method_callback_result(
+        build_callback(delivered_sync_id),
+    )
+    lost = push_tracker.track(lost_sync_id)
+
+    # - Act -
+    await push_tracker.pop_botx_method_callback(lost_sync_id)
+    delivered_future = await push_tracker.pop_botx_method_callback(delivered_sync_id)
+
+    # - Assert -
+    with pytest.raises(CallbackNotReceivedError):
+        await lost
+    assert delivered_future.result().sync_id == delivered_sync_id
+
+
+async def test_push_tracker_stop_callbacks_waiting(push_tracker: PushTracker) -> None:
+    # - Arrange -
+    pending_sync_id = uuid4()
+    delivered_sync_id = uuid4()
+    await push_tracker.create_botx_method_callback(pending_sync_id)
+    await push_tracker.create_botx_method_callback(delivered_sync_id)
+    await push_tracker.set_botx_method_callback_result(
+        build_callback(delivered_sync_id),
+    )
+    pending = push_tracker.track(pending_sync_id)
+
+    # - Act -
+    await push_tracker.stop_callbacks_waiting()
+
+    # - Assert -
+    with pytest.raises(BotShuttingDownError):
+        pending.result()
+    assert push_tracker.pending_count == 0
+
+
+async def test_send_tracked_custom_push_without_tracker(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    smartapp = SmartApp(bot, bot_id, chat_id, smartapp_rpc=SmartAppRPC(routers=[]))
+
+    # - Act -
+    with pytest.raises(RuntimeError) as exc:
+        await smartapp.send_tracked_custom_push("title", "body")
+
+    # - Assert -
+    assert "not configured" in str(exc.value)
+    bot.send_smartapp_custom_notification.assert_not_awaited()
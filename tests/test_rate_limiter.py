@@ -0,0 +1,377 @@
+import json
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import RPCResultResponse, RPCRouter, SmartApp, SmartAppRPC
+from pybotx_smartapp_rpc.backends.memory import MemoryStateBackend
+from pybotx_smartapp_rpc.backends.sqlite import SQLiteStateBackend
+from pybotx_smartapp_rpc.rate_limiter import RateLimit, RateLimiter
+
+
+@pytest.fixture
+def monotonic(mocker) -> MagicMock:
+    time_mock = mocker.patch("pybotx_smartapp_rpc.rate_limiter.time")
+    time_mock.monotonic.return_value = 100.0
+    return time_mock.monotonic
+
+
+@pytest.fixture
+def wall_clock(mocker) -> MagicMock:
+    time_mock = mocker.patch("pybotx_smartapp_rpc.rate_limiter.time")
+    time_mock.time.return_value = 100.0
+    return time_mock.time
+
+
+def build_smartapp_rpc(rate_limiter: RateLimiter) -> SmartAppRPC:
+    rpc = RPCRouter()
+
+    @rpc.method("search")
+    async def search(smartapp: SmartApp) -> RPCResultResponse[int]:
+        return RPCResultResponse(result=1)
+
+    @rpc.method("export", cost=2)
+    async def export(smartapp: SmartApp) -> RPCResultResponse[int]:
+        return RPCResultResponse(result=2)
+
+    return SmartAppRPC(routers=[rpc], rate_limiter=rate_limiter)
+
+
+async def test_rate_limited_error_returned(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    rate_limiter = RateLimiter([RateLimit(rate=2, burst=2, key=("chat", "method"))])
+    smartapp_rpc = build_smartapp_rpc(rate_limiter)
+
+    # - Act -
+    for _ in range(3):
+        await smartapp_rpc.handle_smartapp_event(
+            smartapp_event_factory("search"),
+            bot,
+        )
+
+    # - Assert -
+    assert [
+        send_call.kwargs["data"]["status"]
+        for send_call in bot.send_smartapp_event.await_args_list
+    ] == ["ok", "ok", "error"]
+    assert bot.send_smartapp_event.await_args.kwargs["data"]["errors"] == [
+        {
+            "id": "RATE_LIMITED",
+            "reason": "Rate limit exceeded",
+            "meta": {"retry_after": 0.5},
+        },
+    ]
+    assert smartapp_rpc.rate_limiter is rate_limiter
+    assert rate_limiter.stats.allowed == 2
+    assert rate_limiter.stats.limited == {"search": 1}
+
+
+async def test_rate_limit_tokens_refilled(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    rate_limiter = RateLimiter([RateLimit(rate=1, burst=1, key=("chat",))])
+    smartapp_rpc = build_smartapp_rpc(rate_limiter)
+
+    await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("search"),
+        bot,
+    )
+
+    # - Act -
+    monotonic.return_value += 1
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("search"),
+        bot,
+    )
+
+    # - Assert -
+    assert response.jsonable_dict()["status"] == "ok"
+    assert rate_limiter.keys_count == 1
+
+
+async def test_rate_limit_method_cost(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    rate_limiter = RateLimiter([RateLimit(rate=1, burst=3, key=("bot",))])
+    smartapp_rpc = build_smartapp_rpc(rate_limiter)
+
+    # - Act -
+    export_response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("export"),
+        bot,
+    )
+    second_export_response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("export"),
+        bot,
+    )
+    search_response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("search"),
+        bot,
+    )
+
+    # - Assert -
+    assert export_response.jsonable_dict()["status"] == "ok"
+    assert second_export_response.jsonable_dict()["errors"][0]["meta"] == {
+        "retry_after": 1.0,
+    }
+    assert search_response.jsonable_dict()["status"] == "ok"
+
+
+async def test_rate_limit_for_selected_methods_and_senders(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    rate_limiter = RateLimiter(
+        [RateLimit(rate=1, burst=1, key=("sender",), methods={"export"})],
+    )
+    smartapp_rpc = build_smartapp_rpc(rate_limiter)
+
+    # - Act -
+    for method in ("search", "search", "export", "export"):
+        await smartapp_rpc.handle_smartapp_event(smartapp_event_factory(method), bot)
+
+    # - Assert -
+    # every event from the factory is sent by a new user
+    assert rate_limiter.stats.limited == {}
+    assert rate_limiter.stats.allowed == 2
+    assert rate_limiter.keys_count == 2
+
+
+async def test_rate_limit_not_applied_to_unknown_method(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    rate_limiter = RateLimiter([RateLimit(rate=1, burst=1)])
+    smartapp_rpc = build_smartapp_rpc(rate_limiter)
+
+    # - Act -
+    await smartapp_rpc.handle_smartapp_event(smartapp_event_factory("unknown"), bot)
+
+    # - Assert -
+    assert rate_limiter.keys_count == 0
+    assert bot.send_smartapp_event.await_args.kwargs["data"]["errors"][0]["id"] == (
+        "METHOD_NOT_FOUND"
+    )
+
+
+async def test_rate_limit_blocked_request_consumes_no_tokens(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    rate_limiter = RateLimiter(
+        [
+            RateLimit(rate=1, burst=10, key=("chat",)),
+            RateLimit(rate=1, burst=1, key=("chat", "method")),
+        ],
+    )
+    smartapp = SmartApp(bot, bot_id, chat_id)
+
+    # - Act -
+    retries_after = [
+        await rate_limiter.acquire(smartapp, "search", cost=1) for _ in range(5)
+    ]
+    other_method_retry_after = await rate_limiter.acquire(smartapp, "export", 1)
+
+    # - Assert -
+    assert retries_after == [0, 1, 1, 1, 1]
+    assert other_method_retry_after == 0
+
+
+async def test_rate_limit_idle_keys_expired(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    rate_limiter = RateLimiter([RateLimit(rate=1, burst=2, key=("method",))])
+    smartapp = SmartApp(bot, bot_id, chat_id)
+    await rate_limiter.acquire(smartapp, "search", 1)
+    await rate_limiter.acquire(smartapp, "export", 2)
+
+    # - Act -
+    monotonic.return_value += 2
+    await rate_limiter.acquire(smartapp, "other", 1)
+
+    # - Assert -
+    assert rate_limiter.keys_count == 1
+
+
+async def test_rate_limit_max_keys(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    rate_limiter = RateLimiter([RateLimit(rate=1, burst=1, key=("method",))], 2)
+    smartapp = SmartApp(bot, bot_id, chat_id)
+
+    # - Act -
+    for method in ("first", "second", "third"):
+        await rate_limiter.acquire(smartapp, method, 1)
+
+    # - Assert -
+    assert rate_limiter.keys_count == 2
+    assert await rate_limiter.acquire(smartapp, "first", 1) == 0
+
+
+def test_rate_limit_wrong_options() -> None:
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+        RateLimit(rate=0, burst=1)
+
+    # - Assert -
+    assert "must be positive" in str(exc.value)
+
+
+class ConcurrentWriterBackend(MemoryStateBackend):
+    def __init__(
+        self,
+        concurrent_state: bytes,
+        concurrent_key: str | None = None,
+    ) -> None:
+        super().__init__()
+        self._concurrent_state: bytes | None = concurrent_state
+        self._concurrent_key = concurrent_key
+
+    async def compare_and_set(
+        self,
+        key: str,
+        expected: bytes | None,
+        value: bytes,
+        ttl: float | None = None,
+    ) -> bool:
+        if self._concurrent_state is not None and self._concurrent_key in {None, key}:
+            # other worker updates the bucket between our read and write
+            await self.set(key, self._concurrent_state)
+            self._concurrent_state = None
+
+        return await super().compare_and_set(key, expected, value, ttl)
+
+
+async def test_rate_limit_with_shared_backend(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    wall_clock: MagicMock,
+    tmp_path: Path,
+) -> None:
+    # - Arrange -
+    backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+    limits = [RateLimit(rate=1, burst=2, key=("chat",))]
+    workers_rate_limiters = [
+        RateLimiter(limits, backend=backend),
+        RateLimiter(limits, backend=backend),
+    ]
+    smartapp = SmartApp(bot, bot_id, chat_id)
+
+    # - Act -
+    retries_after = [
+        await rate_limiter.acquire(smartapp, "search", 1)
+        for rate_limiter in workers_rate_limiters * 2
+    ]
+
+    # - Assert -
+    assert retries_after == [0, 0, 1, 1]
+    assert workers_rate_limiters[0].keys_count == 0
+
+    await backend.close()
+
+
+async def test_rate_limit_with_backend_concurrent_update(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    wall_clock: MagicMock,
+) -> None:
+    # - Arrange -
+    backend = ConcurrentWriterBackend(
+        json.dumps({"tokens": 1, "updated_at": 100.0}).encode(),
+    )
+    rate_limiter = RateLimiter(
+        [RateLimit(rate=1, burst=3, key=("chat",))],
+        backend=backend,
+    )
+    smartapp = SmartApp(bot, bot_id, chat_id)
+
+    # - Act -
+    retry_after = await rate_limiter.acquire(smartapp, "search", 1)
+
+    # - Assert -
+    assert retry_after == 0
+    bucket = json.loads(await backend.get(f"rate_limit:0:{chat_id}"))
+    assert bucket["tokens"] == 0
+
+
+async def test_rate_limit_with_backend_exhausted_by_concurrent_update(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    wall_clock: MagicMock,
+) -> None:
+    # - Arrange -
+    backend = ConcurrentWriterBackend(
+        json.dumps({"tokens": 0, "updated_at": 100.0}).encode(),
+    )
+    rate_limiter = RateLimiter(
+        [RateLimit(rate=1, burst=3, key=("chat",))],
+        backend=backend,
+    )
+    smartapp = SmartApp(bot, bot_id, chat_id)
+
+    # - Act -
+    retry_after = await rate_limiter.acquire(smartapp, "search", 1)
+
+    # - Assert -
+    assert retry_after == 1
+
+
+async def test_rate_limit_with_backend_refunded_when_other_bucket_exhausted(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    wall_clock: MagicMock,
+) -> None:
+    # - Arrange -
+    backend = ConcurrentWriterBackend(
+        json.dumps({"tokens": 0, "updated_at": 100.0}).encode(),
+        concurrent_key=f"rate_limit:1:{bot_id}",
+    )
+    rate_limiter = RateLimiter(
+        [
+            RateLimit(rate=1, burst=3, key=("chat",)),
+            RateLimit(rate=1, burst=3, key=("bot",)),
+        ],
+        backend=backend,
+    )
+    smartapp = SmartApp(bot, bot_id, chat_id)
+
+    # - Act -
+    retry_after = await rate_limiter.acquire(smartapp, "search", 1)
+
+    # - Assert -
+    assert retry_after == 1
+    chat_bucket = json.loads(await backend.get(f"rate_limit:0:{chat_id}"))
+    assert chat_bucket["tokens"] == 3
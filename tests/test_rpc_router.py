@@ -74,3 +74,45 @@ async def test_collect_rpc_method_with_error_without_default_id() -> None:
     # - Assert -
     assert rpc.rpc_methods["get_api_version"].errors == {}
     assert rpc.rpc_methods["get_api_version"].errors_models == {}
+
+
+async def test_included_router_not_modified() -> None:
+    # - Arrange -
+    class TenantError(RPCError):
+        id: str = "TENANT_ERROR"
+        reason: str = "Tenant error"
+
+    async def tenant_middleware(*args: Any, **kwargs: Any) -> Any:
+        return None  # pragma: no cover
+
+    rpc = RPCRouter()
+
+    @rpc.method("get_api_version")
+    async def get_api_version(smartapp: SmartApp) -> RPCResultResponse[int]:
+        return RPCResultResponse(result=1)  # pragma: no cover
+
+    rpc_method = rpc.rpc_methods["get_api_version"]
+    original_middlewares = rpc_method.middlewares.copy()
+
+    first_tenant_router = RPCRouter(
+        middlewares=[tenant_middleware],
+        errors=[TenantError],
+    )
+    second_tenant_router = RPCRouter()
+
+    # - Act -
+    first_tenant_router.include_router(rpc)
+    second_tenant_router.include_router(rpc)
+
+    # - Assert -
+    first_tenant_method = first_tenant_router.rpc_methods["get_api_version"]
+    second_tenant_method = second_tenant_router.rpc_methods["get_api_version"]
+    assert rpc_method.middlewares == original_middlewares
+    assert not rpc_method.errors
+    assert first_tenant_method.middlewares == [
+        tenant_middleware,
+        *original_middlewares,
+    ]
+    assert first_tenant_method.errors_models == {"TENANT_ERROR": TenantError}
+    assert second_tenant_method.middlewares == original_middlewares
+    assert first_tenant_method.handler is second_tenant_method.handler
@@ -0,0 +1,284 @@
+import asyncio
+import time
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCArgsBaseModel,
+    RPCPriority,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.load_shedder import LoadShedder
+from pybotx_smartapp_rpc.scheduler import FairScheduler
+
+
+class UserArgs(RPCArgsBaseModel):
+    user: str
+
+
+def build_smartapp_rpc(
+    scheduler: FairScheduler,
+    executed_calls: list[str],
+    release_handlers: asyncio.Event,
+    load_shedder: LoadShedder | None = None,
+) -> SmartAppRPC:
+    rpc = RPCRouter()
+
+    @rpc.method("open_chat", priority=RPCPriority.INTERACTIVE)
+    async def open_chat(
+        smartapp: SmartApp,
+        rpc_arguments: UserArgs,
+    ) -> RPCResultResponse[None]:
+        executed_calls.append(f"open_chat:{rpc_arguments.user}")
+        await release_handlers.wait()
+        return RPCResultResponse(result=None)
+
+    @rpc.method("export", priority=RPCPriority.BACKGROUND)
+    async def export(
+        smartapp: SmartApp,
+        rpc_arguments: UserArgs,
+    ) -> RPCResultResponse[None]:
+        executed_calls.append(f"export:{rpc_arguments.user}")
+        await release_handlers.wait()
+        return RPCResultResponse(result=None)
+
+    return SmartAppRPC(
+        routers=[rpc],
+        scheduler=scheduler,
+        load_shedder=load_shedder,
+    )
+
+
+async def handle_events(
+    smartapp_rpc: SmartAppRPC,
+    bot: AsyncMock,
+    events: list[SmartAppEvent],
+) -> "list[asyncio.Task[None]]":
+    handle_tasks = []
+    for event in events:
+        handle_tasks.append(
+            asyncio.create_task(smartapp_rpc.handle_smartapp_event(event, bot)),
+        )
+        await asyncio.sleep(0)
+
+    return handle_tasks
+
+
+async def test_heavy_sender_interleaved_with_others(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    executed_calls: list[str] = []
+    release_handlers = asyncio.Event()
+    scheduler = FairScheduler(max_concurrency=1)
+    smartapp_rpc = build_smartapp_rpc(scheduler, executed_calls, release_handlers)
+
+    # events with the same sender
+    heavy_event = smartapp_event_factory("export", params={"user": "heavy"})
+    light_event = smartapp_event_factory("export", params={"user": "light"})
+
+    # - Act -
+    handle_tasks = await handle_events(
+        smartapp_rpc,
+        bot,
+        [heavy_event] * 5 + [light_event] * 2,
+    )
+    queued_count = scheduler.queued_count
+    started_count = scheduler.stats.started
+    release_handlers.set()
+    await asyncio.gather(*handle_tasks)
+
+    # - Assert -
+    assert executed_calls == [
+        "export:heavy",
+        "export:light",
+        "export:heavy",
+        "export:light",
+        "export:heavy",
+        "export:heavy",
+        "export:heavy",
+    ]
+    assert queued_count == 6
+    assert started_count == 1
+    assert smartapp_rpc.scheduler is scheduler
+    assert (scheduler.running_count, scheduler.queued_count) == (0, 0)
+    assert scheduler.stats.started == 7
+    assert scheduler.stats.queued == 6
+
+
+async def test_interactive_methods_scheduled_before_background(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    executed_calls: list[str] = []
+    release_handlers = asyncio.Event()
+    smartapp_rpc = build_smartapp_rpc(
+        FairScheduler(max_concurrency=1, key="chat"),
+        executed_calls,
+        release_handlers,
+    )
+
+    # - Act -
+    handle_tasks = await handle_events(
+        smartapp_rpc,
+        bot,
+        [
+            smartapp_event_factory("export", params={"user": "first"}),
+            smartapp_event_factory("export", params={"user": "second"}),
+            smartapp_event_factory("open_chat", params={"user": "third"}),
+        ],
+    )
+    release_handlers.set()
+    await asyncio.gather(*handle_tasks)
+
+    # - Assert -
+    assert executed_calls == ["export:first", "open_chat:third", "export:second"]
+
+
+async def test_request_expired_in_scheduler_queue(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    executed_calls: list[str] = []
+    release_handlers = asyncio.Event()
+    load_shedder = LoadShedder()
+    smartapp_rpc = build_smartapp_rpc(
+        FairScheduler(max_concurrency=1),
+        executed_calls,
+        release_handlers,
+        load_shedder,
+    )
+
+    expiring_event = smartapp_event_factory("open_chat", params={"user": "second"})
+    expiring_event.data["deadline"] = time.time() + 0.05
+
+    handle_tasks = await handle_events(
+        smartapp_rpc,
+        bot,
+        [smartapp_event_factory("export", params={"user": "first"}), expiring_event],
+    )
+
+    # - Act -
+    await asyncio.sleep(0.1)
+    release_handlers.set()
+    await asyncio.gather(*handle_tasks)
+
+    # - Assert -
+    assert executed_calls == ["export:first"]
+    assert load_shedder.stats.expired == {"open_chat": 1}
+    assert bot.send_smartapp_event.await_args.kwargs["data"]["errors"][0]["id"] == (
+        "DEADLINE_EXCEEDED"
+    )
+
+
+async def test_cancelled_requests_leave_scheduler_queue(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    scheduler = FairScheduler(max_concurrency=1)
+    smartapp = SmartApp(bot, bot_id, chat_id)
+    await scheduler.acquire(smartapp, RPCPriority.NORMAL, 1)
+
+    waiting_tasks = [
+        asyncio.create_task(scheduler.acquire(smartapp, RPCPriority.NORMAL, 1))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+
+    # - Act -
+    waiting_tasks[0].cancel()
+    await asyncio.sleep(0)
+    scheduler.release()
+    # slot is handed over, but request is cancelled before it starts
+    waiting_tasks[1].cancel()
+
+    # - Assert -
+    for cancelled_task in waiting_tasks[:2]:
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled_task
+
+    await waiting_tasks[2]
+    assert (scheduler.running_count, scheduler.queued_count) == (1, 0)
+    assert scheduler.stats.cancelled == 2
+
+    scheduler.release()
+    assert scheduler.running_count == 0
+
+
+async def test_idle_scheduler_keys_dropped(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    scheduler = FairScheduler(max_concurrency=1, max_idle_keys=2)
+    first_smartapp, second_smartapp, third_smartapp = (
+        SmartApp(bot, bot_id, chat_id, smartapp_event_factory("export"))
+        for _ in range(3)
+    )
+
+    # - Act -
+    for smartapp in (
+        first_smartapp,
+        first_smartapp,
+        second_smartapp,
+        first_smartapp,
+        third_smartapp,
+    ):
+        await scheduler.acquire(smartapp, RPCPriority.NORMAL, 1)
+        scheduler.release()
+
+    # - Assert -
+    # second sender is behind virtual time, so its tags are forgotten
+    assert scheduler.keys_count == 2
+
+
+async def test_active_scheduler_keys_pruned_after_doubling(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    mocker,
+) -> None:
+    # - Arrange -
+    scheduler = FairScheduler(max_concurrency=100, max_idle_keys=2)
+    smartapps = [
+        SmartApp(bot, bot_id, chat_id, smartapp_event_factory("export"))
+        for _ in range(9)
+    ]
+    for smartapp in smartapps:
+        smartapp.event.sender.huid = uuid4()  # type: ignore[union-attr]
+
+    prune_idle_keys = mocker.spy(scheduler, "_prune_idle_keys")
+
+    # - Act -
+    for smartapp in smartapps:
+        await scheduler.acquire(smartapp, RPCPriority.NORMAL, 1)
+
+    # - Assert -
+    # all keys are ahead of virtual time, so none of them is dropped
+    assert scheduler.keys_count == 9
+    assert prune_idle_keys.call_count == 2
+    assert scheduler.stats.started == 9
+
+
+def test_scheduler_wrong_options() -> None:
+    # - Act -
+    with pytest.raises(ValueError) as exc:
+        FairScheduler(max_concurrency=0)
+
+    # - Assert -
+    assert "must be positive" in str(exc.value)
@@ -0,0 +1,202 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.session_cache import (
+    SessionCache,
+    SessionCacheStats,
+    get_session_key,
+)
+from pybotx_smartapp_rpc.typing import HandlerWithArgs, RPCArgsBaseModel, RPCResponse
+
+
+@pytest.fixture
+def monotonic(mocker) -> MagicMock:
+    time_mock = mocker.patch("pybotx_smartapp_rpc.session_cache.time")
+    time_mock.monotonic.return_value = 100.0
+    return time_mock.monotonic
+
+
+def build_smartapp_rpc(session_cache: SessionCache, loaded: list[str]) -> SmartAppRPC:
+    async def user_middleware(
+        smartapp: SmartApp,
+        rpc_arguments: RPCArgsBaseModel,
+        call_next: HandlerWithArgs,
+    ) -> RPCResponse:
+        async def load_user() -> str:
+            assert smartapp.event
+            loaded.append(str(smartapp.event.sender.huid))
+            user = f"user {len(loaded)}"
+            await asyncio.sleep(0)
+            return user
+
+        smartapp.state.user = await session_cache.get_or_load(
+            smartapp,
+            "user",
+            load_user,
+        )
+        return await call_next(smartapp, rpc_arguments)
+
+    rpc = RPCRouter()
+
+    @rpc.method("get_user")
+    async def get_user(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result=smartapp.state.user)
+
+    return SmartAppRPC(
+        routers=[rpc],
+        middlewares=[user_middleware],
+        session_cache=session_cache,
+    )
+
+
+async def test_session_value_loaded_once_per_sender(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    loaded: list[str] = []
+    smartapp_rpc = build_smartapp_rpc(SessionCache(), loaded)
+    first_event = smartapp_event_factory("get_user")
+    repeated_event = smartapp_event_factory("get_user")
+    repeated_event.sender = first_event.sender
+
+    # - Act -
+    responses = await asyncio.gather(
+        *(
+            smartapp_rpc.handle_sync_smartapp_event(event, bot)
+            for event in (
+                first_event,
+                repeated_event,
+                smartapp_event_factory("get_user"),
+            )
+        ),
+    )
+    repeated_response = await smartapp_rpc.handle_sync_smartapp_event(
+        repeated_event,
+        bot,
+    )
+
+    # - Assert -
+    assert [
+        response.jsonable_dict()["result"]["data"]
+        for response in (*responses, repeated_response)
+    ] == ["user 1", "user 1", "user 2", "user 1"]
+    assert smartapp_rpc.session_cache
+    assert smartapp_rpc.session_cache.size == 2
+    assert smartapp_rpc.session_cache.stats == SessionCacheStats(
+        hits=1,
+        misses=2,
+        joined=1,
+    )
+
+
+async def test_session_value_expired_evicted_and_invalidated(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    monotonic: MagicMock,
+) -> None:
+    # - Arrange -
+    loaded: list[str] = []
+    session_cache = SessionCache(ttl=10, max_size=1)
+    smartapp_rpc = build_smartapp_rpc(session_cache, loaded)
+    event = smartapp_event_factory("get_user")
+    smartapp = SmartApp(bot, event.bot.id, event.chat.id, event)
+
+    async def get_user() -> str:
+        response = await smartapp_rpc.handle_sync_smartapp_event(event, bot)
+        return response.jsonable_dict()["result"]["data"]
+
+    # - Act -
+    users = [await get_user()]
+    monotonic.return_value += 10
+    users.append(await get_user())
+
+    session_cache.invalidate(get_session_key(smartapp), "user")
+    users.append(await get_user())
+
+    session_cache.invalidate(get_session_key(smartapp))
+    users.append(await get_user())
+
+    await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_user"),
+        bot,
+    )
+    users.append(await get_user())
+
+    session_cache.clear()
+    session_cache.invalidate(get_session_key(smartapp), "user")
+
+    # - Assert -
+    assert users == ["user 1", "user 2", "user 3", "user 4", "user 6"]
+    assert session_cache.stats.evicted == 2
+    assert session_cache.size == 0
+
+
+async def test_failed_load_not_cached_and_retried_by_joined_request(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    session_cache = SessionCache()
+    event = smartapp_event_factory("get_user")
+    smartapp = SmartApp(bot, event.bot.id, event.chat.id, event)
+    load_user = AsyncMock(side_effect=[ConnectionError, "user"])
+
+    async def failing_load_user() -> str:
+        await asyncio.sleep(0)
+        return await load_user()
+
+    # - Act -
+    results = await asyncio.gather(
+        session_cache.get_or_load(smartapp, "user", failing_load_user),
+        session_cache.get_or_load(smartapp, "user", failing_load_user),
+        return_exceptions=True,
+    )
+
+    # - Assert -
+    assert isinstance(results[0], ConnectionError)
+    assert results[1] == "user"
+    assert session_cache.stats.misses == 2
+
+
+async def test_joined_request_cancelled(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    session_cache = SessionCache()
+    event = smartapp_event_factory("get_user")
+    smartapp = SmartApp(bot, event.bot.id, event.chat.id, event)
+    release_load = asyncio.Event()
+
+    async def load_user() -> str:
+        await release_load.wait()
+        return "user"
+
+    loading_task = asyncio.create_task(
+        session_cache.get_or_load(smartapp, "user", load_user),
+    )
+    joined_task = asyncio.create_task(
+        session_cache.get_or_load(smartapp, "user", load_user),
+    )
+    await asyncio.sleep(0)
+
+    # - Act -
+    joined_task.cancel()
+    release_load.set()
+
+    # - Assert -
+    with pytest.raises(asyncio.CancelledError):
+        await joined_task
+
+    assert await loading_task == "user"
@@ -0,0 +1,177 @@
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCArgsBaseModel,
+    RPCErrorResponse,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.models.errors import RPCError
+from pybotx_smartapp_rpc.typing import HandlerWithArgs, Middleware, RPCResponse
+
+
+class TaskArgs(RPCArgsBaseModel):
+    task_id: int
+
+
+class Task(RPCArgsBaseModel):
+    task_id: int
+    title: str
+
+
+def build_middleware(name: str, calls: list[str]) -> Middleware:
+    async def middleware(
+        smartapp: SmartApp,
+        rpc_arguments: RPCArgsBaseModel,
+        call_next: HandlerWithArgs,
+    ) -> RPCResponse:
+        calls.append(name)
+        return await call_next(smartapp, rpc_arguments)
+
+    return middleware
+
+
+def build_smartapp_rpc(calls: list[str]) -> SmartAppRPC:
+    rpc = RPCRouter()
+
+    @rpc.method("get_task", middlewares=[build_middleware("get_task", calls)])
+    async def get_task(
+        smartapp: SmartApp,
+        rpc_arguments: TaskArgs,
+    ) -> RPCResultResponse[Task]:
+        calls.append("get_task handler")
+        return RPCResultResponse(
+            result=Task(task_id=rpc_arguments.task_id, title="Review"),
+        )
+
+    @rpc.method("get_title")
+    async def get_title(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result="Title")
+
+    @rpc.method("get_forbidden")
+    async def get_forbidden(smartapp: SmartApp) -> RPCErrorResponse:
+        return RPCErrorResponse(errors=[RPCError(reason="Forbidden", id="FORBIDDEN")])
+
+    @rpc.method("get_tasks")
+    async def get_tasks(
+        smartapp: SmartApp,
+        rpc_arguments: TaskArgs,
+    ) -> RPCResultResponse[list[str]]:
+        task = await smartapp.call(
+            "get_task",
+            rpc_arguments,
+            skip_applied_middlewares=True,
+        )
+        title = await smartapp.call("get_title")
+        return RPCResultResponse(result=[task.title, title])
+
+    @rpc.method("get_missing")
+    async def get_missing(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result=await smartapp.call("missing"))
+
+    @rpc.method("get_denied")
+    async def get_denied(smartapp: SmartApp) -> RPCResultResponse[str]:
+        return RPCResultResponse(result=await smartapp.call("get_forbidden"))
+
+    return SmartAppRPC(routers=[rpc], middlewares=[build_middleware("app", calls)])
+
+
+async def test_method_called_with_validated_args(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    calls: list[str] = []
+    smartapp_rpc = build_smartapp_rpc(calls)
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_tasks", params={"task_id": 1}),
+        bot,
+    )
+
+    # - Assert -
+    assert response.jsonable_dict()["result"]["data"] == ["Review", "Title"]
+    assert calls == ["app", "get_task", "get_task handler", "app"]
+
+
+@pytest.mark.parametrize(
+    ("method", "error"),
+    [
+        (
+            "get_missing",
+            {
+                "id": "METHOD_NOT_FOUND",
+                "reason": "Method not found",
+                "meta": {"method": "missing"},
+            },
+        ),
+        ("get_denied", {"id": "FORBIDDEN", "reason": "Forbidden", "meta": {}}),
+    ],
+)
+async def test_called_method_errors_returned(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    method: str,
+    error: dict,
+) -> None:
+    # - Arrange -
+    smartapp_rpc = build_smartapp_rpc([])
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory(method),
+        bot,
+    )
+
+    # - Assert -
+    assert response.jsonable_dict()["errors"] == [error]
+
+
+async def test_call_without_smartapp_rpc(bot: AsyncMock) -> None:
+    # - Arrange -
+    smartapp = SmartApp(bot, uuid4(), uuid4())
+
+    # - Act -
+    with pytest.raises(RuntimeError) as exc:
+        await smartapp.call("get_task", TaskArgs(task_id=1))
+
+    # - Assert -
+    assert str(exc.value) == "Methods can be called only in SmartAppRPC"
+
+
+@pytest.mark.parametrize(
+    ("method", "rpc_arguments", "error"),
+    [
+        ("get_task", None, "get_task expects TaskArgs arguments, got NoneType"),
+        (
+            "get_task",
+            Task(task_id=1, title="Review"),
+            "get_task expects TaskArgs arguments, got Task",
+        ),
+        ("get_title", TaskArgs(task_id=1), "get_title doesn't accept arguments"),
+    ],
+)
+async def test_call_with_wrong_args(
+    bot: AsyncMock,
+    method: str,
+    rpc_arguments: RPCArgsBaseModel | None,
+    error: str,
+) -> None:
+    # - Arrange -
+    smartapp_rpc = build_smartapp_rpc([])
+    smartapp = SmartApp(bot, uuid4(), uuid4(), smartapp_rpc=smartapp_rpc)
+
+    # - Act -
+    with pytest.raises(TypeError) as exc:
+        await smartapp.call(method, rpc_arguments)
+
+    # - Assert -
+    assert str(exc.value) == f"RPC method {error}"
@@ -0,0 +1,151 @@
+import asyncio
+import multiprocessing
+import sqlite3
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+from pybotx_smartapp_rpc.backends.base import StateBackend
+from pybotx_smartapp_rpc.backends.memory import MemoryStateBackend
+from pybotx_smartapp_rpc.backends.sqlite import SQLiteStateBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def backend(
+    request: pytest.FixtureRequest,
+    tmp_path: Path,
+) -> AsyncIterator[StateBackend]:
+    if request.param == "memory":
+        state_backend: StateBackend = MemoryStateBackend()
+    else:
+        state_backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+
+    yield state_backend
+
+    await state_backend.close()
+
+
+async def test_backend_get_set_delete(backend: StateBackend) -> None:
+    # - Act -
+    missing_value = await backend.get("key")
+    await backend.set("key", b"value")
+    value = await backend.get("key")
+    await backend.delete("key")
+
+    # - Assert -
+    assert missing_value is None
+    assert value == b"value"
+    assert await backend.get("key") is None
+
+
+async def test_backend_value_expired(backend: StateBackend) -> None:
+    # - Arrange -
+    await backend.set("expired", b"value", ttl=0)
+    await backend.set("alive", b"value", ttl=60)
+
+    # - Assert -
+    assert await backend.get("expired") is None
+    assert await backend.get("alive") == b"value"
+
+
+async def test_backend_incr(backend: StateBackend) -> None:
+    # - Act -
+    first_value = await backend.incr("counter", ttl=60)
+    second_value = await backend.incr("counter", amount=5)
+    await backend.set("expired_counter", b"10", ttl=0)
+    expired_counter_value = await backend.incr("expired_counter")
+
+    # - Assert -
+    assert first_value == 1
+    assert second_value == 6
+    assert await backend.get("counter") == b"6"
+    assert expired_counter_value == 1
+
+
+async def test_backend_compare_and_set(backend: StateBackend) -> None:
+    # - Act -
+    created = await backend.compare_and_set("key", None, b"first")
+    not_created = await backend.compare_and_set("key", None, b"second")
+    updated = await backend.compare_and_set("key", b"first", b"third", ttl=60)
+    not_updated = await backend.compare_and_set("key", b"first", b"fourth")
+
+    # - Assert -
+    assert (created, not_created, updated, not_updated) == (True, False, True, False)
+    assert await backend.get("key") == b"third"
+
+
+async def test_memory_backend_expired_keys_swept() -> None:
+    # - Arrange -
+    backend = MemoryStateBackend()
+
+    # - Act -
+    for index in range(1024):
+        await backend.set(f"key-{index}", b"value", ttl=0)
+
+    # - Assert -
+    assert len(backend) == 0
+
+
+async def test_sqlite_backend_expired_keys_swept(tmp_path: Path) -> None:
+    # - Arrange -
+    backend = SQLiteStateBackend(str(tmp_path / "state.db"), sweep_interval=2)
+    await backend.set("expired", b"value", ttl=0)
+
+    # - Act -
+    await backend.incr("counter")
+
+    # - Assert -
+    await backend.close()
+    with sqlite3.connect(tmp_path / "state.db") as connection:
+        rows = connection.execute("SELECT key FROM smartapp_rpc_state").fetchall()
+
+    assert rows == [("counter",)]
+
+
+async def test_sqlite_backend_transaction_rolled_back(tmp_path: Path) -> None:
+    # - Arrange -
+    backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+    await backend.set("counter", b"not a number")
+
+    # - Act -
+    with pytest.raises(ValueError):
+        await backend.incr("counter")
+
+    # - Assert -
+    assert await backend.compare_and_set("counter", b"not a number", b"1")
+    assert await backend.incr("counter") == 2
+
+    await backend.close()
+
+
+def increment_in_other_process(path: str, times: int) -> None:
+    async def increment() -> None:
+        backend = SQLiteStateBackend(path)
+        for _ in range(times):
+            await backend.incr("counter")
+
+        await backend.close()
+
+    asyncio.run(increment())
+
+
+async def test_sqlite_backend_shared_between_processes(tmp_path: Path) -> None:
+    # - Arrange -
+    path = str(tmp_path / "state.db")
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=increment_in_other_process, args=(path, 50))
+        for _ in range(3)
+    ]
+
+    # - Act -
+    for process in processes:
+        process.start()
+
+    await asyncio.to_thread(lambda: [process.join(30) for process in processes])
+
+    # - Assert -
+    backend = SQLiteStateBackend(path)
+    assert await backend.get("counter") == b"150"
+    await backend.close()
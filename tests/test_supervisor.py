@@ -0,0 +1,160 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+import pytest
+from pybotx import SmartAppEvent
+
+from pybotx_smartapp_rpc import (
+    RPCErrorResponse,
+    RPCResultResponse,
+    RPCRouter,
+    SmartApp,
+    SmartAppRPC,
+)
+from pybotx_smartapp_rpc.draining import ShutdownSummary
+from pybotx_smartapp_rpc.models.errors import RPCError
+from pybotx_smartapp_rpc.supervisor import TaskSupervisorStats
+
+
+async def test_spawned_tasks_limited_and_errors_handled(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    handled_errors: list[str] = []
+    release_tasks = asyncio.Event()
+    rpc = RPCRouter()
+
+    async def notify(number: int) -> None:
+        await release_tasks.wait()
+        if number == 2:
+            raise ValueError("notification failed")
+
+    async def value_error_handler(
+        exc: ValueError,
+        smartapp: SmartApp,
+    ) -> RPCErrorResponse:
+        handled_errors.append(str(exc))
+        return RPCErrorResponse(errors=[RPCError(reason=str(exc), id="VALUE")])
+
+    @rpc.method("notify_all")
+    async def notify_all(smartapp: SmartApp) -> RPCResultResponse[list[bool]]:
+        return RPCResultResponse(
+            result=[smartapp.spawn(notify(number)) for number in range(4)],
+        )
+
+    smartapp_rpc = SmartAppRPC(
+        routers=[rpc],
+        exception_handlers={ValueError: value_error_handler},
+        max_background_tasks=1,
+        max_queued_background_tasks=2,
+    )
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("notify_all"),
+        bot,
+    )
+    await asyncio.sleep(0)
+    running_count = smartapp_rpc.task_supervisor.running_count
+    queued_count = smartapp_rpc.task_supervisor.queued_count
+    release_tasks.set()
+    await asyncio.gather(*smartapp_rpc.task_supervisor.tasks)
+
+    # - Assert -
+    assert response.jsonable_dict()["result"]["data"] == [True, True, True, False]
+    assert (running_count, queued_count) == (1, 2)
+    assert handled_errors == ["notification failed"]
+    assert smartapp_rpc.task_supervisor.stats == TaskSupervisorStats(
+        spawned=3,
+        completed=2,
+        failed=1,
+        rejected=1,
+    )
+
+
+async def test_spawned_tasks_drained_on_shutdown(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    smartapp_rpc = SmartAppRPC(routers=[], max_background_tasks=1)
+    smartapp = SmartApp(bot, bot_id, chat_id, smartapp_rpc=smartapp_rpc)
+
+    smartapp.spawn(asyncio.sleep(0.01))
+    smartapp.spawn(asyncio.sleep(1))
+    smartapp.spawn(asyncio.sleep(1))
+
+    # - Act -
+    shutdown_summary = await smartapp_rpc.shutdown(timeout=0.05)
+
+    # - Assert -
+    assert shutdown_summary == ShutdownSummary(
+        completed_background_tasks=1,
+        cancelled_background_tasks=2,
+    )
+    assert smartapp_rpc.task_supervisor.stats.cancelled == 2
+    assert not smartapp.spawn(asyncio.sleep(0))
+    assert smartapp_rpc.task_supervisor.stats.rejected == 1
+
+
+def test_spawn_without_smartapp_rpc(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    smartapp = SmartApp(bot, bot_id, chat_id)
+
+    # - Act -
+    with pytest.raises(RuntimeError) as exc:
+        smartapp.spawn(asyncio.sleep(0))
+
+    # - Assert -
+    assert str(exc.value) == "Background tasks can be spawned only in SmartAppRPC"
+
+
+async def test_slot_passed_to_next_task_when_queued_task_cancelled(
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+) -> None:
+    # - Arrange -
+    smartapp_rpc = SmartAppRPC(routers=[], max_background_tasks=1)
+    smartapp = SmartApp(bot, bot_id, chat_id, smartapp_rpc=smartapp_rpc)
+    task_supervisor = smartapp_rpc.task_supervisor
+    release_first = asyncio.Event()
+    finished: list[str] = []
+
+    async def run_task(name: str) -> None:
+        if name == "first":
+            await release_first.wait()
+
+        finished.append(name)
+
+    spawned_tasks = []
+    for name in ("first", "second", "third", "fourth"):
+        spawned_tasks_before = set(task_supervisor.tasks)
+        smartapp.spawn(run_task(name))
+        spawned_tasks.extend(task_supervisor.tasks - spawned_tasks_before)
+
+    await asyncio.sleep(0)
+    _, second_task, third_task, _ = spawned_tasks
+
+    # - Act -
+    # third task is cancelled while waiting in queue
+    third_task.cancel()
+    await asyncio.sleep(0)
+    # slot is passed to second task, but it is cancelled before start
+    release_first.set()
+    await asyncio.sleep(0)
+    second_task.cancel()
+    await asyncio.gather(*task_supervisor.tasks, return_exceptions=True)
+
+    # - Assert -
+    assert finished == ["first", "fourth"]
+    assert task_supervisor.stats.cancelled == 2
+    assert (task_supervisor.running_count, task_supervisor.queued_count) == (0, 0)
@@ -0,0 +1,149 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+from pybotx import (
+    BotAPISyncSmartAppEventResultResponse,
+    SmartAppEvent,
+)
+
+from pybotx_smartapp_rpc import RPCResultResponse, RPCRouter, SmartApp, SmartAppRPC
+
+
+async def test_sync_budget_fast_method_answered_synchronously(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+
+    @rpc.method("get_api_version", sync_budget=1)
+    async def get_api_version(smartapp: SmartApp) -> RPCResultResponse[int]:
+        return RPCResultResponse(result=1)
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("get_api_version"),
+        bot,
+    )
+
+    # - Assert -
+    expected_response = BotAPISyncSmartAppEventResultResponse.from_domain(data=1)
+    assert response.jsonable_dict() == expected_response.jsonable_dict()
+    bot.send_smartapp_event.assert_not_awaited()
+
+
+async def test_sync_budget_slow_method_delivered_later(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    bot_id: UUID,
+    chat_id: UUID,
+    ref: UUID,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    release_handler = asyncio.Event()
+
+    @rpc.method("build_report", sync_budget=0.01)
+    async def build_report(smartapp: SmartApp) -> RPCResultResponse[str]:
+        await release_handler.wait()
+        return RPCResultResponse(result="report")
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    response = await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("build_report"),
+        bot,
+    )
+    release_handler.set()
+    await asyncio.sleep(0.01)
+
+    # - Assert -
+    assert isinstance(response, BotAPISyncSmartAppEventResultResponse)
+    assert response.data["status"] == "accepted"
+    assert UUID(response.data["job_id"])
+    bot.send_smartapp_event.assert_awaited_once_with(
+        bot_id=bot_id,
+        chat_id=chat_id,
+        ref=ref,
+        files=[],
+        data={
+            "status": "ok",
+            "result": "report",
+            "type": "smartapp_rpc",
+            "job_id": response.data["job_id"],
+        },
+        encrypted=True,
+    )
+
+
+async def test_sync_budget_deferred_delivery_failed(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+    mocker,
+) -> None:
+    # - Arrange -
+    logger_mock = mocker.patch("pybotx_smartapp_rpc.rpc.logger")
+    bot.send_smartapp_event.side_effect = RuntimeError("BotX is down")
+    rpc = RPCRouter()
+    release_handler = asyncio.Event()
+
+    @rpc.method("build_report", sync_budget=0.01)
+    async def build_report(smartapp: SmartApp) -> RPCResultResponse[str]:
+        await release_handler.wait()
+        return RPCResultResponse(result="report")
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+
+    # - Act -
+    await smartapp_rpc.handle_sync_smartapp_event(
+        smartapp_event_factory("build_report"),
+        bot,
+    )
+    release_handler.set()
+    await asyncio.sleep(0.01)
+
+    # - Assert -
+    logger_mock.exception.assert_called_once()
+
+
+async def test_sync_budget_handler_cancelled_with_sync_request(
+    smartapp_event_factory: Callable[..., SmartAppEvent],
+    bot: AsyncMock,
+) -> None:
+    # - Arrange -
+    rpc = RPCRouter()
+    handler_cancelled = asyncio.Event()
+
+    @rpc.method("build_report", sync_budget=10)
+    async def build_report(smartapp: SmartApp) -> RPCResultResponse[str]:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0.01)
+            handler_cancelled.set()
+            raise
+
+        return RPCResultResponse(result="report")  # pragma: no cover
+
+    smartapp_rpc = SmartAppRPC(routers=[rpc])
+    sync_request = asyncio.create_task(
+        smartapp_rpc.handle_sync_smartapp_event(
+            smartapp_event_factory("build_report"),
+            bot,
+        ),
+    )
+    await asyncio.sleep(0.01)
+
+    # - Act -
+    sync_request.cancel()
+    await asyncio.wait({sync_request})
+
+    # - Assert -
+    assert sync_request.cancelled()
+    assert handler_cancelled.is_set()
+    bot.send_smartapp_event.assert_not_awaited()